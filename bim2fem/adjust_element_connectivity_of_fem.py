@@ -8,6 +8,7 @@ import ifcopenshell
 
 from bim2fem.helpers.snap_frame_members import snap_frame_members
 from bim2fem.helpers.snap_floor_beam_systems import snap_floor_beam_systems
+from bim2fem.helpers.snapping_metadata import SnappingMetadataTable
 from bim2fem.helpers.snap_beams_to_walls import snap_beams_to_walls
 from bim2fem.helpers.snap_walls_to_slabs import snap_walls_to_slabs
 from bim2fem.helpers.snap_walls_to_walls import (
@@ -25,9 +26,13 @@ def adjust_element_connectivity_of_ifc4_sav_file(
     execute_snap_beams_to_walls: bool = False,
 ) -> ifcopenshell.file:
 
+    # Metadata of members is resolved once and shared by the snap stages
+    snapping_metadata_table = SnappingMetadataTable()
+
     if execute_snap_frame_members:
         ifc4_sav_file = snap_frame_members(
             ifc4_sav_file=ifc4_sav_file,
+            snapping_metadata_table=snapping_metadata_table,
         )
         inlbim.api.structural.merge_all_coincident_structural_point_connections(
             ifc4sav_file=ifc4_sav_file
@@ -36,6 +41,7 @@ def adjust_element_connectivity_of_ifc4_sav_file(
     if execute_snap_floor_beam_systems:
         ifc4_sav_file = snap_floor_beam_systems(
             ifc4_sav_file=ifc4_sav_file,
+            snapping_metadata_table=snapping_metadata_table,
         )
         inlbim.api.structural.merge_all_coincident_structural_point_connections(
             ifc4sav_file=ifc4_sav_file
@@ -6,7 +6,6 @@ StructuralAnalysisView MVD"""
 
 import ifcopenshell
 import inlbim.api.file
-import ifcopenshell.util.selector
 from bim2fem.helpers.convert_frame_member_to_structural_item import (
     convert_linear_frame_member_to_structural_item,
 )
@@ -19,6 +18,18 @@ import inlbim.api.structural
 import ifcopenshell.api.root
 import ifcopenshell.api.aggregate
 import inlbim.api.geometry
+import inlbim.util.file
+import inlbim.util.element
+import inlbim.util.instrumentation
+import inlbim.util.library
+import inlbim.util.structural
+from bim2fem.helpers.analyze_geometry_of_elements import analyze_geometry_of_elements
+from bim2fem.helpers.incremental_conversion import (
+    converted_elements_exist_in_destination_file,
+    get_changes_between_source_files,
+    get_structural_point_connections_in_affected_region,
+    remove_converted_elements_from_destination_file,
+)
 
 
 def convert_ifc_to_fem(
@@ -26,220 +37,453 @@ def convert_ifc_to_fem(
     element_selection_query: str = "IfcColumn, IfcSlab, IfcWall, IfcBeam, IfcMember",
     element_deselection_query: str | None = None,
     region: REGION = "Europe",
+    workers: int = 1,
+    tessellation_cache_directory: str | None = None,
+    shape_classification_cache_directory: str | None = None,
+    previous_ifc4_source_file: ifcopenshell.file | None = None,
+    previous_ifc4_destination_file: ifcopenshell.file | None = None,
+    instrumentation: inlbim.util.instrumentation.Instrumentation | None = None,
+    time_budget_per_element: float | None = None,
+    memory_budget_per_element: int | None = None,
+    conversion_report: dict | None = None,
 ) -> ifcopenshell.file:
-    """Convert IFC to FEM"""
+    """Convert IFC to FEM. With workers > 1, the geometric analysis of the source
+    elements is distributed over a pool of processes; the destination file is
+    still written serially in the same order, so the result is identical. If
+    tessellation_cache_directory is given, meshes are cached on disk across
+    runs. Likewise, if shape_classification_cache_directory is given, the
+    classifications and dimensions of beam cross-sections are cached on disk.
 
-    # Create empty IFC4 StructuralAnalysisView File
-    ifc4_destination_file = inlbim.api.file.create_ifc4_file(
-        model_view_definition="StructuralAnalysisView",
-        precision=1e-4,
-    )
+    If previous_ifc4_source_file and previous_ifc4_destination_file (its
+    conversion) are given, previous_ifc4_destination_file is updated in place:
+    elements are diffed by GlobalId and fingerprint, only added or changed
+    elements are converted, the structural items of changed or deleted elements
+    are removed, and nodes are only merged in the affected region.
 
-    # Get Project
-    project = ifc4_destination_file.by_type(type="IfcProject", include_subtypes=False)[
-        0
-    ]
+    Timing spans and counters are recorded in instrumentation, if given, and
+    emitted to its sink, followed by a summary table. Progress messages are only
+    emitted if instrumentation is verbose, whereas warnings and the summary table
+    are always emitted. Nothing is printed unless the sink is a PrintSink.
 
-    # Add Site
-    site = ifcopenshell.api.root.create_entity(
-        file=ifc4_destination_file,
-        ifc_class="IfcSite",
-        name="Site-01",
-    )
-    ifcopenshell.api.aggregate.assign_object(
-        file=ifc4_destination_file,
-        products=[site],
-        relating_object=project,
-    )
-    inlbim.api.geometry.edit_object_placement(
-        product=site,
-        place_object_relative_to_parent=True,
-    )
+    If time_budget_per_element (in seconds) or memory_budget_per_element (in
+    bytes) is given, the geometric analysis of each element runs in a worker
+    process within that budget, and elements whose analysis or conversion fails
+    are recorded as NG with a reason instead of aborting the conversion. Each
+    such failure is emitted as a warning with the GlobalId and the reason.
 
-    # Get list of all elements
-    all_elements_from_source_file = ifcopenshell.util.selector.filter_elements(
-        ifc_file=ifc4_source_file,
-        query="IfcElement",
-        elements=None,
-    )
+    If given, conversion_report is filled with the GlobalId of each element slated
+    for conversion mapped to its IFC class, whether it was converted, and the
+    reason of its failure (None unless failures are isolated)."""
 
-    # Get list of selected elements
-    selected_elements_from_source_file = ifcopenshell.util.selector.filter_elements(
-        ifc_file=ifc4_source_file,
-        query=element_selection_query,
-        elements=all_elements_from_source_file,
-    )
+    if instrumentation is None:
+        instrumentation = inlbim.util.instrumentation.Instrumentation()
 
-    # Get list of deselected elements
-    if isinstance(element_deselection_query, str):
-        deselected_elements_from_source_file = (
-            ifcopenshell.util.selector.filter_elements(
-                ifc_file=ifc4_source_file,
-                query=element_deselection_query,
-                elements=all_elements_from_source_file,
-            )
-        )
-    else:
-        deselected_elements_from_source_file = set()
+    if conversion_report is None:
+        conversion_report = {}
 
-    # Get resulting set of elements slated for conversion
-    elements_slated_for_conversion_from_source_file = (
-        selected_elements_from_source_file.difference(
-            deselected_elements_from_source_file
+    # Get elements slated for conversion from source file
+    with instrumentation.span(name="get_elements_slated_for_conversion"):
+        elements_slated_for_conversion_from_source_file = (
+            get_elements_slated_for_conversion(
+                ifc4_source_file=ifc4_source_file,
+                element_selection_query=element_selection_query,
+                element_deselection_query=element_deselection_query,
+            )
         )
-    )
-
-    # Get sets of elements slated for conversion from source file
     beams_slated_for_conversion_from_source_file = (
-        ifcopenshell.util.selector.filter_elements(
-            ifc_file=ifc4_source_file,
-            query="IfcBeam",
-            elements=elements_slated_for_conversion_from_source_file,
-        )
+        elements_slated_for_conversion_from_source_file["IfcBeam"]
+    )
+    instrumentation.message(
+        f"beamns: {len(beams_slated_for_conversion_from_source_file)}"
     )
-    print(f"beamns: {len(beams_slated_for_conversion_from_source_file)}")
     columns_slated_for_conversion_from_source_file = (
-        ifcopenshell.util.selector.filter_elements(
-            ifc_file=ifc4_source_file,
-            query="IfcColumn",
-            elements=elements_slated_for_conversion_from_source_file,
-        )
+        elements_slated_for_conversion_from_source_file["IfcColumn"]
+    )
+    instrumentation.message(
+        f"columns: {len(columns_slated_for_conversion_from_source_file)}"
     )
-    print(f"columns: {len(columns_slated_for_conversion_from_source_file)}")
     members_slated_for_conversion_from_source_file = (
-        ifcopenshell.util.selector.filter_elements(
-            ifc_file=ifc4_source_file,
-            query="IfcMember",
-            elements=elements_slated_for_conversion_from_source_file,
-        )
+        elements_slated_for_conversion_from_source_file["IfcMember"]
+    )
+    instrumentation.message(
+        f"members: {len(members_slated_for_conversion_from_source_file)}"
     )
-    print(f"members: {len(members_slated_for_conversion_from_source_file)}")
     slabs_slated_for_conversion_from_source_file = (
-        ifcopenshell.util.selector.filter_elements(
-            ifc_file=ifc4_source_file,
-            query="IfcSlab",
-            elements=elements_slated_for_conversion_from_source_file,
-        )
+        elements_slated_for_conversion_from_source_file["IfcSlab"]
+    )
+    instrumentation.message(
+        f"slabs: {len(slabs_slated_for_conversion_from_source_file)}"
     )
-    print(f"slabs: {len(slabs_slated_for_conversion_from_source_file)}")
     walls_slated_for_conversion_from_source_file = (
-        ifcopenshell.util.selector.filter_elements(
-            ifc_file=ifc4_source_file,
-            query="IfcWall",
-            elements=elements_slated_for_conversion_from_source_file,
-        )
+        elements_slated_for_conversion_from_source_file["IfcWall"]
     )
-    print(f"walls: {len(walls_slated_for_conversion_from_source_file)}")
-
-    # Add StructuralAnalysisModel
-    structural_analysis_model = inlbim.api.structural.add_structural_analysis_model(
-        ifc4_file=ifc4_destination_file,
-        name=None,
+    instrumentation.message(
+        f"walls: {len(walls_slated_for_conversion_from_source_file)}"
     )
 
-    # Track conversion results
-    conversion_results = {}
-
-    # Convert beams
-    num_beams = len(beams_slated_for_conversion_from_source_file)
-    for index, beam_from_source_file in enumerate(
-        list(beams_slated_for_conversion_from_source_file)
+    # Diff against the previous source file (incremental conversion)
+    changes_between_source_files = None
+    if isinstance(previous_ifc4_source_file, ifcopenshell.file) and isinstance(
+        previous_ifc4_destination_file, ifcopenshell.file
     ):
-        print(f"Converting Beam {index+1}/{num_beams} | {beam_from_source_file}")
-        structural_curve_member = convert_linear_frame_member_to_structural_item(
-            frame_member_from_source_file=beam_from_source_file,
-            ifc4_destination_file=ifc4_destination_file,
-            region=region,
-            structural_analysis_model=structural_analysis_model,
-        )
-        conversion_results[beam_from_source_file] = structural_curve_member
+        with instrumentation.span(name="get_changes_between_source_files"):
+            changes_between_source_files = get_changes_between_source_files(
+                elements_slated_for_conversion=[
+                    element
+                    for elements in elements_slated_for_conversion_from_source_file.values()
+                    for element in elements
+                ],
+                previous_elements_slated_for_conversion=[
+                    element
+                    for elements in get_elements_slated_for_conversion(
+                        ifc4_source_file=previous_ifc4_source_file,
+                        element_selection_query=element_selection_query,
+                        element_deselection_query=element_deselection_query,
+                    ).values()
+                    for element in elements
+                ],
+            )
+        if not converted_elements_exist_in_destination_file(
+            ifc4_destination_file=previous_ifc4_destination_file,
+            global_ids=changes_between_source_files["changed"]
+            + changes_between_source_files["deleted"],
+        ):
+            instrumentation.warning(
+                " ".join(
+                    [
+                        "Previous destination file does not contain the converted",
+                        "elements by GlobalId. Falling back to full conversion.",
+                    ]
+                )
+            )
+            changes_between_source_files = None
 
-    # Convert columns
-    num_columns = len(columns_slated_for_conversion_from_source_file)
-    for index, column_from_source_file in enumerate(
-        list(columns_slated_for_conversion_from_source_file)
-    ):
-        print(f"Converting Column {index+1}/{num_columns} | {column_from_source_file}")
-        structural_curve_member = convert_linear_frame_member_to_structural_item(
-            frame_member_from_source_file=column_from_source_file,
-            ifc4_destination_file=ifc4_destination_file,
-            region=region,
-            structural_analysis_model=structural_analysis_model,
-        )
-        conversion_results[column_from_source_file] = structural_curve_member
+    if changes_between_source_files is None:
 
-    # Convert members
-    num_members = len(members_slated_for_conversion_from_source_file)
-    for index, member_from_source_file in enumerate(
-        list(members_slated_for_conversion_from_source_file)
-    ):
-        print(f"Converting Member {index+1}/{num_members}")
-        structural_curve_member = convert_linear_frame_member_to_structural_item(
-            frame_member_from_source_file=member_from_source_file,
-            ifc4_destination_file=ifc4_destination_file,
-            region=region,
-            structural_analysis_model=structural_analysis_model,
+        # Create empty IFC4 StructuralAnalysisView File
+        ifc4_destination_file = inlbim.api.file.create_ifc4_file(
+            model_view_definition="StructuralAnalysisView",
+            precision=1e-4,
         )
-        conversion_results[member_from_source_file] = structural_curve_member
 
-    # Convert slabs
-    num_slabs = len(slabs_slated_for_conversion_from_source_file)
-    for index, slab_from_source_file in enumerate(
-        list(slabs_slated_for_conversion_from_source_file)
-    ):
-        print(f"Converting Slab {index+1}/{num_slabs}")
-        structural_surface_members = convert_planar_slab_or_wall_to_structural_item(
-            slab_or_wall_from_source_file=slab_from_source_file,
-            ifc4_destination_file=ifc4_destination_file,
-            region=region,
-            structural_analysis_model=structural_analysis_model,
-        )
-        conversion_results[slab_from_source_file] = structural_surface_members
+        # Get Project
+        project = ifc4_destination_file.by_type(
+            type="IfcProject", include_subtypes=False
+        )[0]
 
-    # Convert walls
-    num_walls = len(walls_slated_for_conversion_from_source_file)
-    for index, wall_from_source_file in enumerate(
-        list(walls_slated_for_conversion_from_source_file)
-    ):
-        print(f"Converting Wall {index+1}/{num_walls}")
-        structural_surface_members = convert_planar_slab_or_wall_to_structural_item(
-            slab_or_wall_from_source_file=wall_from_source_file,
-            ifc4_destination_file=ifc4_destination_file,
-            region=region,
-            structural_analysis_model=structural_analysis_model,
+        # Add Site
+        site = ifcopenshell.api.root.create_entity(
+            file=ifc4_destination_file,
+            ifc_class="IfcSite",
+            name="Site-01",
+        )
+        ifcopenshell.api.aggregate.assign_object(
+            file=ifc4_destination_file,
+            products=[site],
+            relating_object=project,
+        )
+        inlbim.api.geometry.edit_object_placement(
+            product=site,
+            place_object_relative_to_parent=True,
         )
-        conversion_results[wall_from_source_file] = structural_surface_members
 
-    # Print out ElementTypes
-    print("\nElement Types:")
-    for element_type in ifc4_destination_file.by_type(
-        type="IfcElementType",
-        include_subtypes=True,
-    ):
-        count_of_assignments_for_element_type = len(
-            ifcopenshell.util.element.get_types(type=element_type)
+        # Add StructuralAnalysisModel
+        structural_analysis_model = inlbim.api.structural.add_structural_analysis_model(
+            ifc4_file=ifc4_destination_file,
+            name=None,
         )
-        print(
+
+    else:
+
+        for key in ["added", "changed", "deleted", "unchanged"]:
+            instrumentation.increment(
+                name=f"elements_{key}",
+                amount=len(changes_between_source_files[key]),
+            )
+        instrumentation.message(
             " ".join(
                 [
-                    f"\telement_type: {element_type.to_string()}",
-                    f"assigned {count_of_assignments_for_element_type} times",
+                    "Incremental conversion:",
+                    f"{len(changes_between_source_files['added'])} added,",
+                    f"{len(changes_between_source_files['changed'])} changed,",
+                    f"{len(changes_between_source_files['deleted'])} deleted,",
+                    f"{len(changes_between_source_files['unchanged'])} unchanged",
                 ]
             )
         )
 
+        # Update previous IFC4 StructuralAnalysisView File in place
+        assert isinstance(previous_ifc4_destination_file, ifcopenshell.file)
+        ifc4_destination_file = previous_ifc4_destination_file
+        structural_analysis_model = ifc4_destination_file.by_type(
+            type="IfcStructuralAnalysisModel", include_subtypes=False
+        )[0]
+
+        # Remove converted elements that were changed or deleted
+        with instrumentation.span(
+            name="remove_converted_elements_from_destination_file"
+        ):
+            remove_converted_elements_from_destination_file(
+                ifc4_destination_file=ifc4_destination_file,
+                global_ids=changes_between_source_files["changed"]
+                + changes_between_source_files["deleted"],
+            )
+
+        # Nodes that existed before conversion
+        ids_of_previous_structural_point_connections = {
+            structural_point_connection.id()
+            for structural_point_connection in ifc4_destination_file.by_type(
+                type="IfcStructuralPointConnection", include_subtypes=False
+            )
+        }
+
+        # Only convert added or changed elements
+        global_ids_to_convert = set(
+            changes_between_source_files["added"]
+            + changes_between_source_files["changed"]
+        )
+        beams_slated_for_conversion_from_source_file = [
+            element
+            for element in beams_slated_for_conversion_from_source_file
+            if element.GlobalId in global_ids_to_convert
+        ]
+        columns_slated_for_conversion_from_source_file = [
+            element
+            for element in columns_slated_for_conversion_from_source_file
+            if element.GlobalId in global_ids_to_convert
+        ]
+        members_slated_for_conversion_from_source_file = [
+            element
+            for element in members_slated_for_conversion_from_source_file
+            if element.GlobalId in global_ids_to_convert
+        ]
+        slabs_slated_for_conversion_from_source_file = [
+            element
+            for element in slabs_slated_for_conversion_from_source_file
+            if element.GlobalId in global_ids_to_convert
+        ]
+        walls_slated_for_conversion_from_source_file = [
+            element
+            for element in walls_slated_for_conversion_from_source_file
+            if element.GlobalId in global_ids_to_convert
+        ]
+
+    # Analyze geometry of elements (tessellated in a single pass per process)
+    with instrumentation.span(name="analyze_geometry_of_elements"):
+        geometric_analyses = analyze_geometry_of_elements(
+            ifc4_source_file=ifc4_source_file,
+            elements=beams_slated_for_conversion_from_source_file
+            + columns_slated_for_conversion_from_source_file
+            + members_slated_for_conversion_from_source_file
+            + slabs_slated_for_conversion_from_source_file
+            + walls_slated_for_conversion_from_source_file,
+            numeric_scale=inlbim.util.file.get_numeric_scale_of_project(
+                ifc4_file=ifc4_destination_file
+            ),
+            workers=workers,
+            tessellation_cache_directory=tessellation_cache_directory,
+            shape_classification_cache_directory=shape_classification_cache_directory,
+            time_budget_per_element=time_budget_per_element,
+            memory_budget_per_element=memory_budget_per_element,
+            instrumentation=instrumentation,
+        )
+
+    # Memoize standard material and profile names resolved from element metadata
+    resolution_cache = inlbim.util.library.ResolutionCache()
+
+    # Reuse coincident StructuralPointConnections as they are created
+    structural_point_connection_registry = (
+        inlbim.util.structural.StructuralPointConnectionRegistry(
+            ifc4_sav_file=ifc4_destination_file
+        )
+    )
+
+    # Track conversion results (and reasons of failures, if they are isolated)
+    conversion_results = {}
+    reasons_of_failed_conversions = {}
+    failures_are_isolated = (
+        time_budget_per_element is not None or memory_budget_per_element is not None
+    )
+
+    # Convert beams, columns, members, slabs, and walls
+    for (
+        label,
+        elements_slated_for_conversion,
+        convert_element_to_structural_item,
+        keyword_of_element,
+    ) in [
+        (
+            "beam",
+            beams_slated_for_conversion_from_source_file,
+            convert_linear_frame_member_to_structural_item,
+            "frame_member_from_source_file",
+        ),
+        (
+            "column",
+            columns_slated_for_conversion_from_source_file,
+            convert_linear_frame_member_to_structural_item,
+            "frame_member_from_source_file",
+        ),
+        (
+            "member",
+            members_slated_for_conversion_from_source_file,
+            convert_linear_frame_member_to_structural_item,
+            "frame_member_from_source_file",
+        ),
+        (
+            "slab",
+            slabs_slated_for_conversion_from_source_file,
+            convert_planar_slab_or_wall_to_structural_item,
+            "slab_or_wall_from_source_file",
+        ),
+        (
+            "wall",
+            walls_slated_for_conversion_from_source_file,
+            convert_planar_slab_or_wall_to_structural_item,
+            "slab_or_wall_from_source_file",
+        ),
+    ]:
+        num_elements = len(elements_slated_for_conversion)
+        with instrumentation.span(name=f"convert_{label}s"):
+            for index, element_from_source_file in enumerate(
+                elements_slated_for_conversion
+            ):
+                instrumentation.message(
+                    " ".join(
+                        [
+                            f"Converting {label.capitalize()}",
+                            f"{index+1}/{num_elements} | {element_from_source_file}",
+                        ]
+                    )
+                )
+                with instrumentation.span(
+                    name=f"convert_{label}",
+                    global_id=element_from_source_file.GlobalId,
+                ):
+                    try:
+                        structural_items = convert_element_to_structural_item(
+                            **{keyword_of_element: element_from_source_file},
+                            ifc4_destination_file=ifc4_destination_file,
+                            region=region,
+                            structural_analysis_model=structural_analysis_model,
+                            geometric_analysis=geometric_analyses.get(
+                                element_from_source_file.GlobalId
+                            ),
+                            resolution_cache=resolution_cache,
+                            structural_point_connection_registry=structural_point_connection_registry,
+                            instrumentation=instrumentation,
+                        )
+                    except Exception as exception:
+                        if not failures_are_isolated:
+                            raise
+                        structural_items = None
+                        reasons_of_failed_conversions[element_from_source_file] = (
+                            f"{type(exception).__name__}: {exception}"
+                        )
+                conversion_results[element_from_source_file] = structural_items
+
+    # Print out ElementTypes
+    if instrumentation.verbose:
+        instrumentation.message("\nElement Types:")
+        for element_type in ifc4_destination_file.by_type(
+            type="IfcElementType",
+            include_subtypes=True,
+        ):
+            count_of_assignments_for_element_type = len(
+                ifcopenshell.util.element.get_types(type=element_type)
+            )
+            instrumentation.message(
+                " ".join(
+                    [
+                        f"\telement_type: {element_type.to_string()}",
+                        f"assigned {count_of_assignments_for_element_type} times",
+                    ]
+                )
+            )
+
     # Print out Conversion Results
-    print("\nConversion Results:")
+    instrumentation.message("\nConversion Results:")
     for key, value in conversion_results.items():
         if value:
             result = "OK"
+            instrumentation.increment(name="elements_converted")
         else:
             result = "NG"
-        print(f"\t{key.GlobalId} {key.is_a()}: {result}")
+            instrumentation.increment(name="elements_not_converted")
+            if key in reasons_of_failed_conversions:
+                result += f" ({reasons_of_failed_conversions[key]})"
+                instrumentation.warning(
+                    f"{key.GlobalId} {key.is_a()}: {result}",
+                    global_id=key.GlobalId,
+                    reason=reasons_of_failed_conversions[key],
+                )
+        instrumentation.message(f"\t{key.GlobalId} {key.is_a()}: {result}")
+        conversion_report[key.GlobalId] = {
+            "ifc_class": key.is_a(),
+            "converted": bool(value),
+            "reason": reasons_of_failed_conversions.get(key),
+        }
+    instrumentation.increment(
+        name="resolution_cache_hits", amount=resolution_cache.hits
+    )
+    instrumentation.increment(
+        name="resolution_cache_misses", amount=resolution_cache.misses
+    )
+    instrumentation.increment(
+        name="reused_structural_point_connections",
+        amount=structural_point_connection_registry.hits,
+    )
+    instrumentation.message(
+        " ".join(
+            [
+                "\nResolution cache of standard names:",
+                f"{resolution_cache.hits} hits,",
+                f"{resolution_cache.misses} misses",
+            ]
+        )
+    )
+    instrumentation.message(
+        " ".join(
+            [
+                "Reused StructuralPointConnections:",
+                f"{structural_point_connection_registry.hits}",
+            ]
+        )
+    )
 
     # Merge Nodes
-    inlbim.api.structural.merge_all_coincident_structural_point_connections(
-        ifc4sav_file=ifc4_destination_file
-    )
+    with instrumentation.span(name="merge_all_coincident_structural_point_connections"):
+        if changes_between_source_files is None:
+            inlbim.api.structural.merge_all_coincident_structural_point_connections(
+                ifc4sav_file=ifc4_destination_file
+            )
+        else:
+            inlbim.api.structural.merge_all_coincident_structural_point_connections(
+                ifc4sav_file=ifc4_destination_file,
+                structural_point_connections=get_structural_point_connections_in_affected_region(
+                    ifc4_destination_file=ifc4_destination_file,
+                    ids_of_previous_structural_point_connections=ids_of_previous_structural_point_connections,
+                ),
+            )
+
+    instrumentation.emit_summary()
 
     return ifc4_destination_file
+
+
+def get_elements_slated_for_conversion(
+    ifc4_source_file: ifcopenshell.file,
+    element_selection_query: str = "IfcColumn, IfcSlab, IfcWall, IfcBeam, IfcMember",
+    element_deselection_query: str | None = None,
+) -> dict[str, list[ifcopenshell.entity_instance]]:
+    """Get dictionary of IFC classes (IfcBeam, IfcColumn, IfcMember, IfcSlab,
+    IfcWall) mapped to the elements slated for conversion"""
+
+    return (
+        inlbim.util.element.get_dictionary_of_ifc_classes_mapped_to_selected_elements(
+            ifc4_file=ifc4_source_file,
+            ifc_classes=["IfcBeam", "IfcColumn", "IfcMember", "IfcSlab", "IfcWall"],
+            selection_query=element_selection_query,
+            deselection_query=element_deselection_query,
+        )
+    )
@@ -0,0 +1,537 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+"""Module to analyze the geometry of source elements, optionally across worker
+processes. The analysis only reads the source file and returns plain data keyed
+by GlobalId; all writes to the destination file happen afterwards in the parent
+process, in the original order, so the result does not depend on the number of
+workers.
+
+With a time or memory budget per element, each element is analyzed on its own
+in a worker process. Workers that exceed the time budget are killed and
+replaced, and so are workers that die (e.g., from running out of memory), so
+that a pathological element cannot hang or abort the whole batch."""
+
+import ifcopenshell
+import concurrent.futures
+import multiprocessing
+import multiprocessing.connection
+import pickle
+import time
+import numpy as np
+import inlbim.util.instrumentation
+from bim2fem.helpers.convert_frame_member_to_structural_item import (
+    analyze_geometry_of_linear_frame_member,
+    frame_member_requires_triangular_mesh,
+    get_ifc_class_of_copied_frame_member,
+)
+from bim2fem.helpers.convert_slab_or_wall_to_strucutral_item import (
+    analyze_geometry_of_planar_slab_or_wall,
+)
+from bim2fem.helpers.beam_shape_classification import ShapeClassificationCache
+from inlbim.util.geometry import TriangularMesh, TriangularMeshCache
+
+# Source file, numeric scale, and caches held by each worker process
+_source_file_of_worker: ifcopenshell.file | None = None
+_numeric_scale_of_worker: int | None = None
+_tessellation_cache_of_worker: TriangularMeshCache | None = None
+_shape_classification_cache_of_worker: ShapeClassificationCache | None = None
+_number_of_threads_of_worker: int | None = None
+
+
+def analyze_geometry_of_element(
+    element: ifcopenshell.entity_instance,
+    numeric_scale: int,
+    triangular_mesh: TriangularMesh | None = None,
+    shape_classification_cache: ShapeClassificationCache | None = None,
+) -> dict | None:
+    """Analyze the geometry of a frame member, slab, or wall. Exceptions are
+    captured in the result so that they can be raised when the element is
+    committed to the destination file"""
+
+    try:
+        if element.is_a("IfcSlab") or element.is_a("IfcWall"):
+            geometric_analysis = analyze_geometry_of_planar_slab_or_wall(
+                slab_or_wall_from_source_file=element,
+                numeric_scale=numeric_scale,
+                triangular_mesh=triangular_mesh,
+            )
+        elif get_ifc_class_of_copied_frame_member(
+            frame_member_from_source_file=element
+        ):
+            geometric_analysis = analyze_geometry_of_linear_frame_member(
+                frame_member_from_source_file=element,
+                numeric_scale=numeric_scale,
+                triangular_mesh=triangular_mesh,
+                shape_classification_cache=shape_classification_cache,
+            )
+        else:
+            geometric_analysis = None
+    except Exception as exception:
+        geometric_analysis = {"exception": exception}
+
+    return geometric_analysis
+
+
+def tessellate_elements_requiring_triangular_mesh(
+    elements: list[ifcopenshell.entity_instance],
+    tessellation_cache: TriangularMeshCache | None = None,
+    number_of_threads: int | None = None,
+) -> dict[str, TriangularMesh]:
+    """Tessellate slabs, walls and frame members whose analysis needs a mesh in a
+    single pass, with number_of_threads threads (by default, one per CPU).
+    Returns a dictionary of GlobalIds mapped to TriangularMeshes"""
+
+    elements_requiring_triangular_mesh = []
+    for element in elements:
+        try:
+            if element.is_a("IfcSlab") or element.is_a("IfcWall"):
+                elements_requiring_triangular_mesh.append(element)
+            elif get_ifc_class_of_copied_frame_member(
+                frame_member_from_source_file=element
+            ) and frame_member_requires_triangular_mesh(
+                frame_member_from_source_file=element
+            ):
+                elements_requiring_triangular_mesh.append(element)
+        except Exception:
+            # Left to the analysis of the element, which captures the exception
+            continue
+
+    return TriangularMesh.from_ifc_elements(
+        elements=elements_requiring_triangular_mesh,
+        cache=tessellation_cache,
+        number_of_threads=number_of_threads,
+    )
+
+
+def analyze_geometry_of_elements(
+    ifc4_source_file: ifcopenshell.file,
+    elements: list[ifcopenshell.entity_instance],
+    numeric_scale: int,
+    workers: int = 1,
+    tessellation_cache_directory: str | None = None,
+    shape_classification_cache_directory: str | None = None,
+    time_budget_per_element: float | None = None,
+    memory_budget_per_element: int | None = None,
+    instrumentation: inlbim.util.instrumentation.Instrumentation | None = None,
+) -> dict[str, dict | None]:
+    """Analyze the geometry of elements, with a pool of worker processes if
+    workers > 1. Each process tessellates its elements in a single pass, skipping
+    those found in the tessellation cache (if a directory is given), and
+    classifies each distinct beam cross-section once (persisted across runs if
+    a directory is given). Returns a dictionary of GlobalIds mapped to
+    geometric analyses
+
+    If time_budget_per_element (in seconds) or memory_budget_per_element (in
+    bytes of address space that a worker may grow by) is given, elements are
+    analyzed one at a time by at least one worker process. The analyses of
+    elements that exceed the budget hold the exception that explains why.
+
+    The hits and misses of the caches, summed over the processes, are reported
+    to the instrumentation (if given)."""
+
+    if instrumentation is None:
+        instrumentation = inlbim.util.instrumentation.Instrumentation()
+
+    global_ids = [element.GlobalId for element in elements]
+    is_within_budget = (
+        time_budget_per_element is not None or memory_budget_per_element is not None
+    )
+
+    # Serial
+    if (workers <= 1 or len(global_ids) <= 1) and not is_within_budget:
+        tessellation_cache = (
+            TriangularMeshCache(directory=tessellation_cache_directory)
+            if tessellation_cache_directory
+            else None
+        )
+        triangular_meshes = tessellate_elements_requiring_triangular_mesh(
+            elements=elements,
+            tessellation_cache=tessellation_cache,
+        )
+        shape_classification_cache = ShapeClassificationCache(
+            numeric_scale=numeric_scale,
+            directory=shape_classification_cache_directory,
+        )
+        geometric_analyses = {
+            element.GlobalId: analyze_geometry_of_element(
+                element=element,
+                numeric_scale=numeric_scale,
+                triangular_mesh=triangular_meshes.get(element.GlobalId),
+                shape_classification_cache=shape_classification_cache,
+            )
+            for element in elements
+        }
+        for name, amount in get_counters_of_caches(
+            tessellation_cache=tessellation_cache,
+            shape_classification_cache=shape_classification_cache,
+        ).items():
+            instrumentation.increment(name=name, amount=amount)
+        return geometric_analyses
+
+    # Split into chunks (several per worker to balance uneven elements)
+    number_of_chunks = min(len(global_ids), workers * 4)
+    chunks_of_global_ids = [
+        chunk.tolist() for chunk in np.array_split(global_ids, number_of_chunks)
+    ]
+
+    # Share the CPUs between the workers, which tessellate concurrently
+    number_of_threads_of_worker = max(multiprocessing.cpu_count() // max(workers, 1), 1)
+
+    # Share the source file with the workers. Forked workers inherit the parsed
+    # file as is. Otherwise, the file is re-parsed from a string, which does not
+    # round-trip the last digits of every real number (and thus the tessellation)
+    global _source_file_of_worker
+    if "fork" in multiprocessing.get_all_start_methods():
+        multiprocessing_context = multiprocessing.get_context("fork")
+        _source_file_of_worker = ifc4_source_file
+        initargs = (
+            None,
+            numeric_scale,
+            tessellation_cache_directory,
+            shape_classification_cache_directory,
+            number_of_threads_of_worker,
+        )
+    else:
+        multiprocessing_context = multiprocessing.get_context("spawn")
+        initargs = (
+            ifc4_source_file.to_string(),
+            numeric_scale,
+            tessellation_cache_directory,
+            shape_classification_cache_directory,
+            number_of_threads_of_worker,
+        )
+
+    # Parallel, one element at a time within the budget
+    if is_within_budget:
+        try:
+            return analyze_geometry_of_elements_within_budget(
+                global_ids=global_ids,
+                workers=max(workers, 1),
+                multiprocessing_context=multiprocessing_context,
+                initargs=initargs,
+                time_budget_per_element=time_budget_per_element,
+                memory_budget_per_element=memory_budget_per_element,
+                instrumentation=instrumentation,
+            )
+        finally:
+            _source_file_of_worker = None
+
+    # Parallel
+    geometric_analyses = {}
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing_context,
+            initializer=_initialize_worker,
+            initargs=initargs,
+        ) as executor:
+            for results_of_chunk, counters_of_chunk in executor.map(
+                _analyze_geometry_of_chunk_of_elements,
+                chunks_of_global_ids,
+            ):
+                for global_id, geometric_analysis in results_of_chunk:
+                    geometric_analyses[global_id] = geometric_analysis
+                for name, amount in counters_of_chunk.items():
+                    instrumentation.increment(name=name, amount=amount)
+    finally:
+        _source_file_of_worker = None
+
+    return geometric_analyses
+
+
+def get_counters_of_caches(
+    tessellation_cache: TriangularMeshCache | None = None,
+    shape_classification_cache: ShapeClassificationCache | None = None,
+) -> dict[str, int]:
+    """Returns the hits and misses of the caches, keyed by counter name"""
+
+    counters = {}
+    if tessellation_cache is not None:
+        counters["tessellation_cache_hits"] = tessellation_cache.hits
+        counters["tessellation_cache_misses"] = tessellation_cache.misses
+    if shape_classification_cache is not None:
+        counters["shape_classification_cache_hits"] = shape_classification_cache.hits
+        counters["shape_classification_cache_misses"] = (
+            shape_classification_cache.misses
+        )
+
+    return counters
+
+
+def analyze_geometry_of_elements_within_budget(
+    global_ids: list[str],
+    workers: int,
+    multiprocessing_context: multiprocessing.context.BaseContext,
+    initargs: tuple,
+    time_budget_per_element: float | None = None,
+    memory_budget_per_element: int | None = None,
+    instrumentation: inlbim.util.instrumentation.Instrumentation | None = None,
+) -> dict[str, dict | None]:
+    """Hand out elements one at a time to worker processes. A worker that exceeds
+    the time budget is killed, and a worker that dies is replaced; in both cases
+    the analysis of its element holds the reason. The clock of an element starts
+    when it is handed out, so the initialization of workers does not count"""
+
+    if instrumentation is None:
+        instrumentation = inlbim.util.instrumentation.Instrumentation()
+
+    geometric_analyses = {}
+    global_ids_to_analyze = list(reversed(global_ids))
+    # Connection -> {"process", "is_ready", "global_id", "start_time"}
+    workers_of_connections = {}
+
+    def start_worker():
+        connection, connection_of_worker = multiprocessing_context.Pipe()
+        process = multiprocessing_context.Process(
+            target=_run_worker_within_budget,
+            args=(connection_of_worker, initargs, memory_budget_per_element),
+            daemon=True,
+        )
+        process.start()
+        connection_of_worker.close()
+        workers_of_connections[connection] = {
+            "process": process,
+            "is_ready": False,
+            "global_id": None,
+            "start_time": None,
+        }
+
+    def replace_worker(connection):
+        worker = workers_of_connections.pop(connection)
+        worker["process"].kill()
+        worker["process"].join()
+        connection.close()
+        if len(global_ids_to_analyze) > 0:
+            start_worker()
+
+    try:
+        for _ in range(min(workers, len(global_ids))):
+            start_worker()
+
+        while len(workers_of_connections) > 0:
+
+            # Hand out elements to idle workers (and stop those left without work)
+            for connection, worker in list(workers_of_connections.items()):
+                if not worker["is_ready"] or worker["global_id"] is not None:
+                    continue
+                if len(global_ids_to_analyze) == 0:
+                    connection.send(None)
+                    worker["process"].join()
+                    connection.close()
+                    del workers_of_connections[connection]
+                    continue
+                worker["global_id"] = global_ids_to_analyze.pop()
+                worker["start_time"] = time.monotonic()
+                connection.send(worker["global_id"])
+            if len(workers_of_connections) == 0:
+                break
+
+            # Wait for results until the earliest deadline
+            timeout = None
+            if time_budget_per_element is not None:
+                start_times = [
+                    worker["start_time"]
+                    for worker in workers_of_connections.values()
+                    if worker["global_id"] is not None
+                ]
+                if len(start_times) > 0:
+                    timeout = max(
+                        min(start_times) + time_budget_per_element - time.monotonic(),
+                        0.0,
+                    )
+            for connection in multiprocessing.connection.wait(
+                list(workers_of_connections), timeout=timeout
+            ):
+                worker = workers_of_connections[connection]
+                try:
+                    message = connection.recv()
+                except (EOFError, OSError):
+                    if not worker["is_ready"]:
+                        raise RuntimeError("Worker process died while initializing")
+                    replace_worker(connection=connection)
+                    if worker["global_id"] is None:
+                        continue
+                    geometric_analyses[worker["global_id"]] = {
+                        "exception": RuntimeError(
+                            " ".join(
+                                [
+                                    "Worker process died while analyzing the",
+                                    "element (exit code",
+                                    f"{worker['process'].exitcode}),",
+                                    "e.g., because it exceeded the memory budget",
+                                ]
+                            )
+                        )
+                    }
+                    continue
+                if not worker["is_ready"]:
+                    worker["is_ready"] = True
+                    continue
+                global_id, geometric_analysis, counters_of_element = message
+                geometric_analyses[global_id] = geometric_analysis
+                for name, amount in counters_of_element.items():
+                    instrumentation.increment(name=name, amount=amount)
+                worker["global_id"] = None
+                worker["start_time"] = None
+
+            # Kill workers that exceeded the time budget
+            if time_budget_per_element is None:
+                continue
+            for connection, worker in list(workers_of_connections.items()):
+                if worker["global_id"] is None:
+                    continue
+                if time.monotonic() - worker["start_time"] < time_budget_per_element:
+                    continue
+                geometric_analyses[worker["global_id"]] = {
+                    "exception": TimeoutError(
+                        " ".join(
+                            [
+                                "Geometric analysis exceeded the time budget of",
+                                f"{time_budget_per_element} s",
+                            ]
+                        )
+                    )
+                }
+                replace_worker(connection=connection)
+
+    finally:
+        for connection, worker in workers_of_connections.items():
+            worker["process"].kill()
+            worker["process"].join()
+            connection.close()
+
+    return {global_id: geometric_analyses.get(global_id) for global_id in global_ids}
+
+
+def _run_worker_within_budget(
+    connection: multiprocessing.connection.Connection,
+    initargs: tuple,
+    memory_budget_per_element: int | None,
+):
+
+    _initialize_worker(*initargs)
+    if memory_budget_per_element is not None:
+        _limit_address_space_of_worker(
+            memory_budget_per_element=memory_budget_per_element
+        )
+    connection.send("ready")
+
+    while True:
+        global_id = connection.recv()
+        if global_id is None:
+            break
+        results_of_chunk, counters_of_chunk = _analyze_geometry_of_chunk_of_elements(
+            global_ids=[global_id]
+        )
+        connection.send((*results_of_chunk[0], counters_of_chunk))
+
+
+def _limit_address_space_of_worker(memory_budget_per_element: int):
+    """Cap the address space of the worker at its size after initialization plus
+    the budget, so that allocations beyond it fail (or the worker dies) instead
+    of exhausting the memory of the machine. Only supported on Linux"""
+
+    try:
+        import resource
+
+        with open("/proc/self/statm") as statm_file:
+            size_in_pages = int(statm_file.read().split()[0])
+    except (ImportError, OSError):
+        return
+
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+    limit = size_in_pages * resource.getpagesize() + memory_budget_per_element
+    if hard_limit != resource.RLIM_INFINITY:
+        limit = min(limit, hard_limit)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard_limit))
+
+
+def _initialize_worker(
+    source_file_as_string: str | None,
+    numeric_scale: int,
+    tessellation_cache_directory: str | None,
+    shape_classification_cache_directory: str | None,
+    number_of_threads: int,
+):
+
+    global _source_file_of_worker, _numeric_scale_of_worker
+    global _tessellation_cache_of_worker, _shape_classification_cache_of_worker
+    global _number_of_threads_of_worker
+    if source_file_as_string is not None:
+        _source_file_of_worker = ifcopenshell.file.from_string(source_file_as_string)
+    _numeric_scale_of_worker = numeric_scale
+    if tessellation_cache_directory:
+        _tessellation_cache_of_worker = TriangularMeshCache(
+            directory=tessellation_cache_directory
+        )
+    _shape_classification_cache_of_worker = ShapeClassificationCache(
+        numeric_scale=numeric_scale,
+        directory=shape_classification_cache_directory,
+    )
+    _number_of_threads_of_worker = number_of_threads
+
+
+def _analyze_geometry_of_chunk_of_elements(
+    global_ids: list[str],
+) -> tuple[list[tuple[str, dict | None]], dict[str, int]]:
+    """Returns the analyses of the chunk, and the hits and misses of the caches
+    of the worker over the chunk"""
+
+    assert isinstance(_source_file_of_worker, ifcopenshell.file)
+    assert isinstance(_numeric_scale_of_worker, int)
+
+    counters_before_chunk = get_counters_of_caches(
+        tessellation_cache=_tessellation_cache_of_worker,
+        shape_classification_cache=_shape_classification_cache_of_worker,
+    )
+
+    elements = [_source_file_of_worker.by_guid(global_id) for global_id in global_ids]
+    triangular_meshes = tessellate_elements_requiring_triangular_mesh(
+        elements=elements,
+        tessellation_cache=_tessellation_cache_of_worker,
+        number_of_threads=_number_of_threads_of_worker,
+    )
+
+    results_of_chunk = []
+    for global_id, element in zip(global_ids, elements):
+        geometric_analysis = analyze_geometry_of_element(
+            element=element,
+            numeric_scale=_numeric_scale_of_worker,
+            triangular_mesh=triangular_meshes.get(global_id),
+            shape_classification_cache=_shape_classification_cache_of_worker,
+        )
+        results_of_chunk.append(
+            (global_id, _make_geometric_analysis_picklable(geometric_analysis))
+        )
+
+    counters_of_chunk = {
+        name: amount - counters_before_chunk[name]
+        for name, amount in get_counters_of_caches(
+            tessellation_cache=_tessellation_cache_of_worker,
+            shape_classification_cache=_shape_classification_cache_of_worker,
+        ).items()
+    }
+
+    return results_of_chunk, counters_of_chunk
+
+
+def _make_geometric_analysis_picklable(
+    geometric_analysis: dict | None,
+) -> dict | None:
+    """Replace captured exceptions that cannot cross process boundaries"""
+
+    if not isinstance(geometric_analysis, dict):
+        return geometric_analysis
+
+    picklable_geometric_analysis = {}
+    for key, value in geometric_analysis.items():
+        if isinstance(value, dict):
+            value = _make_geometric_analysis_picklable(value)
+        elif isinstance(value, BaseException):
+            try:
+                pickle.loads(pickle.dumps(value))
+            except Exception:
+                value = RuntimeError(f"{type(value).__name__}: {value}")
+        picklable_geometric_analysis[key] = value
+
+    return picklable_geometric_analysis
@@ -1,12 +1,14 @@
 # Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
 
-from shapely.geometry import Polygon, Point
 import ifcopenshell.util.placement
 import numpy as np
 import inlbim.util.geometry
 from typing import Literal
 import math
-
+import hashlib
+import json
+import os
+from fractions import Fraction
 
 PRESET_SHAPE_MATRICES = {
     "C_SHAPE": [
@@ -57,45 +59,276 @@ PRESET_SHAPE_LABEL = Literal[
 ]
 
 
+def get_bitmask_of_shape_matrix(shape_matrix: list[list[int]]) -> int:
+    """Bit (3 * row + col) is set for each activated grid cell"""
+
+    return sum(
+        1 << (3 * row + col)
+        for row in range(3)
+        for col in range(3)
+        if shape_matrix[row][col]
+    )
+
+
+def get_matching_shapes_of_bitmasks() -> dict[int, tuple[str, int]]:
+    """Map the bitmask of each rotation of the preset shapes to the preset shape
+    name and the number of 90 degree clockwise rotations of the shape matrix of
+    the faces that makes it match. If several rotations match the same bitmask,
+    the fewest rotations win, and then the order of PRESET_SHAPE_MATRICES"""
+
+    matching_shapes_of_bitmasks = {}
+    for number_of_rotations in range(4):
+        for preset_shape_name, preset_shape_matrix in PRESET_SHAPE_MATRICES.items():
+            # Rotating the faces clockwise is rotating the preset counterclockwise
+            rotated_preset_shape_matrix = preset_shape_matrix
+            for _ in range(3 * number_of_rotations):
+                rotated_preset_shape_matrix = rotate_matrix_90_clockwise(
+                    matrix=rotated_preset_shape_matrix
+                )
+            matching_shapes_of_bitmasks.setdefault(
+                get_bitmask_of_shape_matrix(shape_matrix=rotated_preset_shape_matrix),
+                (preset_shape_name, number_of_rotations),
+            )
+
+    return matching_shapes_of_bitmasks
+
+
+def transform_faces_with_transformation_matrix(
+    transformation_matrix: np.ndarray,
+    faces_defined_by_vertex_coordinates: (
+        list[list[tuple[float, float, float]]] | np.ndarray
+    ),
+) -> np.ndarray:
+    """Multiply the vertices of all faces by the transpose of the transformation
+    matrix at once. Returns an (M, 3, 3) array of transformed vertices"""
+
+    vertex_coordinates = np.asarray(
+        faces_defined_by_vertex_coordinates, dtype=np.float64
+    ).reshape(-1, 3)
+    transformed_vertex_coordinates = (
+        np.column_stack((vertex_coordinates, np.ones(len(vertex_coordinates))))
+        @ transformation_matrix
+    )
+
+    return transformed_vertex_coordinates[:, :3].reshape(-1, 3, 3)
+
+
+def calculate_signs_of_orientations(
+    a: np.ndarray,
+    b: np.ndarray,
+    c: np.ndarray,
+) -> np.ndarray:
+    """Signs of (b - a) x (c - a) for broadcastable arrays of 2D points, exact for
+    the given floats. Determinants within the floating-point error bound are
+    recomputed with rational arithmetic, so that points touching an edge are
+    not misclassified"""
+
+    a, b, c = np.broadcast_arrays(a, b, c)
+    left = (b[..., 0] - a[..., 0]) * (c[..., 1] - a[..., 1])
+    right = (b[..., 1] - a[..., 1]) * (c[..., 0] - a[..., 0])
+    determinants = left - right
+    signs = np.sign(determinants)
+
+    # Error bound of Shewchuk's orientation predicate
+    error_bounds = (3.0 + 16.0 * 2.0**-53) * 2.0**-53 * (np.abs(left) + np.abs(right))
+    for index in zip(*np.nonzero(np.abs(determinants) <= error_bounds)):
+        (ax, ay), (bx, by), (cx, cy) = (
+            [Fraction(val) for val in point[index].tolist()] for point in (a, b, c)
+        )
+        determinant = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+        signs[index] = (determinant > 0) - (determinant < 0)
+
+    return signs
+
+
+def get_bitmask_of_triangles_on_grid(
+    triangles: np.ndarray,
+) -> int:
+    """Rasterize (M, 3, 2) triangles onto a 3x3 grid spanning their bounding box.
+    A grid cell is activated if a closed triangle intersects the closed cell
+    (touching counts), tested for all triangles and cells at once with the
+    separating axis theorem"""
+
+    x_min, y_min = triangles.reshape(-1, 2).min(axis=0).tolist()
+    x_max, y_max = triangles.reshape(-1, 2).max(axis=0).tolist()
+
+    # Corners of grid cells, ordered by bit
+    x_delta = (x_max - x_min) / 3.0
+    y_delta = (y_max - y_min) / 3.0
+    x_starts = np.array([x_min + col * x_delta for col in range(3)] * 3)
+    y_starts = np.repeat([y_max - row * y_delta for row in range(3)], 3)
+    x_ends = x_starts + x_delta
+    y_ends = y_starts - y_delta
+    corners_of_cells = np.stack(
+        (
+            np.column_stack((x_starts, y_starts)),
+            np.column_stack((x_starts, y_ends)),
+            np.column_stack((x_ends, y_ends)),
+            np.column_stack((x_ends, y_starts)),
+        ),
+        axis=1,
+    )
+
+    # Separating axes x and y: (M, 9)
+    overlaps = (
+        (triangles[:, :, 0].min(axis=1)[:, np.newaxis] <= x_ends)
+        & (triangles[:, :, 0].max(axis=1)[:, np.newaxis] >= x_starts)
+        & (triangles[:, :, 1].min(axis=1)[:, np.newaxis] <= y_starts)
+        & (triangles[:, :, 1].max(axis=1)[:, np.newaxis] >= y_ends)
+    )
+
+    # Separating axes normal to the edges of the triangles
+    orientations_of_triangles = calculate_signs_of_orientations(
+        a=triangles[:, 0],
+        b=triangles[:, 1],
+        c=triangles[:, 2],
+    )
+    for index_of_start in range(3):
+        starts = triangles[:, index_of_start, np.newaxis, np.newaxis]
+        ends = triangles[:, (index_of_start + 1) % 3, np.newaxis, np.newaxis]
+        # Side of each corner of each cell: (M, 9, 4)
+        sides_of_corners = calculate_signs_of_orientations(
+            a=starts,
+            b=ends,
+            c=corners_of_cells[np.newaxis],
+        )
+        # Degenerate triangles are segments, separated if all corners are on one side
+        separated_on_outer_side = np.all(
+            sides_of_corners * orientations_of_triangles[:, np.newaxis, np.newaxis]
+            < 0.0,
+            axis=2,
+        )
+        separated_on_either_side = np.all(sides_of_corners < 0.0, axis=2) | np.all(
+            sides_of_corners > 0.0, axis=2
+        )
+        overlaps &= ~np.where(
+            (orientations_of_triangles == 0.0)[:, np.newaxis],
+            separated_on_either_side,
+            separated_on_outer_side,
+        )
+
+    activated_cells = np.flatnonzero(overlaps.any(axis=0))
+
+    return int(np.sum(1 << activated_cells))
+
+
+class ShapeClassificationCache:
+    """Cache of beam cross-section classifications and measured dimensions.
+
+    Entries are keyed by a hash of the faces projected onto the plane of the
+    cross-section, translated to the origin of their bounding box and quantized
+    to the numeric scale, so members sharing a cross-section are analyzed once
+    whatever their position. Rotation is normalized by projecting onto the
+    assumed local axes. If directory is given, entries are also stored there as
+    .json files, so they persist across runs and are shared by worker
+    processes."""
+
+    # Bump to invalidate all entries, e.g., when the classification changes
+    VERSION = 1
+
+    # The circle check of these shapes depends on the position of the faces
+    PRESET_SHAPES_WITH_POSITION_DEPENDENT_MEASUREMENT = (
+        "H_CIRCLE_OR_H_RECT",
+        "CIRCLE_OR_RECT",
+    )
+
+    def __init__(
+        self,
+        numeric_scale: int = 4,
+        directory: str | None = None,
+    ):
+        self.numeric_scale = numeric_scale
+        self.directory = directory
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def calculate_key_of_faces(
+        self,
+        transformed_faces: np.ndarray,
+        purpose: str,
+    ) -> str:
+        """Hash (M, 3, 2+) faces projected onto the plane of the cross-section.
+        The order of faces and of the vertices of each face does not matter"""
+
+        footprint = np.asarray(transformed_faces, dtype=np.float64)[:, :, :2]
+        footprint = np.round(
+            (footprint - footprint.reshape(-1, 2).min(axis=0))
+            * 10.0**self.numeric_scale
+        ).astype(np.int64)
+
+        # Sort vertices of each face, then faces
+        vertex_order = np.lexsort((footprint[:, :, 1], footprint[:, :, 0]), axis=1)
+        footprint = np.take_along_axis(
+            footprint, vertex_order[:, :, np.newaxis], axis=1
+        )
+        footprint = footprint.reshape(-1, 6)
+        footprint = footprint[np.lexsort(footprint.T[::-1])]
+
+        hash_object = hashlib.sha256()
+        hash_object.update(f"{self.VERSION}|{purpose}|{self.numeric_scale}|".encode())
+        hash_object.update(np.ascontiguousarray(footprint).tobytes())
+
+        return hash_object.hexdigest()
+
+    def load(
+        self,
+        key: str,
+    ) -> dict | None:
+
+        entry = self.entries.get(key)
+        if entry is None and self.directory is not None:
+            try:
+                with open(os.path.join(self.directory, f"{key}.json")) as file:
+                    entry = json.load(file)
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None:
+                self.entries[key] = entry
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        return entry
+
+    def save(
+        self,
+        key: str,
+        entry: dict,
+    ):
+
+        self.entries[key] = entry
+        if self.directory is None:
+            return
+
+        # Write to a temporary file first so that readers never see partial files
+        path = os.path.join(self.directory, f"{key}.json")
+        path_of_temporary_file = f"{path}.{os.getpid()}.tmp"
+        with open(path_of_temporary_file, "w") as temporary_file:
+            json.dump(entry, temporary_file)
+        os.replace(path_of_temporary_file, path)
+
+
 def classify_shape_and_determine_orientation_of_faces(
     local_z_axis_in_global_coordinates: tuple[float, float, float],
     assumed_local_y_axis_in_global_coordinates: tuple[float, float, float],
-    faces_defined_by_vertex_coordinates: list[list[tuple[float, float, float]]],
+    faces_defined_by_vertex_coordinates: (
+        list[list[tuple[float, float, float]]] | np.ndarray
+    ),
+    shape_classification_cache: ShapeClassificationCache | None = None,
 ) -> dict:
 
     # inlbim.util.geometry.TriangularMesh.plot_faces_3d(
     #     faces_as_tuples_with_coordinates=faces_defined_by_vertex_coordinates
     # )
 
-    # Calculate centroid
-    areas_of_faces = []
-    centroids_of_faces = []
-    for face in faces_defined_by_vertex_coordinates:
-        p1 = face[0]
-        p2 = face[1]
-        p3 = face[2]
-        vec1 = tuple(np.array(p2) - np.array(p1))
-        vec2 = tuple(np.array(p3) - np.array(p1))
-        cross_product = inlbim.util.geometry.calculate_cross_product_of_two_vectors(
-            vector1=vec1,
-            vector2=vec2,
-            unit_normalize=False,
-        )
-        areas_of_faces.append(float(0.5 * np.linalg.norm(cross_product)))
-        centroids_of_faces.append((np.array(p1) + np.array(p2) + np.array(p3)) / 3.0)
-    centroid_in_global_coordinates = sum(
-        [
-            area_of_face * centroid_of_face
-            for area_of_face, centroid_of_face in zip(
-                areas_of_faces, centroids_of_faces
-            )
-            if isinstance(centroid_of_face, np.ndarray)
-        ]
-    )
-    assert isinstance(centroid_in_global_coordinates, np.ndarray)
-    centroid_in_global_coordinates = tuple(
-        [float(val) for val in centroid_in_global_coordinates]
+    faces = np.asarray(faces_defined_by_vertex_coordinates, dtype=np.float64).reshape(
+        -1, 3, 3
     )
+    assert len(faces) > 0
 
     # Get assumed x-axis in global coordinates
     assumed_local_x_axis_in_global_coordinates = (
@@ -105,112 +338,57 @@ def classify_shape_and_determine_orientation_of_faces(
         )
     )
 
-    # Transformation Matrix (local to global)
+    # Transformation Matrix (local to global). Only its rotation is used by the
+    # transformation below, so the origin is left at zero
     transformation_matrix = ifcopenshell.util.placement.a2p(
-        o=centroid_in_global_coordinates,
+        o=(0.0, 0.0, 0.0),
         z=local_z_axis_in_global_coordinates,
         x=assumed_local_x_axis_in_global_coordinates,
     )
+    transformed_faces = transform_faces_with_transformation_matrix(
+        transformation_matrix=transformation_matrix,
+        faces_defined_by_vertex_coordinates=faces,
+    )
 
-    # transformation_matrix_v2_global_to_local = create_transformation_matrix(
-    #     direction_ratios_of_z_axis=local_z_axis_in_global_coordinates,
-    #     direction_ratios_of_x_axis=assumed_local_x_axis_in_global_coordinates,
-    # )
-
-    transformed_faces_defined_by_vertex_coordinates = []
-    xs = []
-    ys = []
-    zs = []
-    for face in faces_defined_by_vertex_coordinates:
-        p1 = face[0]
-        p2 = face[1]
-        p3 = face[2]
-        transformed_p1 = transformation_matrix.transpose() @ np.array(list(p1) + [1.0])
-        transformed_p2 = transformation_matrix.transpose() @ np.array(list(p2) + [1.0])
-        transformed_p3 = transformation_matrix.transpose() @ np.array(list(p3) + [1.0])
-        xs += [transformed_p1[0], transformed_p2[0], transformed_p3[0]]
-        ys += [transformed_p1[1], transformed_p2[1], transformed_p3[1]]
-        zs += [transformed_p1[2], transformed_p2[2], transformed_p3[2]]
-        transformed_face_defined_by_vertex_coordinates = [
-            [float(val) for val in transformed_p1[0:2]],
-            [float(val) for val in transformed_p2[0:2]],
-            [float(val) for val in transformed_p3[0:2]],
-        ]
-        transformed_faces_defined_by_vertex_coordinates.append(
-            transformed_face_defined_by_vertex_coordinates
+    # Look up the classification in the cache
+    entry = None
+    if shape_classification_cache is not None:
+        key = shape_classification_cache.calculate_key_of_faces(
+            transformed_faces=transformed_faces,
+            purpose="classification",
         )
+        entry = shape_classification_cache.load(key=key)
 
-    x_min, x_max, y_min, y_max = min(xs), max(xs), min(ys), max(ys)
-
-    squares = [
-        [],
-        [],
-        [],
-    ]
-    x_delta = (x_max - x_min) / 3.0
-    y_delta = (y_max - y_min) / 3.0
-    for col in range(3):
-        x_start = x_min + col * x_delta
-        for row in range(3):
-            y_start = y_max - row * y_delta
-            square = [
-                (x_start, y_start),
-                (x_start, y_start - y_delta),
-                (x_start + x_delta, y_start - y_delta),
-                (x_start + x_delta, y_start),
-            ]
-            squares[row].append(square)
-
-    shape_matrix = [
-        [0, 0, 0],
-        [0, 0, 0],
-        [0, 0, 0],
-    ]
-    for row in range(3):
-        for col in range(3):
-            grid_cell_activated = False
-            square = squares[row][col]
-            for triangle in transformed_faces_defined_by_vertex_coordinates:
-                if triangle_overlaps_square(
-                    triangle_coords=tuple(triangle), square_coords=tuple(square)
-                ):
-                    grid_cell_activated = True
-                    break
-            if grid_cell_activated:
-                shape_matrix[row][col] = 1
+    # Rasterize transformed faces onto 3x3 grid and match rotations of shape
+    # matrix to preset shapes
+    if entry is None:
+        bitmask_of_shape = get_bitmask_of_triangles_on_grid(
+            triangles=transformed_faces[:, :, :2]
+        )
+        matching_shape, number_of_rotations = MATCHING_SHAPES_OF_BITMASKS.get(
+            bitmask_of_shape, (None, None)
+        )
+        entry = {
+            "matching_shape": matching_shape,
+            "number_of_rotations": number_of_rotations,
+        }
+        if shape_classification_cache is not None:
+            shape_classification_cache.save(key=key, entry=entry)
+    matching_shape = entry["matching_shape"]
+    number_of_rotations = entry["number_of_rotations"]
 
-    matching_shape = None
     actual_local_x_axis_in_global_coordinates = None
-    trial_local_x_axis_in_global_coordinates = (
-        assumed_local_x_axis_in_global_coordinates
-    )
-    trial_shape_matrix = shape_matrix
-    trial_number = 0
-    for _ in range(4):
-        trial_number += 1
-        for preset_shape_name, preset_shape_matrix in PRESET_SHAPE_MATRICES.items():
-            shapes_match = (
-                calculate_l2_norm(
-                    array1=flatten_matrix(trial_shape_matrix),
-                    array2=flatten_matrix(preset_shape_matrix),
-                )
-                == 0.0
-            )
-            if shapes_match:
-                actual_local_x_axis_in_global_coordinates = (
-                    trial_local_x_axis_in_global_coordinates
+    if matching_shape is not None:
+        actual_local_x_axis_in_global_coordinates = (
+            assumed_local_x_axis_in_global_coordinates
+        )
+        for _ in range(number_of_rotations):
+            actual_local_x_axis_in_global_coordinates = (
+                inlbim.util.geometry.calculate_cross_product_of_two_vectors(
+                    vector1=local_z_axis_in_global_coordinates,
+                    vector2=actual_local_x_axis_in_global_coordinates,
                 )
-                matching_shape = preset_shape_name
-                break
-        if shapes_match:
-            break
-        trial_local_x_axis_in_global_coordinates = (
-            inlbim.util.geometry.calculate_cross_product_of_two_vectors(
-                vector1=local_z_axis_in_global_coordinates,
-                vector2=trial_local_x_axis_in_global_coordinates,
             )
-        )
-        trial_shape_matrix = rotate_matrix_90_clockwise(matrix=trial_shape_matrix)
 
     return {
         "matching_shape": matching_shape,
@@ -254,24 +432,6 @@ def classify_shape_and_determine_orientation_of_faces(
 #     return transformation_matrix
 
 
-def flatten_matrix(matrix: list[list[int]]) -> list[int]:
-    return [element for row in matrix for element in row]
-
-
-def calculate_l2_norm(array1: list[int], array2: list[int]) -> float:
-    if len(array1) != len(array2):
-        raise ValueError("Arrays must have the same length")
-
-    # Convert lists to numpy arrays
-    np_array1 = np.array(array1)
-    np_array2 = np.array(array2)
-
-    # Calculate the L2 norm (Euclidean distance) between the two arrays
-    l2_norm = float(np.linalg.norm(np_array1 - np_array2))
-
-    return l2_norm
-
-
 def rotate_matrix_90_clockwise(matrix: list[list[int]]) -> list[list[int]]:
     # Ensure the matrix is 3x3
     if len(matrix) != 3 or any(len(row) != 3 for row in matrix):
@@ -286,46 +446,7 @@ def rotate_matrix_90_clockwise(matrix: list[list[int]]) -> list[list[int]]:
     return rotated_matrix
 
 
-def is_point_in_polygon(point, polygon):
-    return polygon.contains(point)
-
-
-def do_edges_intersect(polygon1, polygon2):
-    return polygon1.intersects(polygon2)
-
-
-def triangle_overlaps_square(
-    triangle_coords: tuple[
-        tuple[float, float],
-        tuple[float, float],
-        tuple[float, float],
-    ],
-    square_coords: tuple[
-        tuple[float, float],
-        tuple[float, float],
-        tuple[float, float],
-        tuple[float, float],
-    ],
-):
-    # Create Polygon objects for the triangle and the square
-    triangle = Polygon(triangle_coords)
-    square = Polygon(square_coords)
-
-    # Check if any triangle's vertex is inside the square
-    for vertex in triangle_coords:
-        if is_point_in_polygon(Point(vertex), square):
-            return True
-
-    # Check if any square's vertex is inside the triangle
-    for vertex in square_coords:
-        if is_point_in_polygon(Point(vertex), triangle):
-            return True
-
-    # Check if any edges of the triangle intersect with any edges of the square
-    if do_edges_intersect(triangle, square):
-        return True
-
-    return False
+MATCHING_SHAPES_OF_BITMASKS = get_matching_shapes_of_bitmasks()
 
 
 def is_point_in_circle(
@@ -357,6 +478,7 @@ def measure_dimensions_of_classified_shape_of_faces(
     faces_defined_by_vertex_coordinates: list[list[tuple[float, float, float]]],
     preset_beam_shape_classification: PRESET_SHAPE_LABEL,
     numeric_scale: int = 4,
+    shape_classification_cache: ShapeClassificationCache | None = None,
 ) -> dict:
 
     # Transformation Matrix (local to global)
@@ -367,28 +489,35 @@ def measure_dimensions_of_classified_shape_of_faces(
     )
 
     # Transform 3D faces to 2D
-    transformed_faces_defined_by_vertex_coordinates = []
-    xs = []
-    ys = []
-    zs = []
-    for face in faces_defined_by_vertex_coordinates:
-        p1 = face[0]
-        p2 = face[1]
-        p3 = face[2]
-        transformed_p1 = transformation_matrix.transpose() @ np.array(list(p1) + [1.0])
-        transformed_p2 = transformation_matrix.transpose() @ np.array(list(p2) + [1.0])
-        transformed_p3 = transformation_matrix.transpose() @ np.array(list(p3) + [1.0])
-        xs += [transformed_p1[0], transformed_p2[0], transformed_p3[0]]
-        ys += [transformed_p1[1], transformed_p2[1], transformed_p3[1]]
-        zs += [transformed_p1[2], transformed_p2[2], transformed_p3[2]]
-        transformed_face_defined_by_vertex_coordinates = [
-            [float(val) for val in transformed_p1[0:2]],
-            [float(val) for val in transformed_p2[0:2]],
-            [float(val) for val in transformed_p3[0:2]],
-        ]
-        transformed_faces_defined_by_vertex_coordinates.append(
-            transformed_face_defined_by_vertex_coordinates
+    transformed_faces = transform_faces_with_transformation_matrix(
+        transformation_matrix=transformation_matrix,
+        faces_defined_by_vertex_coordinates=faces_defined_by_vertex_coordinates,
+    )
+    transformed_faces_defined_by_vertex_coordinates = transformed_faces[
+        :, :, :2
+    ].tolist()
+
+    # Look up the measurement in the cache
+    key = None
+    if (
+        shape_classification_cache is not None
+        and preset_beam_shape_classification
+        not in shape_classification_cache.PRESET_SHAPES_WITH_POSITION_DEPENDENT_MEASUREMENT
+    ):
+        key = shape_classification_cache.calculate_key_of_faces(
+            transformed_faces=transformed_faces,
+            purpose=f"measurement|{preset_beam_shape_classification}|{numeric_scale}",
         )
+        entry = shape_classification_cache.load(key=key)
+        if entry is not None:
+            return {
+                "parameterized_profile_class": entry["parameterized_profile_class"],
+                "dimensions": (
+                    list(entry["dimensions"])
+                    if entry["dimensions"] is not None
+                    else None
+                ),
+            }
 
     parameterized_profile_class = None
     dimensions = None
@@ -534,6 +663,19 @@ def measure_dimensions_of_classified_shape_of_faces(
         "dimensions": dimensions,
     }
 
+    if shape_classification_cache is not None and key is not None:
+        shape_classification_cache.save(
+            key=key,
+            entry={
+                "parameterized_profile_class": parameterized_profile_class,
+                "dimensions": (
+                    [None if val is None else float(val) for val in dimensions]
+                    if dimensions is not None
+                    else None
+                ),
+            },
+        )
+
     return result
 
 
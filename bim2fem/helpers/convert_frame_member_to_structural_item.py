@@ -20,6 +20,10 @@ import inlbim.api.element_type
 import ifcopenshell.api.type
 import ifcopenshell.api.spatial
 import inlbim.util.file
+import inlbim.util.instrumentation
+import inlbim.util.library
+import inlbim.util.resource
+import inlbim.util.structural
 import ifcopenshell.api.project
 
 
@@ -28,49 +32,53 @@ def convert_linear_frame_member_to_structural_item(
     ifc4_destination_file: ifcopenshell.file,
     region: REGION,
     structural_analysis_model: ifcopenshell.entity_instance,
+    geometric_analysis: dict | None = None,
+    triangular_meshes: dict[str, TriangularMesh] | None = None,
+    resolution_cache: inlbim.util.library.ResolutionCache | None = None,
+    structural_point_connection_registry: (
+        inlbim.util.structural.StructuralPointConnectionRegistry | None
+    ) = None,
+    instrumentation: inlbim.util.instrumentation.Instrumentation | None = None,
 ) -> ifcopenshell.entity_instance | None:
-
-    print("\tconvert_frame_member_to_structural_item()")
-    print(f"\tframe_member_from_source_file: {frame_member_from_source_file}")
-    print(f"\tregion: {region}")
-    print(f"\tstructural_analysis_model: {structural_analysis_model}")
-
-    # Add Beam/Column/Member to destination file with the original IfcGlobalId
-    if frame_member_from_source_file.is_a("IfcBeam"):
-        element_class = "IfcBeam"
-    elif frame_member_from_source_file.is_a("IfcColumn"):
-        element_class = "IfcColumn"
-    elif frame_member_from_source_file.is_a("IfcColumn"):
-        element_class = "IfcMember"
-    else:
+    """Convert a frame member to a StructuralCurveMember. The geometric analysis
+    may be precomputed (e.g., in a worker process) with
+    analyze_geometry_of_linear_frame_member(); otherwise it is computed here,
+    reusing the element's mesh from triangular_meshes (keyed by GlobalId) if
+    given. Standard material and profile names are memoized in resolution_cache,
+    and coincident StructuralPointConnections are reused through
+    structural_point_connection_registry, if given. Cases and detailed messages
+    are reported to instrumentation, if given."""
+
+    if instrumentation is None:
+        instrumentation = inlbim.util.instrumentation.Instrumentation()
+
+    instrumentation.message("\tconvert_frame_member_to_structural_item()")
+    instrumentation.message(
+        f"\tframe_member_from_source_file: {frame_member_from_source_file}"
+    )
+    instrumentation.message(f"\tregion: {region}")
+    instrumentation.message(f"\tstructural_analysis_model: {structural_analysis_model}")
+
+    # Get class of the Beam/Column/Member copied to the destination file
+    element_class = get_ifc_class_of_copied_frame_member(
+        frame_member_from_source_file=frame_member_from_source_file
+    )
+    if element_class is None:
         return None
-    frame_member_copied_to_destination_file = ifcopenshell.api.root.create_entity(
-        file=ifc4_destination_file,
-        ifc_class=element_class,
-        name=frame_member_from_source_file.Name,
-    )
-    site = ifc4_destination_file.by_type(type="IfcSite", include_subtypes=False)[0]
-    ifcopenshell.api.spatial.assign_container(
-        file=ifc4_destination_file,
-        products=[frame_member_copied_to_destination_file],
-        relating_structure=site,
-    )
 
     # Get best matching standard material name, if it exists
-    material_names_from_destination_file = list(
-        {
-            material.Name
-            for material in ifc4_destination_file.by_type(
-                type="IfcMaterial",
-                include_subtypes=False,
-            )
-        }
+    material_names_from_destination_file = inlbim.util.resource.get_resource_registry(
+        ifc4_file=ifc4_destination_file
+    ).get_keys(
+        ifc_class="IfcMaterial",
+        calculate_key=inlbim.util.resource.get_name_of_material,
     )
     standard_material_name = (
         inlbim.util.material.get_best_matching_standard_material_from_element_metadata(
             element=frame_member_from_source_file,
             region=region,
             other_material_names=material_names_from_destination_file,
+            resolution_cache=resolution_cache,
         )
     )
     if standard_material_name is None:
@@ -80,126 +88,182 @@ def convert_linear_frame_member_to_structural_item(
             standard_material_name = "A36"
         else:
             standard_material_name = "S355"
-    print(f"\tstandard_material_name: {standard_material_name}")
+    instrumentation.message(f"\tstandard_material_name: {standard_material_name}")
 
     # Get best matching standard profile name, if it exists
-    profile_names_from_destination_file = list(
-        {
-            profile.ProfileName
-            for profile in ifc4_destination_file.by_type(
-                type="IfcProfileDef",
-                include_subtypes=True,
-            )
-        }
+    profile_names_from_destination_file = inlbim.util.resource.get_resource_registry(
+        ifc4_file=ifc4_destination_file
+    ).get_keys(
+        ifc_class="IfcProfileDef",
+        calculate_key=inlbim.util.resource.get_name_of_profile,
+        include_subtypes=True,
     )
     standard_profile_name = (
         inlbim.util.profile.get_best_matching_standard_profile_from_element_metadata(
             element=frame_member_from_source_file,
             region=region,
             other_standard_profile_names=profile_names_from_destination_file,
+            resolution_cache=resolution_cache,
         )
     )
-    print(f"\tstandard_profile_name: {standard_profile_name}")
+    instrumentation.message(f"\tstandard_profile_name: {standard_profile_name}")
 
     # Get the IfcExtrudedAreaSolid, if it exists
-    extruded_area_solid = (
+    extruded_area_solid_exists = (
         inlbim.util.representation.get_single_extruded_area_solid_representation(
             element=frame_member_from_source_file
         )
+        is not None
+    )
+    instrumentation.message(
+        f"\textruded_area_solid_exists: {extruded_area_solid_exists}"
+    )
+
+    # Analyze geometry of the source element, only if Case 1 or Case 2 applies.
+    # A failure of a precomputed analysis is raised here as well
+    if (standard_profile_name and extruded_area_solid_exists) or (
+        not extruded_area_solid_exists
+    ):
+        if geometric_analysis is None:
+            geometric_analysis = analyze_geometry_of_linear_frame_member(
+                frame_member_from_source_file=frame_member_from_source_file,
+                numeric_scale=inlbim.util.file.get_numeric_scale_of_project(
+                    ifc4_file=ifc4_destination_file
+                ),
+                triangular_mesh=(triangular_meshes or {}).get(
+                    frame_member_from_source_file.GlobalId
+                ),
+            )
+        if "exception" in geometric_analysis:
+            raise geometric_analysis["exception"]
+
+    # Add Beam/Column/Member to destination file with the original IfcGlobalId
+    frame_member_copied_to_destination_file = ifcopenshell.api.root.create_entity(
+        file=ifc4_destination_file,
+        ifc_class=element_class,
+        name=frame_member_from_source_file.Name,
+    )
+    frame_member_copied_to_destination_file.GlobalId = (
+        frame_member_from_source_file.GlobalId
+    )
+    site = ifc4_destination_file.by_type(type="IfcSite", include_subtypes=False)[0]
+    ifcopenshell.api.spatial.assign_container(
+        file=ifc4_destination_file,
+        products=[frame_member_copied_to_destination_file],
+        relating_structure=site,
     )
-    print(f"\textruded_area_solid: {extruded_area_solid}")
 
     # Create the StructuralItem
-    if standard_profile_name and extruded_area_solid:
+    if standard_profile_name and extruded_area_solid_exists:
         structural_curve_member = convert_frame_member_to_fem_for_case_1(
             ifc4_destination_file=ifc4_destination_file,
             region=region,
             standard_material_name=standard_material_name,
             standard_profile_name=standard_profile_name,
             structural_analysis_model=structural_analysis_model,
-            frame_member_from_source_file=frame_member_from_source_file,
             frame_member_copied_to_destination_file=frame_member_copied_to_destination_file,
-            extruded_area_solid=extruded_area_solid,
+            geometric_analysis=geometric_analysis,
+            structural_point_connection_registry=structural_point_connection_registry,
+            instrumentation=instrumentation,
         )
-    elif not extruded_area_solid:
+    elif not extruded_area_solid_exists:
         structural_curve_member = convert_frame_member_to_fem_for_case_2(
             ifc4_destination_file=ifc4_destination_file,
             region=region,
             standard_material_name=standard_material_name,
             standard_profile_name=standard_profile_name,
             structural_analysis_model=structural_analysis_model,
-            frame_member_from_source_file=frame_member_from_source_file,
             frame_member_copied_to_destination_file=frame_member_copied_to_destination_file,
+            geometric_analysis=geometric_analysis,
+            structural_point_connection_registry=structural_point_connection_registry,
+            instrumentation=instrumentation,
         )
     else:
         structural_curve_member = None
-    print(f"\tstructural_curve_member: {structural_curve_member}")
+    instrumentation.message(f"\tstructural_curve_member: {structural_curve_member}")
 
     return structural_curve_member
 
 
-def convert_frame_member_to_fem_for_case_1(
-    ifc4_destination_file: ifcopenshell.file,
-    region: REGION,
-    standard_material_name: str,
-    standard_profile_name: str,
-    structural_analysis_model: ifcopenshell.entity_instance,
+def get_ifc_class_of_copied_frame_member(
     frame_member_from_source_file: ifcopenshell.entity_instance,
-    frame_member_copied_to_destination_file: ifcopenshell.entity_instance,
-    extruded_area_solid: ifcopenshell.entity_instance,
-) -> ifcopenshell.entity_instance | None:
-    """Case 1: Standard Profile Name is identified and RepresentationItem is IfcExtrudedAreaSolid"""
+) -> str | None:
 
-    print(
-        "\tCase 1: Standard Profile Name is identified and RepresentationItem is IfcExtrudedAreaSolid"
-    )
+    if frame_member_from_source_file.is_a("IfcBeam"):
+        element_class = "IfcBeam"
+    elif frame_member_from_source_file.is_a("IfcColumn"):
+        element_class = "IfcColumn"
+    elif frame_member_from_source_file.is_a("IfcColumn"):
+        element_class = "IfcMember"
+    else:
+        element_class = None
 
-    # Create the standard material
-    material = inlbim.api.material.add_material_from_standard_library(
-        ifc4_file=ifc4_destination_file,
-        region=region,
-        material_name=standard_material_name,
-        check_for_duplicate=True,
+    return element_class
+
+
+def frame_member_requires_triangular_mesh(
+    frame_member_from_source_file: ifcopenshell.entity_instance,
+) -> bool:
+    """Only Case 1a (IfcExtrudedAreaSolid with an IfcParameterizedProfileDef)
+    can be analyzed without tessellating the element"""
+
+    extruded_area_solid = (
+        inlbim.util.representation.get_single_extruded_area_solid_representation(
+            element=frame_member_from_source_file
+        )
     )
-    assert isinstance(material, ifcopenshell.entity_instance)
+    if not extruded_area_solid:
+        return True
 
-    # Create the profile
-    profile_def = inlbim.api.profile.add_profile_from_standard_library(
-        ifc4_file=ifc4_destination_file,
-        region=region,
-        profile_name=standard_profile_name,
-        check_for_duplicate=True,
+    return not extruded_area_solid.SweptArea.is_a("IfcParameterizedProfileDef")
+
+
+def analyze_geometry_of_linear_frame_member(
+    frame_member_from_source_file: ifcopenshell.entity_instance,
+    numeric_scale: int,
+    triangular_mesh: TriangularMesh | None = None,
+    shape_classification_cache: (
+        bim2fem.helpers.beam_shape_classification.ShapeClassificationCache | None
+    ) = None,
+) -> dict:
+    """Analyze the geometry of a frame member without touching the destination
+    file. The result only holds plain data (str, float, tuple) so that it can be
+    computed in a worker process and committed later in the parent process"""
+
+    # Get the IfcExtrudedAreaSolid, if it exists
+    extruded_area_solid = (
+        inlbim.util.representation.get_single_extruded_area_solid_representation(
+            element=frame_member_from_source_file
+        )
     )
-    assert isinstance(profile_def, ifcopenshell.entity_instance)
 
-    # Add and assign Type
-    if frame_member_copied_to_destination_file.is_a("IfcBeam"):
-        element_type_class = "IfcBeamType"
-    elif frame_member_copied_to_destination_file.is_a("IfcColumn"):
-        element_type_class = "IfcColumnType"
+    if extruded_area_solid:
+        geometric_analysis = analyze_geometry_of_frame_member_for_case_1(
+            frame_member_from_source_file=frame_member_from_source_file,
+            extruded_area_solid=extruded_area_solid,
+            triangular_mesh=triangular_mesh,
+            shape_classification_cache=shape_classification_cache,
+        )
     else:
-        element_type_class = "IfcMemberType"
-    element_type = inlbim.api.element_type.add_beam_or_column_or_member_type(
-        ifc_class=element_type_class,
-        material=material,
-        profile=profile_def,
-        check_for_duplicate=True,
-    )
-    ifcopenshell.api.type.assign_type(
-        file=ifc4_destination_file,
-        related_objects=[frame_member_copied_to_destination_file],
-        relating_type=element_type,
-    )
+        geometric_analysis = analyze_geometry_of_frame_member_for_case_2(
+            frame_member_from_source_file=frame_member_from_source_file,
+            numeric_scale=numeric_scale,
+            triangular_mesh=triangular_mesh,
+            shape_classification_cache=shape_classification_cache,
+        )
 
-    # Declare Type on Project
-    project = ifc4_destination_file.by_type(type="IfcProject", include_subtypes=False)[
-        0
-    ]
-    ifcopenshell.api.project.assign_declaration(
-        file=ifc4_destination_file,
-        definitions=[element_type],
-        relating_context=project,
-    )
+    return geometric_analysis
+
+
+def analyze_geometry_of_frame_member_for_case_1(
+    frame_member_from_source_file: ifcopenshell.entity_instance,
+    extruded_area_solid: ifcopenshell.entity_instance,
+    triangular_mesh: TriangularMesh | None = None,
+    shape_classification_cache: (
+        bim2fem.helpers.beam_shape_classification.ShapeClassificationCache | None
+    ) = None,
+) -> dict:
+    """Case 1: RepresentationItem is IfcExtrudedAreaSolid"""
 
     # Object Placement Transformation
     transformation_matrix = ifcopenshell.util.placement.get_local_placement(
@@ -252,7 +316,7 @@ def convert_frame_member_to_fem_for_case_1(
 
     # Case 1a
     if extruded_area_solid.SweptArea.is_a("IfcParameterizedProfileDef"):
-        print("\tCase 1a: SweptArea is an IfcParameterizedProfileDef")
+        case = "1a"
         local_origin_of_swept_area, local_x_axis_of_swept_area = (
             inlbim.util.profile.get_local_origin_and_x_axis_of_parameterized_profile_def(
                 parameterized_profile_def=extruded_area_solid.SweptArea
@@ -275,16 +339,16 @@ def convert_frame_member_to_fem_for_case_1(
 
     # Case 1b
     else:
-        print("\tCase 1b: SweptArea is not an IfcParameterizedProfileDef")
-        triangular_mesh = TriangularMesh.from_ifc_element(
-            element=frame_member_from_source_file
-        )
+        case = "1b"
+        if triangular_mesh is None:
+            triangular_mesh = TriangularMesh.from_ifc_element(
+                element=frame_member_from_source_file
+            )
         # triangular_mesh.plot_all()
         indices_of_faces_with_normals_acute_to_extrusion_direction = []
-        for index_of_face, _ in enumerate(triangular_mesh.faces):
-            face_normal_vector = triangular_mesh.calculate_normal_vector_of_face(
-                face_index=index_of_face
-            )
+        for index_of_face, face_normal_vector in enumerate(
+            triangular_mesh.calculate_normal_vectors_of_faces().tolist()
+        ):
             angle = inlbim.util.geometry.calculate_angle_between_two_vectors(
                 vector1=extrusion_direction_in_global_coordinates,
                 vector2=face_normal_vector,
@@ -322,22 +386,18 @@ def convert_frame_member_to_fem_for_case_1(
             faces_defined_by_vertex_coordinates=triangular_mesh.get_coordinates_of_faces(
                 indices_of_faces=indices_of_faces_with_normals_acute_to_extrusion_direction
             ),
+            shape_classification_cache=shape_classification_cache,
         )
         matching_shape, local_x_axis_in_global_coordinates = (
             result["matching_shape"],
             result["local_x_axis_in_global_coordinates"],
         )
         if not matching_shape and not local_x_axis_in_global_coordinates:
-            # print(
-            #     " ".join(
-            #         [
-            #             "\tWarning: Failed Conversion for",
-            #             f"{frame_member_from_source_file}.",
-            #             "Could not determine orientation for Case 1b",
-            #         ]
-            #     )
-            # )
-            return None
+            return {
+                "extruded_area_solid_exists": True,
+                "case": case,
+                "points": None,
+            }
         origin_in_global_coordinates = tuple(
             [float(val) for val in transformation_matrix[:3, 3]]
         )
@@ -372,47 +432,28 @@ def convert_frame_member_to_fem_for_case_1(
     )
     assert len(p3) == 3
 
-    # Create StructuralItem
-    structural_curve_member = inlbim.api.structural.create_3pt_structural_curve_member(
-        p1=p1,
-        p2=p2,
-        p3=p3,
-        profile_def=profile_def,
-        material=material,
-        structural_analysis_model=structural_analysis_model,
-        corresponding_product=frame_member_copied_to_destination_file,
-    )
+    return {
+        "extruded_area_solid_exists": True,
+        "case": case,
+        "points": (p1, p2, p3),
+    }
 
-    return structural_curve_member
 
-
-def convert_frame_member_to_fem_for_case_2(
-    ifc4_destination_file: ifcopenshell.file,
-    region: REGION,
-    standard_material_name: str,
-    standard_profile_name: str | None,
-    structural_analysis_model: ifcopenshell.entity_instance,
+def analyze_geometry_of_frame_member_for_case_2(
     frame_member_from_source_file: ifcopenshell.entity_instance,
-    frame_member_copied_to_destination_file: ifcopenshell.entity_instance,
-) -> ifcopenshell.entity_instance | None:
-    """Case 2: Standard Profile Name is either identified or not and
-    RepresentationItem is not a single IfcExtrudedAreaSolid"""
-
-    print("\tCase 2: RepresentationItem is not a single IfcExtrudedAreaSolid")
-
-    # Create the standard material
-    material = inlbim.api.material.add_material_from_standard_library(
-        ifc4_file=ifc4_destination_file,
-        region=region,
-        material_name=standard_material_name,
-        check_for_duplicate=True,
-    )
-    assert isinstance(material, ifcopenshell.entity_instance)
+    numeric_scale: int,
+    triangular_mesh: TriangularMesh | None = None,
+    shape_classification_cache: (
+        bim2fem.helpers.beam_shape_classification.ShapeClassificationCache | None
+    ) = None,
+) -> dict:
+    """Case 2: RepresentationItem is not a single IfcExtrudedAreaSolid"""
 
     # Triangular Mesh
-    triangular_mesh = TriangularMesh.from_ifc_element(
-        element=frame_member_from_source_file
-    )
+    if triangular_mesh is None:
+        triangular_mesh = TriangularMesh.from_ifc_element(
+            element=frame_member_from_source_file
+        )
     # triangular_mesh.plot_all()
 
     # Calculate Centroid
@@ -421,21 +462,15 @@ def convert_frame_member_to_fem_for_case_2(
     )
 
     # Get distances of faces to centroid
-    distances_from_centroid_to_faces = []
-    for index_of_face in range(len(triangular_mesh.faces)):
-        centroid_of_face = triangular_mesh.calculate_centroid_of_face(
-            index_of_face=index_of_face
-        )
-        distance = float(
-            np.linalg.norm(
-                np.array(centroid_of_face) - np.array(centroid_of_triangular_mesh)
-            )
-        )
-        distances_from_centroid_to_faces.append(distance)
+    distances_from_centroid_to_faces = np.linalg.norm(
+        triangular_mesh.calculate_centroids_of_faces()
+        - np.array(centroid_of_triangular_mesh),
+        axis=1,
+    )
 
     # Get furthest face from centroid
-    furthest_distance = max(distances_from_centroid_to_faces)
-    index_of_furthest_face = distances_from_centroid_to_faces.index(furthest_distance)
+    index_of_furthest_face = int(np.argmax(distances_from_centroid_to_faces))
+    furthest_distance = float(distances_from_centroid_to_faces[index_of_furthest_face])
 
     # Get faces that are near the endpoints of the frame member
     rough_estimate_of_length_of_frame_member = furthest_distance * 2.0
@@ -551,22 +586,18 @@ def convert_frame_member_to_fem_for_case_2(
         faces_defined_by_vertex_coordinates=triangular_mesh.get_coordinates_of_faces(
             indices_of_faces=indices_of_faces_at_second_endpoint
         ),
+        shape_classification_cache=shape_classification_cache,
     )
     matching_shape, local_x_axis_in_global_coordinates = (
         result_for_beam_shape_classification["matching_shape"],
         result_for_beam_shape_classification["local_x_axis_in_global_coordinates"],
     )
     if not matching_shape and not local_x_axis_in_global_coordinates:
-        # print(
-        #     " ".join(
-        #         [
-        #             "\tWarning: Failed Conversion for",
-        #             f"{frame_member_from_source_file}.",
-        #             "Could not determine orientation for Case 1b",
-        #         ]
-        #     )
-        # )
-        return None
+        return {
+            "extruded_area_solid_exists": False,
+            "case": "2",
+            "points": None,
+        }
     local_y_axis_in_global_coordinates = (
         inlbim.util.geometry.calculate_cross_product_of_two_vectors(
             vector1=extrusion_direction_in_global_coordinates,
@@ -574,11 +605,9 @@ def convert_frame_member_to_fem_for_case_2(
         )
     )
 
-    if not standard_profile_name:
-        print("\tCase 2a: Standard Profile Name is not Known from Metadata")
-        numeric_scale = inlbim.util.file.get_numeric_scale_of_project(
-            ifc4_file=ifc4_destination_file
-        )
+    # Measure dimensions of classified shape (only needed for Case 2a, which is
+    # decided later from the element metadata, so failures are deferred)
+    try:
         result_for_beam_shape_measurement = bim2fem.helpers.beam_shape_classification.measure_dimensions_of_classified_shape_of_faces(
             local_z_axis_in_global_coordinates=extrusion_direction_in_global_coordinates,
             local_x_axis_in_global_coordinates=local_x_axis_in_global_coordinates,
@@ -587,7 +616,183 @@ def convert_frame_member_to_fem_for_case_2(
             ),
             preset_beam_shape_classification=matching_shape,
             numeric_scale=numeric_scale,
+            shape_classification_cache=shape_classification_cache,
         )
+    except Exception as exception:
+        result_for_beam_shape_measurement = {"exception": exception}
+
+    # Calculate points for StructuralCurveMember
+    p1 = tuple(float(val) for val in origin_in_global_coordinates)
+    assert len(p1) == 3
+    unit_scale = ifcopenshell.util.unit.calculate_unit_scale(
+        ifc_file=frame_member_from_source_file.file
+    )
+    p2 = tuple(
+        float(val)
+        for val in (
+            np.array(origin_in_global_coordinates)
+            + np.array(extrusion_direction_in_global_coordinates)
+            * unit_scale
+            * length_of_frame_member
+        ).tolist()
+    )
+    assert len(p2) == 3
+    p3 = tuple(
+        float(val)
+        for val in (
+            np.array(p1) + np.array(local_y_axis_in_global_coordinates) * 1.0
+        ).tolist()
+    )
+    assert len(p3) == 3
+
+    return {
+        "extruded_area_solid_exists": False,
+        "case": "2",
+        "points": (p1, p2, p3),
+        "beam_shape_measurement": result_for_beam_shape_measurement,
+    }
+
+
+def convert_frame_member_to_fem_for_case_1(
+    ifc4_destination_file: ifcopenshell.file,
+    region: REGION,
+    standard_material_name: str,
+    standard_profile_name: str,
+    structural_analysis_model: ifcopenshell.entity_instance,
+    frame_member_copied_to_destination_file: ifcopenshell.entity_instance,
+    geometric_analysis: dict,
+    structural_point_connection_registry: (
+        inlbim.util.structural.StructuralPointConnectionRegistry | None
+    ) = None,
+    instrumentation: inlbim.util.instrumentation.Instrumentation | None = None,
+) -> ifcopenshell.entity_instance | None:
+    """Case 1: Standard Profile Name is identified and RepresentationItem is IfcExtrudedAreaSolid"""
+
+    if instrumentation is None:
+        instrumentation = inlbim.util.instrumentation.Instrumentation()
+
+    instrumentation.message(
+        "\tCase 1: Standard Profile Name is identified and RepresentationItem is IfcExtrudedAreaSolid"
+    )
+
+    # Create the standard material
+    material = inlbim.api.material.add_material_from_standard_library(
+        ifc4_file=ifc4_destination_file,
+        region=region,
+        material_name=standard_material_name,
+        check_for_duplicate=True,
+    )
+    assert isinstance(material, ifcopenshell.entity_instance)
+
+    # Create the profile
+    profile_def = inlbim.api.profile.add_profile_from_standard_library(
+        ifc4_file=ifc4_destination_file,
+        region=region,
+        profile_name=standard_profile_name,
+        check_for_duplicate=True,
+    )
+    assert isinstance(profile_def, ifcopenshell.entity_instance)
+
+    # Add and assign Type
+    if frame_member_copied_to_destination_file.is_a("IfcBeam"):
+        element_type_class = "IfcBeamType"
+    elif frame_member_copied_to_destination_file.is_a("IfcColumn"):
+        element_type_class = "IfcColumnType"
+    else:
+        element_type_class = "IfcMemberType"
+    element_type = inlbim.api.element_type.add_beam_or_column_or_member_type(
+        ifc_class=element_type_class,
+        material=material,
+        profile=profile_def,
+        check_for_duplicate=True,
+    )
+    ifcopenshell.api.type.assign_type(
+        file=ifc4_destination_file,
+        related_objects=[frame_member_copied_to_destination_file],
+        relating_type=element_type,
+    )
+
+    # Declare Type on Project
+    project = ifc4_destination_file.by_type(type="IfcProject", include_subtypes=False)[
+        0
+    ]
+    ifcopenshell.api.project.assign_declaration(
+        file=ifc4_destination_file,
+        definitions=[element_type],
+        relating_context=project,
+    )
+
+    # Case 1a/1b
+    if geometric_analysis["case"] == "1a":
+        instrumentation.increment(name="case_1a")
+        instrumentation.message("\tCase 1a: SweptArea is an IfcParameterizedProfileDef")
+    else:
+        instrumentation.increment(name="case_1b")
+        instrumentation.message(
+            "\tCase 1b: SweptArea is not an IfcParameterizedProfileDef"
+        )
+    if geometric_analysis["points"] is None:
+        return None
+
+    # Create StructuralItem
+    p1, p2, p3 = geometric_analysis["points"]
+    structural_curve_member = inlbim.api.structural.create_3pt_structural_curve_member(
+        p1=p1,
+        p2=p2,
+        p3=p3,
+        profile_def=profile_def,
+        material=material,
+        structural_analysis_model=structural_analysis_model,
+        corresponding_product=frame_member_copied_to_destination_file,
+        structural_point_connection_registry=structural_point_connection_registry,
+    )
+
+    return structural_curve_member
+
+
+def convert_frame_member_to_fem_for_case_2(
+    ifc4_destination_file: ifcopenshell.file,
+    region: REGION,
+    standard_material_name: str,
+    standard_profile_name: str | None,
+    structural_analysis_model: ifcopenshell.entity_instance,
+    frame_member_copied_to_destination_file: ifcopenshell.entity_instance,
+    geometric_analysis: dict,
+    structural_point_connection_registry: (
+        inlbim.util.structural.StructuralPointConnectionRegistry | None
+    ) = None,
+    instrumentation: inlbim.util.instrumentation.Instrumentation | None = None,
+) -> ifcopenshell.entity_instance | None:
+    """Case 2: Standard Profile Name is either identified or not and
+    RepresentationItem is not a single IfcExtrudedAreaSolid"""
+
+    if instrumentation is None:
+        instrumentation = inlbim.util.instrumentation.Instrumentation()
+
+    instrumentation.message(
+        "\tCase 2: RepresentationItem is not a single IfcExtrudedAreaSolid"
+    )
+
+    # Create the standard material
+    material = inlbim.api.material.add_material_from_standard_library(
+        ifc4_file=ifc4_destination_file,
+        region=region,
+        material_name=standard_material_name,
+        check_for_duplicate=True,
+    )
+    assert isinstance(material, ifcopenshell.entity_instance)
+
+    if geometric_analysis["points"] is None:
+        return None
+
+    if not standard_profile_name:
+        instrumentation.increment(name="case_2a")
+        instrumentation.message(
+            "\tCase 2a: Standard Profile Name is not Known from Metadata"
+        )
+        result_for_beam_shape_measurement = geometric_analysis["beam_shape_measurement"]
+        if "exception" in result_for_beam_shape_measurement:
+            raise result_for_beam_shape_measurement["exception"]
         parameterized_profile_class, dimensions = (
             result_for_beam_shape_measurement["parameterized_profile_class"],
             result_for_beam_shape_measurement["dimensions"],
@@ -603,7 +808,10 @@ def convert_frame_member_to_fem_for_case_2(
         )
 
     else:
-        print("\tCase 2b: Standard Profile Name is Known from Metadata")
+        instrumentation.increment(name="case_2b")
+        instrumentation.message(
+            "\tCase 2b: Standard Profile Name is Known from Metadata"
+        )
         profile_def = inlbim.api.profile.add_profile_from_standard_library(
             ifc4_file=ifc4_destination_file,
             region=region,
@@ -641,31 +849,8 @@ def convert_frame_member_to_fem_for_case_2(
         relating_context=project,
     )
 
-    # Calculate points for StructuralCurveMember
-    p1 = tuple(float(val) for val in origin_in_global_coordinates)
-    assert len(p1) == 3
-    unit_scale = ifcopenshell.util.unit.calculate_unit_scale(
-        ifc_file=frame_member_from_source_file.file
-    )
-    p2 = tuple(
-        float(val)
-        for val in (
-            np.array(origin_in_global_coordinates)
-            + np.array(extrusion_direction_in_global_coordinates)
-            * unit_scale
-            * length_of_frame_member
-        ).tolist()
-    )
-    assert len(p2) == 3
-    p3 = tuple(
-        float(val)
-        for val in (
-            np.array(p1) + np.array(local_y_axis_in_global_coordinates) * 1.0
-        ).tolist()
-    )
-    assert len(p3) == 3
-
     # Create StructuralItem
+    p1, p2, p3 = geometric_analysis["points"]
     structural_curve_member = inlbim.api.structural.create_3pt_structural_curve_member(
         p1=p1,
         p2=p2,
@@ -674,6 +859,7 @@ def convert_frame_member_to_fem_for_case_2(
         material=material,
         structural_analysis_model=structural_analysis_model,
         corresponding_product=frame_member_copied_to_destination_file,
+        structural_point_connection_registry=structural_point_connection_registry,
     )
 
     return structural_curve_member
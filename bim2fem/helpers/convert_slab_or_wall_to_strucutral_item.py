@@ -17,6 +17,10 @@ import inlbim.api.element_type
 import ifcopenshell.api.type
 import ifcopenshell.api.project
 import inlbim.util.file
+import inlbim.util.instrumentation
+import inlbim.util.library
+import inlbim.util.resource
+import inlbim.util.structural
 
 
 def convert_planar_slab_or_wall_to_structural_item(
@@ -24,12 +28,32 @@ def convert_planar_slab_or_wall_to_structural_item(
     ifc4_destination_file: ifcopenshell.file,
     region: REGION,
     structural_analysis_model: ifcopenshell.entity_instance,
+    geometric_analysis: dict | None = None,
+    triangular_meshes: dict[str, TriangularMesh] | None = None,
+    resolution_cache: inlbim.util.library.ResolutionCache | None = None,
+    structural_point_connection_registry: (
+        inlbim.util.structural.StructuralPointConnectionRegistry | None
+    ) = None,
+    instrumentation: inlbim.util.instrumentation.Instrumentation | None = None,
 ) -> list[ifcopenshell.entity_instance] | None:
-
-    print("\tconvert_planar_slab_or_wall_to_structural_item()")
-    print(f"\tslab_or_wall_from_source_file: {slab_or_wall_from_source_file}")
-    print(f"\tregion: {region}")
-    print(f"\tstructural_analysis_model: {structural_analysis_model}")
+    """Convert a slab or wall to StructuralSurfaceMembers. The geometric analysis
+    may be precomputed (e.g., in a worker process) with
+    analyze_geometry_of_planar_slab_or_wall(); otherwise it is computed here,
+    reusing the element's mesh from triangular_meshes (keyed by GlobalId) if
+    given. The standard material name is memoized in resolution_cache, and
+    coincident StructuralPointConnections are reused through
+    structural_point_connection_registry, if given. Detailed messages are
+    reported to instrumentation, if given."""
+
+    if instrumentation is None:
+        instrumentation = inlbim.util.instrumentation.Instrumentation()
+
+    instrumentation.message("\tconvert_planar_slab_or_wall_to_structural_item()")
+    instrumentation.message(
+        f"\tslab_or_wall_from_source_file: {slab_or_wall_from_source_file}"
+    )
+    instrumentation.message(f"\tregion: {region}")
+    instrumentation.message(f"\tstructural_analysis_model: {structural_analysis_model}")
 
     # Add Slab/Wall to destination file with the original IfcGlobalId
     if slab_or_wall_from_source_file.is_a("IfcWall"):
@@ -38,11 +62,29 @@ def convert_planar_slab_or_wall_to_structural_item(
         element_class = "IfcSlab"
     else:
         return None
+
+    # Analyze geometry of the source element
+    if geometric_analysis is None:
+        geometric_analysis = analyze_geometry_of_planar_slab_or_wall(
+            slab_or_wall_from_source_file=slab_or_wall_from_source_file,
+            numeric_scale=inlbim.util.file.get_numeric_scale_of_project(
+                ifc4_file=ifc4_destination_file
+            ),
+            triangular_mesh=(triangular_meshes or {}).get(
+                slab_or_wall_from_source_file.GlobalId
+            ),
+        )
+    if "exception" in geometric_analysis:
+        raise geometric_analysis["exception"]
+
     slab_or_wall_copied_to_destination_file = ifcopenshell.api.root.create_entity(
         file=ifc4_destination_file,
         ifc_class=element_class,
         name=slab_or_wall_from_source_file.Name,
     )
+    slab_or_wall_copied_to_destination_file.GlobalId = (
+        slab_or_wall_from_source_file.GlobalId
+    )
     site = ifc4_destination_file.by_type(type="IfcSite", include_subtypes=False)[0]
     ifcopenshell.api.spatial.assign_container(
         file=ifc4_destination_file,
@@ -51,20 +93,18 @@ def convert_planar_slab_or_wall_to_structural_item(
     )
 
     # Get best matching standard material name, if it exists
-    material_names_from_destination_file = list(
-        {
-            material.Name
-            for material in ifc4_destination_file.by_type(
-                type="IfcMaterial",
-                include_subtypes=False,
-            )
-        }
+    material_names_from_destination_file = inlbim.util.resource.get_resource_registry(
+        ifc4_file=ifc4_destination_file
+    ).get_keys(
+        ifc_class="IfcMaterial",
+        calculate_key=inlbim.util.resource.get_name_of_material,
     )
     standard_material_name = (
         inlbim.util.material.get_best_matching_standard_material_from_element_metadata(
             element=slab_or_wall_from_source_file,
             region=region,
             other_material_names=material_names_from_destination_file,
+            resolution_cache=resolution_cache,
         )
     )
     if standard_material_name is None:
@@ -74,7 +114,7 @@ def convert_planar_slab_or_wall_to_structural_item(
             standard_material_name = "A36"
         else:
             standard_material_name = "S355"
-    print(f"\tstandard_material_name: {standard_material_name}")
+    instrumentation.message(f"\tstandard_material_name: {standard_material_name}")
 
     # Create the standard material
     material = inlbim.api.material.add_material_from_standard_library(
@@ -85,74 +125,7 @@ def convert_planar_slab_or_wall_to_structural_item(
     )
     assert isinstance(material, ifcopenshell.entity_instance)
 
-    # Triangular Mesh
-    triangular_mesh = TriangularMesh.from_ifc_element(
-        element=slab_or_wall_from_source_file
-    )
-    # triangular_mesh.plot_all()
-
-    # Get largest face
-    indices_of_all_faces = [_ for _ in range(len(triangular_mesh.faces))]
-    areas_of_all_faces = []
-    for index_of_face in indices_of_all_faces:
-        area_of_face = triangular_mesh.calculate_area_of_face(face_index=index_of_face)
-        areas_of_all_faces.append(area_of_face)
-    index_of_largest_face_in_group_1 = areas_of_all_faces.index(max(areas_of_all_faces))
-
-    # Get faces coplanar to largest face
-    indices_of_faces_in_group_1 = []
-    indices_of_faces_in_group_2 = []
-    for index_of_trial_face in indices_of_all_faces:
-        faces_are_coplanar = triangular_mesh.are_faces_coplanar(
-            index_of_face1=index_of_trial_face,
-            index_of_face2=index_of_largest_face_in_group_1,
-        )
-        if faces_are_coplanar:
-            indices_of_faces_in_group_1.append(index_of_trial_face)
-        else:
-            indices_of_faces_in_group_2.append(index_of_trial_face)
-    # triangular_mesh.plot_faces_3d(
-    #     faces_as_tuples_with_coordinates=triangular_mesh.get_coordinates_of_faces(
-    #         indices_of_faces=indices_of_faces_in_group_1
-    #     )
-    # )
-
-    # Get largest face in group 2
-    areas_of_faces_in_group_2 = []
-    for index_of_face in indices_of_faces_in_group_2:
-        area_of_face = triangular_mesh.calculate_area_of_face(face_index=index_of_face)
-        areas_of_faces_in_group_2.append(area_of_face)
-    index_of_largest_face_in_group_2 = indices_of_faces_in_group_2[
-        areas_of_faces_in_group_2.index(max(areas_of_faces_in_group_2))
-    ]
-
-    # Get numeric scale of project (for rounding thickness to a reasonable number)
-    numeric_scale = inlbim.util.file.get_numeric_scale_of_project(
-        ifc4_file=ifc4_destination_file
-    )
-
-    # Calculate distance between largest face in group 1 and largest face in group 2
-    normal_vector_of_group_1 = triangular_mesh.calculate_normal_vector_of_face(
-        face_index=index_of_largest_face_in_group_1
-    )
-    point_from_group_1 = triangular_mesh.get_coordinates_of_faces(
-        indices_of_faces=[index_of_largest_face_in_group_1]
-    )[0][0]
-    point_from_group_2 = triangular_mesh.get_coordinates_of_faces(
-        indices_of_faces=[index_of_largest_face_in_group_2]
-    )[0][0]
-    vector_from_point_in_group_2_to_point_in_group_1 = np.array(
-        point_from_group_1
-    ) - np.array(point_from_group_2)
-    thickness = float(
-        np.round(
-            np.dot(
-                vector_from_point_in_group_2_to_point_in_group_1,
-                normal_vector_of_group_1,
-            ),
-            numeric_scale,
-        )
-    )
+    thickness = geometric_analysis["thickness"]
 
     # Add and assign Type
     if slab_or_wall_copied_to_destination_file.is_a("IfcSlab"):
@@ -185,20 +158,9 @@ def convert_planar_slab_or_wall_to_structural_item(
 
     # Create StructuralItem
     structural_items = []
-    for index_of_face_in_group_1 in indices_of_faces_in_group_1:
-        coordinates_of_face_in_group_1 = triangular_mesh.get_coordinates_of_faces(
-            indices_of_faces=[index_of_face_in_group_1]
-        )[0]
-        translated_coordinates_of_face_in_group_1 = []
-        for point in coordinates_of_face_in_group_1:
-            translated_point = tuple(
-                val
-                for val in (
-                    np.array(point)
-                    + -1 * np.array(normal_vector_of_group_1) * thickness / 2.0
-                ).tolist()
-            )
-            translated_coordinates_of_face_in_group_1.append(translated_point)
+    for translated_coordinates_of_face_in_group_1 in geometric_analysis[
+        "translated_faces"
+    ]:
         inlbim.api.structural.create_npt_structural_surface_member(
             outer_profile=translated_coordinates_of_face_in_group_1,
             inner_profiles=[],
@@ -206,7 +168,77 @@ def convert_planar_slab_or_wall_to_structural_item(
             material=material,
             structural_analysis_model=structural_analysis_model,
             corresponding_product=slab_or_wall_copied_to_destination_file,
+            structural_point_connection_registry=structural_point_connection_registry,
         )
         structural_items.append(structural_items)
 
     return structural_items
+
+
+def analyze_geometry_of_planar_slab_or_wall(
+    slab_or_wall_from_source_file: ifcopenshell.entity_instance,
+    numeric_scale: int,
+    triangular_mesh: TriangularMesh | None = None,
+) -> dict:
+    """Analyze the geometry of a slab or wall without touching the destination
+    file. The result only holds plain data (float, tuple) so that it can be
+    computed in a worker process and committed later in the parent process"""
+
+    # Triangular Mesh
+    if triangular_mesh is None:
+        triangular_mesh = TriangularMesh.from_ifc_element(
+            element=slab_or_wall_from_source_file
+        )
+    # triangular_mesh.plot_all()
+
+    # Get faces coplanar to largest face (group 1) and largest face outside of it
+    clusters_of_coplanar_faces = triangular_mesh.get_clusters_of_coplanar_faces()
+    indices_of_faces_in_group_1 = clusters_of_coplanar_faces[0]["indices_of_faces"]
+    index_of_largest_face_in_group_1 = clusters_of_coplanar_faces[0][
+        "index_of_largest_face"
+    ]
+    index_of_largest_face_in_group_2 = clusters_of_coplanar_faces[1][
+        "index_of_largest_face"
+    ]
+    # triangular_mesh.plot_faces_3d(
+    #     faces_as_tuples_with_coordinates=triangular_mesh.get_coordinates_of_faces(
+    #         indices_of_faces=indices_of_faces_in_group_1
+    #     )
+    # )
+
+    # Calculate distance between largest face in group 1 and largest face in group 2
+    normal_vector_of_group_1 = triangular_mesh.calculate_normal_vector_of_face(
+        face_index=index_of_largest_face_in_group_1
+    )
+    point_from_group_1 = triangular_mesh.get_coordinates_of_faces(
+        indices_of_faces=[index_of_largest_face_in_group_1]
+    )[0][0]
+    point_from_group_2 = triangular_mesh.get_coordinates_of_faces(
+        indices_of_faces=[index_of_largest_face_in_group_2]
+    )[0][0]
+    vector_from_point_in_group_2_to_point_in_group_1 = np.array(
+        point_from_group_1
+    ) - np.array(point_from_group_2)
+    thickness = float(
+        np.round(
+            np.dot(
+                vector_from_point_in_group_2_to_point_in_group_1,
+                normal_vector_of_group_1,
+            ),
+            numeric_scale,
+        )
+    )
+
+    # Translate faces in group 1 to the mid-plane
+    translated_faces = [
+        [tuple(point) for point in translated_coordinates_of_face_in_group_1]
+        for translated_coordinates_of_face_in_group_1 in (
+            triangular_mesh.get_coordinates_of_all_faces()[indices_of_faces_in_group_1]
+            + -1 * np.array(normal_vector_of_group_1) * thickness / 2.0
+        ).tolist()
+    ]
+
+    return {
+        "thickness": thickness,
+        "translated_faces": translated_faces,
+    }
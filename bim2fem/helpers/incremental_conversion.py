@@ -0,0 +1,148 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+"""Module to update a StructuralAnalysisView file after the source model changed,
+by re-converting only the elements that were added or changed"""
+
+import ifcopenshell
+import ifcopenshell.api.root
+import inlbim.api.structural
+import inlbim.util.element
+import inlbim.util.file
+import inlbim.util.structural
+import numpy as np
+
+
+def get_changes_between_source_files(
+    elements_slated_for_conversion: list[ifcopenshell.entity_instance],
+    previous_elements_slated_for_conversion: list[ifcopenshell.entity_instance],
+) -> dict[str, list[str]]:
+    """Diff elements by GlobalId and fingerprint. Returns a dictionary with the
+    GlobalIds of added, changed, deleted, and unchanged elements"""
+
+    fingerprints = {
+        element.GlobalId: inlbim.util.element.get_fingerprint_of_element(
+            element=element
+        )
+        for element in elements_slated_for_conversion
+    }
+    previous_fingerprints = {
+        element.GlobalId: inlbim.util.element.get_fingerprint_of_element(
+            element=element
+        )
+        for element in previous_elements_slated_for_conversion
+    }
+
+    changes = {
+        "added": [],
+        "changed": [],
+        "deleted": [],
+        "unchanged": [],
+    }
+    for global_id, fingerprint in fingerprints.items():
+        if global_id not in previous_fingerprints:
+            changes["added"].append(global_id)
+        elif fingerprint != previous_fingerprints[global_id]:
+            changes["changed"].append(global_id)
+        else:
+            changes["unchanged"].append(global_id)
+    for global_id in previous_fingerprints:
+        if global_id not in fingerprints:
+            changes["deleted"].append(global_id)
+
+    return changes
+
+
+def converted_elements_exist_in_destination_file(
+    ifc4_destination_file: ifcopenshell.file,
+    global_ids: list[str],
+) -> bool:
+
+    for global_id in global_ids:
+        try:
+            ifc4_destination_file.by_guid(global_id)
+        except RuntimeError:
+            return False
+
+    return True
+
+
+def remove_converted_elements_from_destination_file(
+    ifc4_destination_file: ifcopenshell.file,
+    global_ids: list[str],
+):
+    """Remove the elements copied to the destination file, their StructuralMembers,
+    and the StructuralPointConnections left without any connection"""
+
+    for global_id in global_ids:
+        converted_element = ifc4_destination_file.by_guid(global_id)
+        inlbim.api.structural.remove_structural_members_assigned_to_product(
+            product=converted_element,
+        )
+        ifcopenshell.api.root.remove_product(
+            file=ifc4_destination_file,
+            product=converted_element,
+        )
+
+
+def get_structural_point_connections_in_affected_region(
+    ifc4_destination_file: ifcopenshell.file,
+    ids_of_previous_structural_point_connections: set[int],
+) -> list[ifcopenshell.entity_instance]:
+    """Get the StructuralPointConnections created since the previous conversion,
+    plus the previous ones within the precision of any of them, in the order of
+    the file. New StructuralPointConnections are hashed into a grid with the
+    precision as spacing, so each previous one only searches 27 cells"""
+
+    structural_point_connections = ifc4_destination_file.by_type(
+        type="IfcStructuralPointConnection", include_subtypes=False
+    )
+    is_new = [
+        structural_point_connection.id()
+        not in ids_of_previous_structural_point_connections
+        for structural_point_connection in structural_point_connections
+    ]
+    if not any(is_new):
+        return []
+
+    # Hash new StructuralPointConnections into a grid
+    precision = inlbim.util.file.get_precision_of_project(
+        ifc4_file=ifc4_destination_file
+    )
+    coordinates = np.array(
+        [
+            inlbim.util.structural.get_coordinates_of_structural_point_connection(
+                structural_point_connection=structural_point_connection,
+            )
+            for structural_point_connection in structural_point_connections
+        ]
+    )
+    cells = np.floor(coordinates / precision).astype(np.int64)
+    indices_of_new_points_of_cells = {}
+    for index in np.flatnonzero(is_new).tolist():
+        indices_of_new_points_of_cells.setdefault(
+            tuple(cells[index].tolist()), []
+        ).append(index)
+
+    # Keep previous StructuralPointConnections near a new one
+    structural_point_connections_in_affected_region = []
+    for index, (i, j, k) in enumerate(cells.tolist()):
+        if not is_new[index]:
+            candidates = [
+                index_of_new_point
+                for di in (-1, 0, 1)
+                for dj in (-1, 0, 1)
+                for dk in (-1, 0, 1)
+                for index_of_new_point in indices_of_new_points_of_cells.get(
+                    (i + di, j + dj, k + dk), []
+                )
+            ]
+            if len(candidates) == 0 or not np.any(
+                np.linalg.norm(coordinates[candidates] - coordinates[index], axis=1)
+                <= precision
+            ):
+                continue
+        structural_point_connections_in_affected_region.append(
+            structural_point_connections[index]
+        )
+
+    return structural_point_connections_in_affected_region
@@ -6,13 +6,14 @@ import inlbim.util.structural
 import inlbim.api.structural
 import ifcopenshell.util.element
 import numpy as np
-import inlbim.util.profile
 import inlbim.util.material
+from bim2fem.helpers.snapping_metadata import SnappingMetadataTable
 
 
 def snap_floor_beam_systems(
     ifc4_sav_file: ifcopenshell.file,
     minimum_allowable_snapping_distance=1.0,
+    snapping_metadata_table: SnappingMetadataTable | None = None,
 ) -> ifcopenshell.file:
 
     # Print Statement
@@ -54,12 +55,21 @@ def snap_floor_beam_systems(
     )
     print(f"\tlen(slabs): {len(slabs)}")
 
+    # Metadata of members is resolved once per run
+    if snapping_metadata_table is None:
+        snapping_metadata_table = SnappingMetadataTable()
+    largest_dimensions_of_frame_members = snapping_metadata_table.get_large_dimensions(
+        structural_curve_members=beams + columns + members
+    )
+
     # Largest dimensions of beam profiles mapped to associated beam nodes
     largest_profile_dimensions_mapped_to_nodes = {}
 
     # Get all nodes associated with frame members
     all_frame_member_nodes = []
-    for frame_member in beams + columns + members:
+    for frame_member, largest_dimension in zip(
+        beams + columns + members, largest_dimensions_of_frame_members.tolist()
+    ):
 
         # Get Nodes
         nodes = inlbim.util.structural.get_ordered_structural_point_connections_of_linear_structural_curve_member(
@@ -67,21 +77,6 @@ def snap_floor_beam_systems(
         )
         all_frame_member_nodes += nodes
 
-        # Get ProfileDef and Material
-        material_profile_set = ifcopenshell.util.element.get_material(
-            element=frame_member,
-            should_skip_usage=True,
-        )
-        assert isinstance(material_profile_set, ifcopenshell.entity_instance)
-        profile_def = material_profile_set.MaterialProfiles[0].Profile
-
-        # Get largest dimension
-        largest_dimension = (
-            inlbim.util.profile.get_large_dimension_of_parameterized_profile_def(
-                parameterized_profile_def=profile_def
-            )
-        )
-
         # Assign largest profile dimension information to nodes
         for node in nodes:
             if node not in largest_profile_dimensions_mapped_to_nodes.keys():
@@ -1,6 +1,7 @@
 # Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
 
 
+import heapq
 import ifcopenshell
 import inlbim.util.geometry
 import inlbim.util.structural
@@ -9,15 +10,37 @@ import ifcopenshell.util.element
 import numpy as np
 import inlbim.util.file
 import inlbim.util.profile
+from bim2fem.helpers.snapping_metadata import SnappingMetadataTable, EndpointCache
 
 
 def snap_frame_members(
     ifc4_sav_file: ifcopenshell.file,
+    snapping_metadata_table: SnappingMetadataTable | None = None,
+    maximum_number_of_cycles: int | None = None,
+    convergence_report: dict | None = None,
 ) -> ifcopenshell.file:
+    """Divide and snap beams and members onto columns, then onto the members
+    snapped in the previous cycle, until no members are left to snap or the
+    maximum number of cycles is reached. Endpoints are cached across cycles, so
+    only members created and StructuralPointConnections translated since are read
+    again. If given, convergence_report is filled with whether the cycles
+    converged and the counts of each cycle"""
 
     # Print Statement
     print("\nSnap Structural Framing Together")
 
+    # Metadata of members is resolved once per run
+    if snapping_metadata_table is None:
+        snapping_metadata_table = SnappingMetadataTable()
+
+    # Endpoints of members are cached across cycles
+    endpoint_cache = EndpointCache()
+
+    if convergence_report is None:
+        convergence_report = {}
+    convergence_report["converged"] = False
+    convergence_report["cycles"] = []
+
     # Get Columns
     columns = (
         inlbim.util.structural.get_structural_items_assigned_to_specified_element_class(
@@ -64,16 +87,39 @@ def snap_frame_members(
 
         # If there are no more snapping members, break
         if len(snapping_members) == 0:
+            convergence_report["converged"] = True
             break
 
         # If there are no more static_members, break
         if len(static_members) == 0:
+            convergence_report["converged"] = True
+            break
+
+        # Stop at the maximum number of cycles, unless the last one converged
+        if maximum_number_of_cycles is not None and (
+            cycle_num > maximum_number_of_cycles
+        ):
+            print(
+                "\tStopped after the maximum number of snap cycles "
+                + f"({maximum_number_of_cycles}) with {len(snapping_members)} "
+                + "snapping members left"
+            )
             break
 
+        # Track the StructuralPointConnections translated in this cycle
+        endpoint_cache.ids_of_translated_structural_point_connections = set()
+        cycle_report = {
+            "cycle": cycle_num,
+            "static_members": len(static_members),
+            "snapping_members": len(snapping_members),
+        }
+
         # Divide two sets of structural framing
         divided_snapping_members = divide_structural_curve_members_at_intersection_points_on_spans_with_other_members(
             indivisible_members=static_members,
             divisible_members=snapping_members,
+            snapping_metadata_table=snapping_metadata_table,
+            endpoint_cache=endpoint_cache,
         )
 
         # Print after dividing
@@ -91,6 +137,8 @@ def snap_frame_members(
                 ifc_file=ifc4_sav_file,
                 static_members=static_members,
                 snapping_members=divided_snapping_members,
+                snapping_metadata_table=snapping_metadata_table,
+                endpoint_cache=endpoint_cache,
             )
         )
 
@@ -103,6 +151,8 @@ def snap_frame_members(
                 ifc_file=ifc4_sav_file,
                 static_members=fully_snapped_members,
                 snapping_members=partially_snapped_members,
+                snapping_metadata_table=snapping_metadata_table,
+                endpoint_cache=endpoint_cache,
             )
 
         # Print after snapping
@@ -110,14 +160,41 @@ def snap_frame_members(
         print(f"\t\tstatic_members: {len(static_members)}")
         print(f"\t\tsnapping_members: {len(snapping_members)}")
 
+        # Report the changes of the cycle
+        cycle_report["members_created_by_division"] = (
+            len(divided_snapping_members) - cycle_report["snapping_members"]
+        )
+        cycle_report["fully_snapped_members"] = len(fully_snapped_members)
+        cycle_report["partially_snapped_members"] = len(partially_snapped_members)
+        cycle_report["unsnapped_members"] = len(unsnapped_members)
+        cycle_report["translated_structural_point_connections"] = len(
+            endpoint_cache.ids_of_translated_structural_point_connections
+        )
+        convergence_report["cycles"].append(cycle_report)
+        print(
+            "\tTranslated StructuralPointConnections: "
+            + f"{cycle_report['translated_structural_point_connections']}"
+        )
+
+    convergence_report["number_of_cycles"] = len(convergence_report["cycles"])
+    print(
+        f"\nSnap cycles converged: {convergence_report['converged']} "
+        + f"({convergence_report['number_of_cycles']} cycles)"
+    )
+
     return ifc4_sav_file
 
 
 def divide_structural_curve_members_at_intersection_points_on_spans_with_other_members(
     indivisible_members: list[ifcopenshell.entity_instance],
     divisible_members: list[ifcopenshell.entity_instance],
+    snapping_metadata_table: SnappingMetadataTable | None = None,
+    endpoint_cache: EndpointCache | None = None,
 ) -> list[ifcopenshell.entity_instance]:
 
+    if snapping_metadata_table is None:
+        snapping_metadata_table = SnappingMetadataTable()
+
     # Initialize division locations
     division_locations_as_proportion_of_length_for_each_divisible_member = {}
     for divisible_member in divisible_members:
@@ -125,95 +202,128 @@ def divide_structural_curve_members_at_intersection_points_on_spans_with_other_m
             divisible_member
         ] = []
 
-    # Loop through indivisible members
-    for indivisible_member in indivisible_members:
+    # Get start and end points of members
+    segments_of_indivisible_members = get_segments_of_linear_structural_curve_members(
+        linear_structural_curve_members=indivisible_members,
+        endpoint_cache=endpoint_cache,
+    )
+    segments_of_divisible_members = get_segments_of_linear_structural_curve_members(
+        linear_structural_curve_members=divisible_members,
+        endpoint_cache=endpoint_cache,
+    )
 
-        # Get coordinates of indivisible member
-        start_point_of_indivisble_member, end_point_of_indivisble_member, _ = (
-            inlbim.util.structural.get_coordinates_of_points_of_linear_structural_curve_member(
-                linear_structural_curve_member=indivisible_member
-            )
+    # Only pairs of members whose AABBs, each inflated by the member's snapping
+    # reach, overlap can be within the allowable snapping distance of each other
+    indices_of_divisible_members_near_indivisible_members = (
+        get_indices_of_members_within_snapping_reach(
+            members=indivisible_members,
+            segments_of_members=segments_of_indivisible_members,
+            other_members=divisible_members,
+            segments_of_other_members=segments_of_divisible_members,
+            snapping_metadata_table=snapping_metadata_table,
         )
+    )
+    indices_of_pairs = [
+        (index_of_indivisible_member, index_of_divisible_member)
+        for index_of_indivisible_member, indices_of_divisible_members in enumerate(
+            indices_of_divisible_members_near_indivisible_members
+        )
+        for index_of_divisible_member in indices_of_divisible_members
+    ]
+    if len(indices_of_pairs) == 0:
+        indices_of_pairs = np.zeros((0, 2), dtype=np.int64)
+
+    # Calculate the shortest lines connecting the pairs of members
+    shortest_lines = (
+        inlbim.util.geometry.calculate_shortest_lines_connecting_pairs_of_segments(
+            segments_1=segments_of_indivisible_members,
+            segments_2=segments_of_divisible_members,
+            indices_of_pairs=indices_of_pairs,
+        )
+    )
 
-        # Loop through divisible members
-        for divisible_member in divisible_members:
-
-            # Get the allowable snapping distance
-            allowable_snapping_distance = (
-                get_allowable_snapping_distance_between_structural_curve_members(
-                    structural_curve_member_1=indivisible_member,
-                    structural_curve_member_2=divisible_member,
-                )
-            )
-
-            # Get coordinates of divisible member
-            start_point_of_divisble_member, end_point_of_divisble_member, _ = (
-                inlbim.util.structural.get_coordinates_of_points_of_linear_structural_curve_member(
-                    linear_structural_curve_member=divisible_member
-                )
-            )
-
-            # Calculate coordinates of endpoints of shortest line connecting the two members
-            (
-                start_point_of_connecting_line,
-                end_point_of_connecting_line,
-            ) = inlbim.util.geometry.calculate_endpoint_coordinates_of_shortest_line_connecting_two_lines(
-                coordinates_of_start_of_line_1=start_point_of_indivisble_member,
-                coordinates_of_end_of_line_1=end_point_of_indivisble_member,
-                coordinates_of_start_of_line_2=start_point_of_divisble_member,
-                coordinates_of_end_of_line_2=end_point_of_divisble_member,
-                assume_line_1_is_finite=True,
-                assume_line_2_is_finite=True,
-            )
-
-            # Check if None values were returned for the intersecting line (indicates that the edges are parallel)
-            if start_point_of_connecting_line is None:
-                continue
-
-            # Get vectors of the intersecting line endpoints
-            r_i = np.array(start_point_of_connecting_line)
-            r_j = np.array(end_point_of_connecting_line)
+    # Calculate the distances from the end points of the connecting lines (on the
+    # divisible members) to the ends of the divisible members
+    r_j = shortest_lines["end_points"]
+    q_i = segments_of_divisible_members[shortest_lines["indices_of_pairs"][:, 1], 0]
+    q_j = segments_of_divisible_members[shortest_lines["indices_of_pairs"][:, 1], 1]
+    distances_to_start_points_of_divisible_members = (
+        inlbim.util.geometry.calculate_norms_of_rows(r_j - q_i)
+    )
+    distances_to_end_points_of_divisible_members = (
+        inlbim.util.geometry.calculate_norms_of_rows(r_j - q_j)
+    )
+    lengths_of_divisible_members = inlbim.util.geometry.calculate_norms_of_rows(
+        q_j - q_i
+    )
 
-            # Get vectors of the edge_of_divisible_member endpoints
-            q_i = np.array(start_point_of_divisble_member)
-            q_j = np.array(end_point_of_divisble_member)
+    # Get the allowable snapping distances of the pairs
+    allowable_snapping_distances = (
+        snapping_metadata_table.get_allowable_snapping_distances_of_rows(
+            rows_1=snapping_metadata_table.get_rows(
+                structural_curve_members=indivisible_members
+            )[shortest_lines["indices_of_pairs"][:, 0]],
+            rows_2=snapping_metadata_table.get_rows(
+                structural_curve_members=divisible_members
+            )[shortest_lines["indices_of_pairs"][:, 1]],
+        )
+    )
 
-            # Calculate the distance between edges
-            distance_between_edges = np.linalg.norm(r_j - r_i)
+    # Loop through pairs
+    for (
+        (index_of_indivisible_member, index_of_divisible_member),
+        edges_are_parallel,
+        distance_between_edges,
+        distance_to_start_point_of_divisible_member,
+        distance_to_end_point_of_divisible_member,
+        length_of_divisible_member,
+        allowable_snapping_distance,
+    ) in zip(
+        shortest_lines["indices_of_pairs"].tolist(),
+        shortest_lines["are_parallel"],
+        shortest_lines["distances"],
+        distances_to_start_points_of_divisible_members,
+        distances_to_end_points_of_divisible_members,
+        lengths_of_divisible_members,
+        allowable_snapping_distances,
+    ):
+
+        # Skip parallel edges (there is no single connecting line)
+        if edges_are_parallel:
+            continue
+
+        divisible_member = divisible_members[index_of_divisible_member]
+
+        # Determine whether the snapping threshold is exceeded
+        snapping_distance_is_within_threshold = (
+            distance_between_edges <= allowable_snapping_distance
+        )
 
-            # Determine whether the snapping threshold is exceeded
-            snapping_distance_is_within_threshold = (
-                distance_between_edges <= allowable_snapping_distance
-            )
+        # Determine whether the connecting line endpoints are too close to the divisible Edge endpoints
+        connecting_line_is_too_close_to_divisible_member_endpoint = any(
+            [
+                distance_to_start_point_of_divisible_member
+                <= allowable_snapping_distance,
+                distance_to_end_point_of_divisible_member
+                <= allowable_snapping_distance,
+            ]
+        )
 
-            # Determine whether the connecting line endpoints are too close to the divisible Edge endpoints
-            connecting_line_is_too_close_to_divisible_member_endpoint = any(
-                [
-                    np.linalg.norm(r_j - q_i) <= allowable_snapping_distance,
-                    np.linalg.norm(r_j - q_j) <= allowable_snapping_distance,
-                ]
-            )
+        # Check whether the intersection meets the criteria
+        intersecting_line_between_the_edges_meets_criteria_for_defining_a_division_point = all(
+            [
+                snapping_distance_is_within_threshold,
+                not connecting_line_is_too_close_to_divisible_member_endpoint,
+            ]
+        )
 
-            # Check whether the intersection meets the criteria
-            intersecting_line_between_the_edges_meets_criteria_for_defining_a_division_point = all(
-                [
-                    snapping_distance_is_within_threshold,
-                    not connecting_line_is_too_close_to_divisible_member_endpoint,
-                ]
+        if intersecting_line_between_the_edges_meets_criteria_for_defining_a_division_point:
+            division_location_as_proportion_of_length_of_divisible_member = (
+                distance_to_start_point_of_divisible_member / length_of_divisible_member
             )
-
-            if intersecting_line_between_the_edges_meets_criteria_for_defining_a_division_point:
-                division_location_as_distance_from_start_point_of_divisible_member = (
-                    np.linalg.norm(q_i - r_j)
-                )
-                length_of_divisible_member = np.linalg.norm(q_j - q_i)
-                division_location_as_proportion_of_length_of_divisible_member = (
-                    division_location_as_distance_from_start_point_of_divisible_member
-                    / length_of_divisible_member
-                )
-                division_locations_as_proportion_of_length_for_each_divisible_member[
-                    divisible_member
-                ].append(division_location_as_proportion_of_length_of_divisible_member)
+            division_locations_as_proportion_of_length_for_each_divisible_member[
+                divisible_member
+            ].append(division_location_as_proportion_of_length_of_divisible_member)
 
     # Divide the items
     new_structural_curve_members_after_division = []
@@ -229,9 +339,92 @@ def divide_structural_curve_members_at_intersection_points_on_spans_with_other_m
         )
         new_structural_curve_members_after_division += new_structural_curve_members
 
+        # The end of a divided member is moved to its first division point
+        if endpoint_cache is not None and len(new_structural_curve_members) > 1:
+            endpoint_cache.mark_as_translated(
+                structural_point_connection=endpoint_cache.get_structural_point_connections(
+                    linear_structural_curve_member=divisible_member
+                )[
+                    1
+                ]
+            )
+
     return new_structural_curve_members_after_division
 
 
+def get_segments_of_linear_structural_curve_members(
+    linear_structural_curve_members: list[ifcopenshell.entity_instance],
+    endpoint_cache: EndpointCache | None = None,
+) -> np.ndarray:
+    """Get (N, 2, 3) array of the start and end points of linear
+    StructuralCurveMembers"""
+
+    if endpoint_cache is not None:
+        return endpoint_cache.get_segments(
+            linear_structural_curve_members=linear_structural_curve_members
+        )
+
+    segments = np.zeros((len(linear_structural_curve_members), 2, 3))
+    for index, linear_structural_curve_member in enumerate(
+        linear_structural_curve_members
+    ):
+        start_point, end_point, _ = (
+            inlbim.util.structural.get_coordinates_of_points_of_linear_structural_curve_member(
+                linear_structural_curve_member=linear_structural_curve_member
+            )
+        )
+        segments[index] = [start_point, end_point]
+
+    return segments
+
+
+def get_indices_of_members_within_snapping_reach(
+    members: list[ifcopenshell.entity_instance],
+    segments_of_members: np.ndarray,
+    other_members: list[ifcopenshell.entity_instance],
+    segments_of_other_members: np.ndarray,
+    snapping_metadata_table: SnappingMetadataTable | None = None,
+) -> list[list[int]]:
+    """For each member, get the sorted indices of the other members that may be
+    within the allowable snapping distance of it. The allowable snapping
+    distance of a pair never exceeds the larger of the allowable snapping
+    distances of each member with itself (its reach), so pairs whose AABBs,
+    each inflated by the member's reach (plus the precision), do not overlap are
+    left out"""
+
+    if len(members) == 0 or len(other_members) == 0:
+        return [[] for _ in members]
+
+    precision = inlbim.util.file.get_precision_of_project(ifc4_file=members[0].file)
+
+    if snapping_metadata_table is None:
+        snapping_metadata_table = SnappingMetadataTable()
+
+    aabbs = []
+    for members_of_set, segments_of_members_of_set in [
+        (members, segments_of_members),
+        (other_members, segments_of_other_members),
+    ]:
+        reaches = snapping_metadata_table.get_reaches(
+            structural_curve_members=members_of_set
+        )
+        aabbs.append(
+            (
+                segments_of_members_of_set.min(axis=1)
+                - (reaches[:, np.newaxis] + precision),
+                segments_of_members_of_set.max(axis=1)
+                + (reaches[:, np.newaxis] + precision),
+            )
+        )
+
+    return inlbim.util.geometry.get_indices_of_overlapping_aabbs(
+        mins_of_query_boxes=aabbs[0][0],
+        maxs_of_query_boxes=aabbs[0][1],
+        mins_of_boxes=aabbs[1][0],
+        maxs_of_boxes=aabbs[1][1],
+    )
+
+
 def get_allowable_snapping_distance_between_structural_curve_members(
     structural_curve_member_1: ifcopenshell.entity_instance,
     structural_curve_member_2: ifcopenshell.entity_instance,
@@ -377,9 +570,12 @@ def snap_sets_of_structural_curve_members_together(
     ifc_file: ifcopenshell.file,
     static_members: list[ifcopenshell.entity_instance],
     snapping_members: list[ifcopenshell.entity_instance],
+    snapping_metadata_table: SnappingMetadataTable | None = None,
+    endpoint_cache: EndpointCache | None = None,
 ):
-    # Get Numeric Scale of Project
+    # Get Numeric Scale and Precision of Project
     numeric_scale = inlbim.util.file.get_numeric_scale_of_project(ifc4_file=ifc_file)
+    precision = inlbim.util.file.get_precision_of_project(ifc4_file=ifc_file)
 
     # Record total number of members
     total_number_of_members_before_operation = len(static_members + snapping_members)
@@ -389,88 +585,300 @@ def snap_sets_of_structural_curve_members_together(
     for snapping_member in snapping_members:
         count_for_snapped_endpoints[snapping_member.id()] = 0
 
+    # Index the StructuralPointConnections at the endpoints of the members. Their
+    # coordinates are kept in an array while snapping and written to the file in
+    # one batch at the end
+    if endpoint_cache is None:
+        endpoint_cache = EndpointCache()
+    structural_point_connections = []
+    indices_of_structural_point_connections = {}
+    indices_of_endpoints_of_sets = []
+    for members in [static_members, snapping_members]:
+        indices_of_endpoints_of_members = np.zeros((len(members), 2), dtype=int)
+        for index_of_member, member in enumerate(members):
+            for index_of_endpoint, structural_point_connection in enumerate(
+                endpoint_cache.get_structural_point_connections(
+                    linear_structural_curve_member=member,
+                )
+            ):
+                index_of_structural_point_connection = (
+                    indices_of_structural_point_connections.setdefault(
+                        structural_point_connection.id(),
+                        len(structural_point_connections),
+                    )
+                )
+                if index_of_structural_point_connection == len(
+                    structural_point_connections
+                ):
+                    structural_point_connections.append(structural_point_connection)
+                indices_of_endpoints_of_members[index_of_member, index_of_endpoint] = (
+                    index_of_structural_point_connection
+                )
+        indices_of_endpoints_of_sets.append(indices_of_endpoints_of_members)
+    indices_of_endpoints_of_static_members = indices_of_endpoints_of_sets[0]
+    # Endpoint k is endpoint k % 2 of snapping member k // 2
+    indices_of_endpoints_of_snapping_members = indices_of_endpoints_of_sets[1].ravel()
+
+    coordinates_of_structural_point_connections = np.array(
+        [
+            endpoint_cache.get_coordinates(
+                structural_point_connection=structural_point_connection
+            )
+            for structural_point_connection in structural_point_connections
+        ],
+        dtype=float,
+    ).reshape(-1, 3)
+
+    # Track translated StructuralPointConnections, in order of first translation
+    structural_point_connection_is_translated = np.zeros(
+        len(structural_point_connections), dtype=bool
+    )
+    indices_of_translated_structural_point_connections = []
+
+    # Snapping members at each StructuralPointConnection
+    indices_of_snapping_members_at_structural_point_connections = {}
+    for index_of_endpoint, index_of_structural_point_connection in enumerate(
+        indices_of_endpoints_of_snapping_members.tolist()
+    ):
+        indices_of_snapping_members_at_structural_point_connections.setdefault(
+            index_of_structural_point_connection, []
+        ).append(index_of_endpoint // 2)
+
+    # For each static member, get the endpoints of snapping members that may be
+    # within the allowable snapping distance (before any translation). The
+    # allowable snapping distance of a pair never exceeds the larger reach of the
+    # two members, and snapping distances are rounded to the numeric scale
+    if snapping_metadata_table is None:
+        snapping_metadata_table = SnappingMetadataTable()
+    rows_of_static_members = snapping_metadata_table.get_rows(
+        structural_curve_members=static_members
+    )
+    rows_of_snapping_members = snapping_metadata_table.get_rows(
+        structural_curve_members=snapping_members
+    )
+    reaches_of_sets = [
+        snapping_metadata_table.get_reaches(structural_curve_members=members)
+        for members in [static_members, snapping_members]
+    ]
+    margins_of_static_members = (
+        reaches_of_sets[0] + precision + 10.0**-numeric_scale
+    )[:, np.newaxis]
+    margins_of_endpoints = (
+        np.repeat(reaches_of_sets[1], 2) + precision + 10.0**-numeric_scale
+    )[:, np.newaxis]
+    segments_of_static_members = coordinates_of_structural_point_connections[
+        indices_of_endpoints_of_static_members
+    ]
+    endpoints_of_snapping_members = coordinates_of_structural_point_connections[
+        indices_of_endpoints_of_snapping_members
+    ]
+    indices_of_endpoints_within_reach = (
+        inlbim.util.geometry.get_indices_of_overlapping_aabbs(
+            mins_of_query_boxes=segments_of_static_members.min(axis=1)
+            - margins_of_static_members,
+            maxs_of_query_boxes=segments_of_static_members.max(axis=1)
+            + margins_of_static_members,
+            mins_of_boxes=endpoints_of_snapping_members - margins_of_endpoints,
+            maxs_of_boxes=endpoints_of_snapping_members + margins_of_endpoints,
+        )
+    )
+
     # Loop through static members
-    for static_member in static_members:
+    for index_of_static_member, static_member in enumerate(static_members):
 
-        # Get coordinates of indivisible member
-        start_point_of_static_member, end_point_of_static_member, _ = (
-            inlbim.util.structural.get_coordinates_of_points_of_linear_structural_curve_member(
-                linear_structural_curve_member=static_member
+        # Get coordinates of static member
+        start_point_of_static_member, end_point_of_static_member = (
+            coordinates_of_structural_point_connections[
+                indices_of_endpoints_of_static_members[index_of_static_member]
+            ]
+        )
+
+        # Get candidate endpoints: those within reach, and those translated so far.
+        # If the static member was translated, all endpoints are candidates
+        if structural_point_connection_is_translated[
+            indices_of_endpoints_of_static_members[index_of_static_member]
+        ].any():
+            indices_of_candidate_endpoints = np.arange(
+                len(indices_of_endpoints_of_snapping_members)
+            )
+        else:
+            indices_of_candidate_endpoints = np.union1d(
+                np.array(
+                    indices_of_endpoints_within_reach[index_of_static_member],
+                    dtype=int,
+                ),
+                np.flatnonzero(
+                    structural_point_connection_is_translated[
+                        indices_of_endpoints_of_snapping_members
+                    ]
+                ),
+            )
+        if len(indices_of_candidate_endpoints) == 0:
+            continue
+
+        # Project candidate endpoints onto the static member in bulk
+        coordinates_of_candidate_endpoints = (
+            coordinates_of_structural_point_connections[
+                indices_of_endpoints_of_snapping_members[indices_of_candidate_endpoints]
+            ]
+        )
+        translation_vectors = (
+            inlbim.util.geometry.calculate_coordinates_of_points_projected_onto_line(
+                points=coordinates_of_candidate_endpoints,
+                start_point_of_line=start_point_of_static_member,
+                end_point_of_line=end_point_of_static_member,
+                assume_line_is_finite=True,
+            )
+            - coordinates_of_candidate_endpoints
+        )
+        snapping_distances = np.round(
+            inlbim.util.geometry.calculate_norms_of_rows(translation_vectors),
+            numeric_scale,
+        )
+        positions_of_candidate_endpoints = {
+            index_of_endpoint: position
+            for position, index_of_endpoint in enumerate(
+                indices_of_candidate_endpoints.tolist()
+            )
+        }
+
+        # Get the allowable snapping distances of the static member and the
+        # snapping members
+        allowable_snapping_distances = (
+            snapping_metadata_table.get_allowable_snapping_distances_of_rows(
+                rows_1=rows_of_static_members[index_of_static_member],
+                rows_2=rows_of_snapping_members,
             )
         )
 
-        # Loop through snapping_members
-        for snapping_member in snapping_members:
+        # Loop through snapping members with candidate endpoints, in order. Snapping
+        # members sharing a StructuralPointConnection translated in this loop are
+        # queued too, since their projections are outdated
+        queue_of_snapping_members = sorted(
+            set((indices_of_candidate_endpoints // 2).tolist())
+        )
+        heapq.heapify(queue_of_snapping_members)
+        queued_snapping_members = set(queue_of_snapping_members)
+        indices_of_structural_point_connections_translated_in_loop = set()
+        while queue_of_snapping_members:
+            index_of_snapping_member = heapq.heappop(queue_of_snapping_members)
+            snapping_member = snapping_members[index_of_snapping_member]
 
             # Check whether both endpoints are snapped
             if count_for_snapped_endpoints[snapping_member.id()] > 1:
                 continue
 
             # Get the allowable snapping distance
-            allowable_snapping_distance = (
-                get_allowable_snapping_distance_between_structural_curve_members(
-                    structural_curve_member_1=static_member,
-                    structural_curve_member_2=snapping_member,
-                )
-            )
-
-            # Get StructuralPointConnections of snapping member
-            structural_point_connections_of_snapping_member = inlbim.util.structural.get_ordered_structural_point_connections_of_linear_structural_curve_member(
-                linear_structural_curve_member=snapping_member,
-            )
-
-            # Loop through StructuralPointConnections
-            for (
-                structural_point_connection_of_snapping_member
-            ) in structural_point_connections_of_snapping_member:
-
-                # Get coordinates of StructuralPointConnection of snapping member
-                coordinates_of_structural_point_connection = inlbim.util.structural.get_coordinates_of_structural_point_connection(
-                    structural_point_connection=structural_point_connection_of_snapping_member
-                )
+            allowable_snapping_distance = allowable_snapping_distances[
+                index_of_snapping_member
+            ]
 
-                # Get coordinates of VertexPoint projected onto Edge
-                projected_coordinates_of_structural_point_connection = inlbim.util.geometry.calculate_coordinates_of_point_projected_onto_line(
-                    point=coordinates_of_structural_point_connection,
-                    start_point_of_line=start_point_of_static_member,
-                    end_point_of_line=end_point_of_static_member,
-                    assume_line_is_finite=True,
+            # Loop through endpoints
+            for index_of_endpoint in [
+                2 * index_of_snapping_member,
+                2 * index_of_snapping_member + 1,
+            ]:
+                index_of_structural_point_connection = int(
+                    indices_of_endpoints_of_snapping_members[index_of_endpoint]
                 )
 
-                # Calculate the translation vector
-                translation_vector = np.array(
-                    projected_coordinates_of_structural_point_connection
-                ) - np.array(coordinates_of_structural_point_connection)
-
-                # Calculate the distance from the snapping VertexPoint and the Edge
-                snapping_distance = np.linalg.norm(translation_vector)
-
-                # Determine whether the snapping distance is within defined limits
-                snapping_distance_is_within_threshold = (
-                    np.round(snapping_distance, numeric_scale)
-                    <= allowable_snapping_distance
-                )
+                # Get the translation vector and the (rounded) snapping distance
+                if (
+                    index_of_structural_point_connection
+                    in indices_of_structural_point_connections_translated_in_loop
+                ):
+                    coordinates_of_endpoint = (
+                        coordinates_of_structural_point_connections[
+                            [index_of_structural_point_connection]
+                        ]
+                    )
+                    translation_vector = (
+                        inlbim.util.geometry.calculate_coordinates_of_points_projected_onto_line(
+                            points=coordinates_of_endpoint,
+                            start_point_of_line=start_point_of_static_member,
+                            end_point_of_line=end_point_of_static_member,
+                            assume_line_is_finite=True,
+                        )
+                        - coordinates_of_endpoint
+                    )[0]
+                    snapping_distance = np.round(
+                        inlbim.util.geometry.calculate_norms_of_rows(
+                            translation_vector
+                        ),
+                        numeric_scale,
+                    )
+                elif index_of_endpoint in positions_of_candidate_endpoints:
+                    position = positions_of_candidate_endpoints[index_of_endpoint]
+                    translation_vector = translation_vectors[position]
+                    snapping_distance = snapping_distances[position]
+                else:
+                    continue
 
                 # If the snapping distance is within the threshold, then snap
-                if snapping_distance_is_within_threshold:
+                if snapping_distance <= allowable_snapping_distance:
 
                     # If the snapping distance is greater than zero, then translate
-                    if 0.0 < np.round(snapping_distance, numeric_scale):
-                        translation = tuple(
-                            float(val) for val in translation_vector.tolist()
-                        )
-                        assert len(translation) == 3
-                        inlbim.api.structural.translate_structural_point_connection(
-                            structural_point_connection=structural_point_connection_of_snapping_member,
-                            translation=translation,
+                    if 0.0 < snapping_distance:
+                        coordinates_of_structural_point_connections[
+                            index_of_structural_point_connection
+                        ] += translation_vector
+                        if not structural_point_connection_is_translated[
+                            index_of_structural_point_connection
+                        ]:
+                            structural_point_connection_is_translated[
+                                index_of_structural_point_connection
+                            ] = True
+                            indices_of_translated_structural_point_connections.append(
+                                index_of_structural_point_connection
+                            )
+                        indices_of_structural_point_connections_translated_in_loop.add(
+                            index_of_structural_point_connection
                         )
+                        for (
+                            index_of_other_snapping_member
+                        ) in indices_of_snapping_members_at_structural_point_connections[
+                            index_of_structural_point_connection
+                        ]:
+                            if (
+                                index_of_other_snapping_member
+                                > index_of_snapping_member
+                                and index_of_other_snapping_member
+                                not in queued_snapping_members
+                            ):
+                                heapq.heappush(
+                                    queue_of_snapping_members,
+                                    index_of_other_snapping_member,
+                                )
+                                queued_snapping_members.add(
+                                    index_of_other_snapping_member
+                                )
 
                     # Update the count for snapped endpoints
                     count_for_snapped_endpoints[snapping_member.id()] += 1
 
-                    # Break the loop of the VertexPoints
+                    # Break the loop of the endpoints
                     break
 
+    # Write the coordinates of translated StructuralPointConnections to the file
+    for (
+        index_of_structural_point_connection
+    ) in indices_of_translated_structural_point_connections:
+        inlbim.api.structural.edit_coordinates_of_structural_point_connection(
+            structural_point_connection=structural_point_connections[
+                index_of_structural_point_connection
+            ],
+            coordinates=tuple(
+                coordinates_of_structural_point_connections[
+                    index_of_structural_point_connection
+                ].tolist()
+            ),
+        )
+        endpoint_cache.mark_as_translated(
+            structural_point_connection=structural_point_connections[
+                index_of_structural_point_connection
+            ]
+        )
+
     # Initialize final lists
     unsnapped_members, partially_snapped_members, fully_snapped_members = [], [], []
 
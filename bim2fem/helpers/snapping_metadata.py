@@ -0,0 +1,252 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+"""Per-run table of the metadata of StructuralCurveMembers that snapping depends
+on. The large dimension of the profile and the class of the assigned product are
+resolved once per member, on first use, and kept in numpy columns, so that the
+allowable snapping distances of pairs of members are array operations. The table
+can be shared by the snap stages of a run. Endpoints are cached per snap stage
+by EndpointCache, which tracks the StructuralPointConnections that snapping
+moves."""
+
+import ifcopenshell
+import ifcopenshell.util.element
+import inlbim.util.profile
+import inlbim.util.structural
+import numpy as np
+
+
+class SnappingMetadataTable:
+    def __init__(self):
+        # Id of StructuralCurveMember -> row
+        self.rows_of_members = {}
+        self.large_dimensions = np.zeros(0)
+        self.classes_of_assigned_products = []
+        self.are_assigned_to_ifc_members = np.zeros(0, dtype=bool)
+
+    def get_rows(
+        self,
+        structural_curve_members: list[ifcopenshell.entity_instance],
+    ) -> np.ndarray:
+        """Get rows of the members, adding the members not yet in the table"""
+
+        large_dimensions = []
+        are_assigned_to_ifc_members = []
+        for structural_curve_member in structural_curve_members:
+            if structural_curve_member.id() in self.rows_of_members:
+                continue
+            self.rows_of_members[structural_curve_member.id()] = len(
+                self.classes_of_assigned_products
+            )
+
+            # Get ProfileDef
+            material_profile_set = ifcopenshell.util.element.get_material(
+                element=structural_curve_member,
+                should_skip_usage=True,
+            )
+            assert isinstance(material_profile_set, ifcopenshell.entity_instance)
+            profile_def = material_profile_set.MaterialProfiles[0].Profile
+
+            large_dimensions.append(
+                float(
+                    inlbim.util.profile.get_large_dimension_of_parameterized_profile_def(
+                        parameterized_profile_def=profile_def
+                    )
+                )
+            )
+
+            # Get assigned product
+            assigned_product = (
+                inlbim.util.structural.get_assigned_product_of_structural_item(
+                    structural_item=structural_curve_member
+                )
+            )
+            if isinstance(assigned_product, ifcopenshell.entity_instance):
+                self.classes_of_assigned_products.append(assigned_product.is_a())
+                are_assigned_to_ifc_members.append(assigned_product.is_a("IfcMember"))
+            else:
+                self.classes_of_assigned_products.append(None)
+                are_assigned_to_ifc_members.append(False)
+
+        if len(large_dimensions) > 0:
+            self.large_dimensions = np.concatenate(
+                [self.large_dimensions, large_dimensions]
+            )
+            self.are_assigned_to_ifc_members = np.concatenate(
+                [self.are_assigned_to_ifc_members, are_assigned_to_ifc_members]
+            )
+
+        return np.array(
+            [
+                self.rows_of_members[structural_curve_member.id()]
+                for structural_curve_member in structural_curve_members
+            ],
+            dtype=np.int64,
+        )
+
+    def get_large_dimensions(
+        self,
+        structural_curve_members: list[ifcopenshell.entity_instance],
+    ) -> np.ndarray:
+
+        rows = self.get_rows(structural_curve_members=structural_curve_members)
+
+        return self.large_dimensions[rows]
+
+    def get_allowable_snapping_distances(
+        self,
+        structural_curve_members_1: list[ifcopenshell.entity_instance],
+        structural_curve_members_2: list[ifcopenshell.entity_instance],
+    ) -> np.ndarray:
+        """Vectorized get_allowable_snapping_distance_between_structural_curve_members()
+        for corresponding members of the two lists"""
+
+        rows_1 = self.get_rows(structural_curve_members=structural_curve_members_1)
+        rows_2 = self.get_rows(structural_curve_members=structural_curve_members_2)
+
+        return self.get_allowable_snapping_distances_of_rows(
+            rows_1=rows_1,
+            rows_2=rows_2,
+        )
+
+    def get_allowable_snapping_distances_of_rows(
+        self,
+        rows_1: np.ndarray | int,
+        rows_2: np.ndarray | int,
+    ) -> np.ndarray:
+        """Same as get_allowable_snapping_distances() for rows (broadcast against
+        each other) returned by get_rows()"""
+
+        return calculate_allowable_snapping_distances(
+            large_dimensions_1=self.large_dimensions[rows_1],
+            large_dimensions_2=self.large_dimensions[rows_2],
+            are_assigned_to_ifc_members_1=self.are_assigned_to_ifc_members[rows_1],
+            are_assigned_to_ifc_members_2=self.are_assigned_to_ifc_members[rows_2],
+        )
+
+    def get_reaches(
+        self,
+        structural_curve_members: list[ifcopenshell.entity_instance],
+    ) -> np.ndarray:
+        """Allowable snapping distances of the members with themselves. The
+        allowable snapping distance of a pair never exceeds the larger reach of
+        the two members"""
+
+        return self.get_allowable_snapping_distances(
+            structural_curve_members_1=structural_curve_members,
+            structural_curve_members_2=structural_curve_members,
+        )
+
+
+class EndpointCache:
+    """Endpoints of StructuralCurveMembers during a snap stage. The ordered
+    StructuralPointConnections of a member are resolved once, and the coordinates
+    of a StructuralPointConnection are read again only after it is translated.
+    StructuralPointConnections must not be merged while the cache is in use"""
+
+    def __init__(self):
+        # Id of StructuralCurveMember -> ordered StructuralPointConnections
+        self.structural_point_connections_of_members = {}
+        # Id of StructuralPointConnection -> coordinates
+        self.coordinates_of_structural_point_connections = {}
+        # Ids of StructuralPointConnections translated since the last reset
+        self.ids_of_translated_structural_point_connections = set()
+
+    def get_structural_point_connections(
+        self,
+        linear_structural_curve_member: ifcopenshell.entity_instance,
+    ) -> list[ifcopenshell.entity_instance]:
+
+        structural_point_connections = self.structural_point_connections_of_members.get(
+            linear_structural_curve_member.id()
+        )
+        if structural_point_connections is None:
+            structural_point_connections = inlbim.util.structural.get_ordered_structural_point_connections_of_linear_structural_curve_member(
+                linear_structural_curve_member=linear_structural_curve_member
+            )
+            self.structural_point_connections_of_members[
+                linear_structural_curve_member.id()
+            ] = structural_point_connections
+
+        return structural_point_connections
+
+    def get_coordinates(
+        self,
+        structural_point_connection: ifcopenshell.entity_instance,
+    ) -> tuple[float, float, float]:
+
+        coordinates = self.coordinates_of_structural_point_connections.get(
+            structural_point_connection.id()
+        )
+        if coordinates is None:
+            coordinates = (
+                inlbim.util.structural.get_coordinates_of_structural_point_connection(
+                    structural_point_connection=structural_point_connection
+                )
+            )
+            self.coordinates_of_structural_point_connections[
+                structural_point_connection.id()
+            ] = coordinates
+
+        return coordinates
+
+    def get_segments(
+        self,
+        linear_structural_curve_members: list[ifcopenshell.entity_instance],
+    ) -> np.ndarray:
+        """Get (N, 2, 3) array of the start and end points of the members"""
+
+        segments = np.zeros((len(linear_structural_curve_members), 2, 3))
+        for index, linear_structural_curve_member in enumerate(
+            linear_structural_curve_members
+        ):
+            segments[index] = [
+                self.get_coordinates(
+                    structural_point_connection=structural_point_connection
+                )
+                for structural_point_connection in self.get_structural_point_connections(
+                    linear_structural_curve_member=linear_structural_curve_member
+                )
+            ]
+
+        return segments
+
+    def mark_as_translated(
+        self,
+        structural_point_connection: ifcopenshell.entity_instance,
+    ):
+
+        self.coordinates_of_structural_point_connections.pop(
+            structural_point_connection.id(), None
+        )
+        self.ids_of_translated_structural_point_connections.add(
+            structural_point_connection.id()
+        )
+
+
+def calculate_allowable_snapping_distances(
+    large_dimensions_1: np.ndarray,
+    large_dimensions_2: np.ndarray,
+    are_assigned_to_ifc_members_1: np.ndarray,
+    are_assigned_to_ifc_members_2: np.ndarray,
+) -> np.ndarray:
+    """1.1 times the mean of the large dimensions of the profiles, and at least 0.5
+    if one of the members is assigned to an IfcMember. Rounds like the scalar
+    function"""
+
+    # Calculate allowable snapping distances
+    allowable_snapping_distances = 1.1 * (
+        (np.asarray(large_dimensions_1) + np.asarray(large_dimensions_2)) / 2
+    )
+
+    # Give some more allowable snapping distance for IfcMembers
+    one_of_the_members_is_assigned_to_an_ifc_member = np.logical_or(
+        are_assigned_to_ifc_members_1, are_assigned_to_ifc_members_2
+    )
+    allowable_snapping_distances = np.where(
+        one_of_the_members_is_assigned_to_an_ifc_member
+        & ~(allowable_snapping_distances > 0.5),
+        0.5,
+        allowable_snapping_distances,
+    )
+
+    return allowable_snapping_distances
@@ -0,0 +1,113 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+import os
+import sys
+
+
+# Insert parent directory of package to path
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")),
+)
+
+
+from bim2fem import current_time
+import time
+import chime
+import bim2fem.convert_ifc_to_fem
+import inlbim.util.instrumentation
+import inlbim.util.structural
+import ifcopenshell
+import ifcopenshell.api.root
+
+
+def main() -> int:
+
+    start_time = time.time()  # Record the start time
+
+    print(f"{current_time()}: Running {os.path.basename(__file__)} ...")
+
+    # Get IFC input filename
+    ifc_input_filename = os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__),
+            "..",
+            "files",
+            "SteelConstruction_DTV.ifc",
+        )
+    )
+
+    # Convert previous IFC4 Source File
+    previous_ifc4_source_file = ifcopenshell.open(path=ifc_input_filename)
+    assert isinstance(previous_ifc4_source_file, ifcopenshell.file)
+    previous_ifc4_sav_file = bim2fem.convert_ifc_to_fem.convert_ifc_to_fem(
+        ifc4_source_file=previous_ifc4_source_file,
+        region="Europe",
+    )
+
+    # Move one beam up by 500 mm and delete another one
+    ifc4_source_file = ifcopenshell.open(path=ifc_input_filename)
+    assert isinstance(ifc4_source_file, ifcopenshell.file)
+    beams = ifc4_source_file.by_type(type="IfcBeam", include_subtypes=False)
+    moved_beam, deleted_beam = beams[1], beams[2]
+    location = moved_beam.ObjectPlacement.RelativePlacement.Location
+    moved_beam.ObjectPlacement.RelativePlacement.Location = (
+        ifc4_source_file.createIfcCartesianPoint(
+            (
+                location.Coordinates[0],
+                location.Coordinates[1],
+                location.Coordinates[2] + 500.0,
+            )
+        )
+    )
+    print(f"Moved {moved_beam.GlobalId}, deleted {deleted_beam.GlobalId}")
+    ifcopenshell.api.root.remove_product(file=ifc4_source_file, product=deleted_beam)
+
+    # Convert from scratch
+    ifc4_sav_file = bim2fem.convert_ifc_to_fem.convert_ifc_to_fem(
+        ifc4_source_file=ifc4_source_file,
+        region="Europe",
+    )
+
+    # Convert incrementally, updating the previous conversion in place
+    instrumentation = inlbim.util.instrumentation.Instrumentation()
+    incrementally_converted_ifc4_sav_file = (
+        bim2fem.convert_ifc_to_fem.convert_ifc_to_fem(
+            ifc4_source_file=ifc4_source_file,
+            region="Europe",
+            previous_ifc4_source_file=previous_ifc4_source_file,
+            previous_ifc4_destination_file=previous_ifc4_sav_file,
+            instrumentation=instrumentation,
+        )
+    )
+    print(
+        ", ".join(
+            f"{instrumentation.counters.get(f'elements_{key}', 0)} {key}"
+            for key in ["added", "changed", "deleted", "unchanged"]
+        )
+    )
+    assert instrumentation.counters["elements_changed"] == 1
+    assert instrumentation.counters["elements_deleted"] == 1
+
+    # The incremental conversion matches the conversion from scratch
+    summary = inlbim.util.structural.get_summary_of_structural_items(
+        ifc4_sav_file=ifc4_sav_file
+    )
+    assert summary == inlbim.util.structural.get_summary_of_structural_items(
+        ifc4_sav_file=incrementally_converted_ifc4_sav_file
+    )
+    print(
+        "Same structural items as from scratch: "
+        + ", ".join(f"{len(value)} {key}" for key, value in summary.items())
+    )
+
+    print(f"{current_time()}: Total elapsed was {time.time() - start_time:.4f} s\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    main()
+
+    chime.success(sync=True)
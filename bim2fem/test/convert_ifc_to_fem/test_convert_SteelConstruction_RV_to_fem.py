@@ -16,6 +16,7 @@ import time
 import chime
 import bim2fem.convert_ifc_to_fem
 import inlbim.api.file
+import inlbim.util.instrumentation
 import ifcopenshell
 
 
@@ -55,6 +56,10 @@ def main() -> int:
         # element_selection_query="1v96O$YqXCRB7ePWhgPf95",  # top slab
         element_deselection_query='type = "M_Footing-Rectangular:1800 x 1200 x 450mm"',
         region="Europe",
+        instrumentation=inlbim.util.instrumentation.Instrumentation(
+            sink=inlbim.util.instrumentation.PrintSink(),
+            verbose=True,
+        ),
     )
 
     # Write IFC file
@@ -0,0 +1,104 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+import os
+import sys
+
+
+# Insert parent directory of package to path
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")),
+)
+
+
+from bim2fem import current_time
+import tempfile
+import time
+import chime
+import bim2fem.convert_ifc_to_fem
+import inlbim.util.instrumentation
+import inlbim.util.structural
+import ifcopenshell
+
+
+def main() -> int:
+
+    start_time = time.time()  # Record the start time
+
+    print(f"{current_time()}: Running {os.path.basename(__file__)} ...")
+
+    # Get IFC input filename
+    ifc_input_filename = os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__),
+            "..",
+            "files",
+            "SteelConstruction_RV.ifc",
+        )
+    )
+
+    # Open IFC4 Source File
+    ifc4_source_file = ifcopenshell.open(path=ifc_input_filename)
+    assert isinstance(ifc4_source_file, ifcopenshell.file)
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        # First run tessellates, classifies and persists the results
+        cold_instrumentation = inlbim.util.instrumentation.Instrumentation()
+        ifc4_sav_file = bim2fem.convert_ifc_to_fem.convert_ifc_to_fem(
+            ifc4_source_file=ifc4_source_file,
+            region="Europe",
+            tessellation_cache_directory=os.path.join(directory, "tessellation"),
+            shape_classification_cache_directory=os.path.join(
+                directory, "shape_classification"
+            ),
+            instrumentation=cold_instrumentation,
+        )
+        cold_counters = cold_instrumentation.counters
+        print(f"First run: {cold_counters}")
+        assert cold_counters["tessellation_cache_hits"] == 0
+        assert cold_counters["shape_classification_cache_misses"] > 0
+
+        # Second run, with workers, reuses every persisted entry
+        warm_instrumentation = inlbim.util.instrumentation.Instrumentation()
+        warm_ifc4_sav_file = bim2fem.convert_ifc_to_fem.convert_ifc_to_fem(
+            ifc4_source_file=ifc4_source_file,
+            region="Europe",
+            workers=2,
+            tessellation_cache_directory=os.path.join(directory, "tessellation"),
+            shape_classification_cache_directory=os.path.join(
+                directory, "shape_classification"
+            ),
+            instrumentation=warm_instrumentation,
+        )
+        warm_counters = warm_instrumentation.counters
+        print(f"Second run: {warm_counters}")
+        for name in ["tessellation_cache", "shape_classification_cache"]:
+            assert warm_counters[f"{name}_misses"] == 0
+            assert (
+                warm_counters[f"{name}_hits"]
+                == cold_counters[f"{name}_hits"] + cold_counters[f"{name}_misses"]
+            )
+
+    # Both runs give the same structural items
+    summary = inlbim.util.structural.get_summary_of_structural_items(
+        ifc4_sav_file=ifc4_sav_file
+    )
+    assert summary == inlbim.util.structural.get_summary_of_structural_items(
+        ifc4_sav_file=warm_ifc4_sav_file
+    )
+    print(
+        "Same structural items as the first run: "
+        + ", ".join(f"{len(value)} {key}" for key, value in summary.items())
+    )
+
+    print(f"{current_time()}: Total elapsed was {time.time() - start_time:.4f} s\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    main()
+
+    chime.success(sync=True)
@@ -0,0 +1,72 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+import os
+import sys
+
+
+# Insert parent directory of package to path
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")),
+)
+
+
+from bim2fem import current_time
+import time
+import chime
+import bim2fem.convert_ifc_to_fem
+import inlbim.util.structural
+import ifcopenshell
+
+
+def main() -> int:
+
+    start_time = time.time()  # Record the start time
+
+    print(f"{current_time()}: Running {os.path.basename(__file__)} ...")
+
+    # Get IFC input filename
+    ifc_input_filename = os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__),
+            "..",
+            "files",
+            "SteelConstruction_RV.ifc",
+        )
+    )
+
+    # Convert serially and with a pool of worker processes
+    summaries = {}
+    for workers in [1, 2]:
+        ifc4_source_file = ifcopenshell.open(path=ifc_input_filename)
+        assert isinstance(ifc4_source_file, ifcopenshell.file)
+        ifc4_sav_file = bim2fem.convert_ifc_to_fem.convert_ifc_to_fem(
+            ifc4_source_file=ifc4_source_file,
+            element_deselection_query='type = "M_Footing-Rectangular:1800 x 1200 x 450mm"',
+            region="Europe",
+            workers=workers,
+        )
+        summaries[workers] = inlbim.util.structural.get_summary_of_structural_items(
+            ifc4_sav_file=ifc4_sav_file
+        )
+        print(
+            f"workers={workers}: "
+            + ", ".join(
+                f"{len(value)} {key}" for key, value in summaries[workers].items()
+            )
+        )
+
+    # The result does not depend on the number of workers
+    assert summaries[1] == summaries[2]
+    print("Same structural items with workers=2 as with workers=1")
+
+    print(f"{current_time()}: Total elapsed was {time.time() - start_time:.4f} s\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    main()
+
+    chime.success(sync=True)
@@ -16,6 +16,7 @@ import time
 import chime
 import bim2fem.convert_ifc_to_fem
 import inlbim.api.file
+import inlbim.util.instrumentation
 import ifcopenshell
 
 
@@ -54,6 +55,10 @@ def main() -> int:
         # element_selection_query="3h046TEsH3MPbHZPeW4rJK",  # T-beam issue
         element_deselection_query=None,
         region="Europe",
+        instrumentation=inlbim.util.instrumentation.Instrumentation(
+            sink=inlbim.util.instrumentation.PrintSink(),
+            verbose=True,
+        ),
     )
 
     # Write IFC file
@@ -0,0 +1,133 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+import os
+import sys
+
+
+# Insert parent directory of package to path
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")),
+)
+
+
+from bim2fem import current_time
+import io
+import json
+import time
+import chime
+import bim2fem.convert_ifc_to_fem
+import bim2fem.helpers.analyze_geometry_of_elements
+import inlbim.util.instrumentation
+import inlbim.util.structural
+import ifcopenshell
+
+
+def main() -> int:
+
+    start_time = time.time()  # Record the start time
+
+    print(f"{current_time()}: Running {os.path.basename(__file__)} ...")
+
+    # Get IFC input filename
+    ifc_input_filename = os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__),
+            "..",
+            "files",
+            "beams.ifc",
+        )
+    )
+
+    # Open IFC4 Source File
+    ifc4_source_file = ifcopenshell.open(path=ifc_input_filename)
+    assert isinstance(ifc4_source_file, ifcopenshell.file)
+
+    # Convert without failures
+    ifc4_sav_file = bim2fem.convert_ifc_to_fem.convert_ifc_to_fem(
+        ifc4_source_file=ifc4_source_file,
+        region="Europe",
+    )
+    expected_summary = inlbim.util.structural.get_summary_of_structural_items(
+        ifc4_sav_file=ifc4_sav_file
+    )
+
+    # The analysis of one beam hangs, and the worker analyzing another one dies.
+    # Forked workers inherit the patched function
+    beams = ifc4_source_file.by_type(type="IfcBeam", include_subtypes=False)
+    global_id_of_hanging_beam = beams[0].GlobalId
+    global_id_of_dying_beam = beams[1].GlobalId
+    analyze_geometry_of_element = (
+        bim2fem.helpers.analyze_geometry_of_elements.analyze_geometry_of_element
+    )
+
+    def analyze_geometry_of_element_with_failures(element, **kwargs):
+        if element.GlobalId == global_id_of_hanging_beam:
+            time.sleep(60.0)
+        if element.GlobalId == global_id_of_dying_beam:
+            os._exit(1)
+        return analyze_geometry_of_element(element=element, **kwargs)
+
+    bim2fem.helpers.analyze_geometry_of_elements.analyze_geometry_of_element = (
+        analyze_geometry_of_element_with_failures
+    )
+
+    # Convert with isolated failures
+    stream = io.StringIO()
+    conversion_report = {}
+    try:
+        ifc4_sav_file = bim2fem.convert_ifc_to_fem.convert_ifc_to_fem(
+            ifc4_source_file=ifc4_source_file,
+            region="Europe",
+            workers=2,
+            instrumentation=inlbim.util.instrumentation.Instrumentation(
+                sink=inlbim.util.instrumentation.JsonLinesSink(stream=stream)
+            ),
+            time_budget_per_element=5.0,
+            conversion_report=conversion_report,
+        )
+    finally:
+        bim2fem.helpers.analyze_geometry_of_elements.analyze_geometry_of_element = (
+            analyze_geometry_of_element
+        )
+
+    # Both failures are reported as warnings and in the conversion report
+    warnings = {
+        event["global_id"]: event["reason"]
+        for event in map(json.loads, stream.getvalue().splitlines())
+        if event["event"] == "warning"
+    }
+    assert warnings.keys() == {global_id_of_hanging_beam, global_id_of_dying_beam}
+    assert warnings[global_id_of_hanging_beam].startswith("TimeoutError")
+    assert warnings[global_id_of_dying_beam].startswith("RuntimeError")
+    for global_id, reason in warnings.items():
+        print(f"{global_id}: NG ({reason})")
+        assert conversion_report[global_id]["converted"] is False
+        assert conversion_report[global_id]["reason"] == reason
+
+    # The other beams are converted as without failures
+    assert all(
+        conversion_report[beam.GlobalId]["converted"]
+        for beam in beams
+        if beam.GlobalId not in warnings
+    )
+    summary = inlbim.util.structural.get_summary_of_structural_items(
+        ifc4_sav_file=ifc4_sav_file
+    )
+    assert summary["structural_curve_members"] == [
+        structural_curve_member
+        for structural_curve_member in expected_summary["structural_curve_members"]
+        if structural_curve_member[-1] not in warnings
+    ]
+    print(f"Other {len(beams) - len(warnings)} beams converted as without failures")
+
+    print(f"{current_time()}: Total elapsed was {time.time() - start_time:.4f} s\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    main()
+
+    chime.success(sync=True)
@@ -16,6 +16,7 @@ import time
 import chime
 import bim2fem.convert_ifc_to_fem
 import inlbim.api.file
+import inlbim.util.instrumentation
 import ifcopenshell
 
 
@@ -53,6 +54,10 @@ def main() -> int:
         element_selection_query="IfcColumn, IfcSlab, IfcWall, IfcBeam, IfcMember",
         element_deselection_query=None,
         region="Europe",
+        instrumentation=inlbim.util.instrumentation.Instrumentation(
+            sink=inlbim.util.instrumentation.PrintSink(),
+            verbose=True,
+        ),
     )
 
     # Write IFC file
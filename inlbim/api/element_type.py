@@ -5,6 +5,7 @@ import ifcopenshell.api.material
 import ifcopenshell.api.root
 import ifcopenshell.util.element
 import inlbim.api.material
+import inlbim.util.resource
 from typing import Literal
 
 
@@ -34,7 +35,13 @@ def add_beam_or_column_or_member_type(
     ifc4_file = material.file
 
     if check_for_duplicate:
-        for old_type in ifc4_file.by_type(type=ifc_class, include_subtypes=False):
+        for old_type in inlbim.util.resource.get_resource_registry(
+            ifc4_file=ifc4_file
+        ).get_entities(
+            ifc_class=ifc_class,
+            calculate_key=inlbim.util.resource.get_key_of_element_type_with_material_profile_set,
+            key=(material.id(), profile.id()),
+        ):
             old_material_profile_set = ifcopenshell.util.element.get_material(
                 element=old_type, should_skip_usage=True
             )
@@ -83,7 +90,16 @@ def add_slab_or_wall_or_plate_element_type(
     ifc4_file = materials[0].file
 
     if check_for_duplicate:
-        for old_type in ifc4_file.by_type(type=ifc_class, include_subtypes=False):
+        for old_type in inlbim.util.resource.get_resource_registry(
+            ifc4_file=ifc4_file
+        ).get_entities(
+            ifc_class=ifc_class,
+            calculate_key=inlbim.util.resource.get_key_of_element_type_with_material_layer_set,
+            key=(
+                tuple(material.id() for material in materials),
+                tuple(thicknesses),
+            ),
+        ):
             old_material_layer_set = ifcopenshell.util.element.get_material(
                 element=old_type, should_skip_usage=True
             )
@@ -93,17 +109,10 @@ def add_slab_or_wall_or_plate_element_type(
             for old_material_layer in old_material_layer_set.MaterialLayers:
                 old_materials.append(old_material_layer.Material)
                 old_thicknesses.append(old_material_layer.LayerThickness)
-            if len(old_materials) != len(materials):
-                break
-            if len(old_thicknesses) != len(thicknesses):
-                break
-            for old_material, material in zip(old_materials, materials):
-                if old_material != material:
-                    break
-            for old_thickness, thickness in zip(old_thicknesses, thicknesses):
-                if old_thickness != thickness:
-                    break
-            return old_type
+            if old_materials == list(materials) and old_thicknesses == list(
+                thicknesses
+            ):
+                return old_type
 
     wall_or_slab_type = ifcopenshell.api.root.create_entity(
         file=ifc4_file,
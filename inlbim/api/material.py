@@ -2,9 +2,9 @@
 
 import ifcopenshell.api.pset
 import ifcopenshell.api.material
-import pickle
-import os
 import inlbim.api.style
+import inlbim.util.library
+import inlbim.util.resource
 from inlbim import REGION, RGB_STEEL, RGB_CONCRETE
 
 
@@ -21,7 +21,13 @@ def add_material_with_structural_properties(
     """Create a IfcMaterial with common and mechanical property sets"""
 
     if check_for_duplicate and name and category:
-        old_materials = ifc4_file.by_type(type="IfcMaterial", include_subtypes=False)
+        old_materials = inlbim.util.resource.get_resource_registry(
+            ifc4_file=ifc4_file
+        ).get_entities(
+            ifc_class="IfcMaterial",
+            calculate_key=inlbim.util.resource.get_upper_case_name_of_material,
+            key=name.upper(),
+        )
         for old_material in old_materials:
             names_match = str(old_material.Name).upper() == name.upper()
             categories_match = str(old_material.Category).upper() == category.upper()
@@ -72,40 +78,24 @@ def add_material_from_standard_library(
     """Load IfcMaterial from library"""
 
     if check_for_duplicate:
-        old_materials = ifc4_file.by_type(type="IfcMaterial", include_subtypes=False)
+        old_materials = inlbim.util.resource.get_resource_registry(
+            ifc4_file=ifc4_file
+        ).get_entities(
+            ifc_class="IfcMaterial",
+            calculate_key=inlbim.util.resource.get_upper_case_name_of_material,
+            key=material_name.upper(),
+        )
         for old_material in old_materials:
             names_match = str(old_material.Name).upper() == material_name.upper()
             if names_match:
                 return old_material
 
-    if region == "Europe":
-        material_library = "Europe"
-    elif region == "UnitedStates":
-        material_library = "UnitedStates"
-    else:
-        return None
-
-    material_library_file_path = os.path.join(
-        os.path.dirname(__file__),
-        "..",
-        "property_libraries",
-        "materials",
-        f"MaterialLibrary{material_library}.pkl",
+    index_of_standard_materials = inlbim.util.library.get_index_of_standard_materials(
+        region=region
+    )
+    matching_material_category, matching_material_data_dictionary = (
+        index_of_standard_materials.get(material_name, (None, None))
     )
-
-    with open(material_library_file_path, "rb") as file:
-        material_library_data = pickle.load(file)
-
-    matching_material_data_dictionary = None
-    matching_material_category = None
-    for standard_key, standard_data in material_library_data.items():
-        for mat_type_key, mat_type_data in standard_data.items():
-            matching_material_data_dictionary = mat_type_data.get(material_name)
-            if matching_material_data_dictionary:
-                matching_material_category = mat_type_key
-                break
-        if matching_material_data_dictionary:
-            break
     if not isinstance(matching_material_data_dictionary, dict):
         return None
 
@@ -180,8 +170,12 @@ def add_material_profile_set_with_single_material_profile(
     ifc4_file = material.file
 
     if check_for_duplicate:
-        for old_material_profile_set in ifc4_file.by_type(
-            type="IfcMaterialProfileSet", include_subtypes=False
+        for old_material_profile_set in inlbim.util.resource.get_resource_registry(
+            ifc4_file=ifc4_file
+        ).get_entities(
+            ifc_class="IfcMaterialProfileSet",
+            calculate_key=inlbim.util.resource.get_key_of_material_profile_set,
+            key=(material.id(), profile.id()),
         ):
             old_profile = old_material_profile_set.MaterialProfiles[0].Profile
             old_material = old_material_profile_set.MaterialProfiles[0].Material
@@ -216,8 +210,15 @@ def add_material_layer_set(
     ifc4_file = materials[0].file
 
     if check_for_duplicate:
-        for old_material_layer_set in ifc4_file.by_type(
-            type="IfcMaterialLayerSet", include_subtypes=False
+        for old_material_layer_set in inlbim.util.resource.get_resource_registry(
+            ifc4_file=ifc4_file
+        ).get_entities(
+            ifc_class="IfcMaterialLayerSet",
+            calculate_key=inlbim.util.resource.get_key_of_material_layer_set,
+            key=(
+                tuple(material.id() for material in materials),
+                tuple(thicknesses),
+            ),
         ):
             assert isinstance(old_material_layer_set, ifcopenshell.entity_instance)
             old_materials = []
@@ -225,17 +226,10 @@ def add_material_layer_set(
             for old_material_layer in old_material_layer_set.MaterialLayers:
                 old_materials.append(old_material_layer.Material)
                 old_thicknesses.append(old_material_layer.LayerThickness)
-            if len(old_materials) != len(materials):
-                break
-            if len(old_thicknesses) != len(thicknesses):
-                break
-            for old_material, material in zip(old_materials, materials):
-                if old_material != material:
-                    break
-            for old_thickness, thickness in zip(old_thicknesses, thicknesses):
-                if old_thickness != thickness:
-                    break
-            return old_material_layer_set
+            if old_materials == list(materials) and old_thicknesses == list(
+                thicknesses
+            ):
+                return old_material_layer_set
 
     material_layer_set = ifcopenshell.api.material.add_material_set(
         file=ifc4_file,
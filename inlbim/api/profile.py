@@ -6,10 +6,10 @@ import inlbim.util.file
 import ifcopenshell.api.attribute
 import ifcopenshell.api.profile
 import numpy as np
-import pickle
-import os
 import ifcopenshell.api.pset
 import inlbim.util.unit
+import inlbim.util.library
+import inlbim.util.resource
 from inlbim import REGION
 
 PARAMETERIZED_PROFILE_CLASSES = Literal[
@@ -58,7 +58,28 @@ def add_parameterized_profile(
 
     if check_for_duplicate:
         dimensions_array = np.array([dim if dim else 0 for dim in dimensions])
-        old_profiles = ifc4_file.by_type(type=profile_class, include_subtypes=False)
+        resource_registry = inlbim.util.resource.get_resource_registry(
+            ifc4_file=ifc4_file
+        )
+        cell_of_first_dimension = inlbim.util.resource.get_cell_of_dimension(
+            dimension=dimensions_array[0], precision=precision
+        )
+        old_profiles = sorted(
+            [
+                old_profile
+                for cell in [
+                    cell_of_first_dimension - 1,
+                    cell_of_first_dimension,
+                    cell_of_first_dimension + 1,
+                ]
+                for old_profile in resource_registry.get_entities(
+                    ifc_class=profile_class,
+                    calculate_key=inlbim.util.resource.get_key_of_parameterized_profile,
+                    key=cell,
+                )
+            ],
+            key=lambda old_profile: old_profile.id(),
+        )
         for old_profile in old_profiles:
             old_profile_class = old_profile.is_a()
             classes_match = old_profile_class == profile_class
@@ -280,48 +301,25 @@ def add_profile_from_standard_library(
     """Load IfcParameterizedProfileDef from library"""
 
     if check_for_duplicate:
-        old_profiles = ifc4_file.by_type(type="IfcProfileDef", include_subtypes=True)
+        old_profiles = inlbim.util.resource.get_resource_registry(
+            ifc4_file=ifc4_file
+        ).get_entities(
+            ifc_class="IfcProfileDef",
+            calculate_key=inlbim.util.resource.get_upper_case_name_of_profile,
+            key=profile_name.upper(),
+            include_subtypes=True,
+        )
         for old_profile in old_profiles:
             names_match = str(old_profile.ProfileName).upper() == profile_name.upper()
             if names_match:
                 return old_profile
 
-    if region == "Europe":
-        section_libraries = ["BSShapes2006", "Euro"]
-    elif region == "UnitedStates":
-        section_libraries = ["AISC14", "SJIJoists"]
-    else:
-        return None
-
-    # given_section_libraries_are_valid = all(
-    #     [sl in SECTION_LIBRARIES for sl in section_libraries]
-    # )
-    # if not given_section_libraries_are_valid:
-    #     return None
-
-    matching_section_category_label = None
-    matching_section_data_dictionary = None
-    for section_library in section_libraries:
-        section_library_file_path = os.path.join(
-            os.path.dirname(__file__),
-            "..",
-            "property_libraries",
-            "sections",
-            f"{section_library}.pkl",
-        )
-        with open(section_library_file_path, "rb") as file:
-            section_library_data = pickle.load(file)
-        for (
-            section_category_label,
-            section_category_dictionary,
-        ) in section_library_data.items():
-            section_data_dictionary = section_category_dictionary.get(profile_name)
-            if section_data_dictionary:
-                matching_section_data_dictionary = section_data_dictionary
-                matching_section_category_label = section_category_label
-                break
-        if matching_section_data_dictionary:
-            break
+    index_of_standard_profiles = inlbim.util.library.get_index_of_standard_profiles(
+        region=region
+    )
+    matching_section_category_label, matching_section_data_dictionary = (
+        index_of_standard_profiles.get(profile_name, (None, None))
+    )
     if not isinstance(matching_section_data_dictionary, dict):
         return None
 
@@ -12,7 +12,6 @@ import inlbim.util.file
 import ifcopenshell.api.project
 import inlbim.api.material
 import inlbim.api.product
-import math
 import numpy as np
 import inlbim.api.structural
 import ifcopenshell.util.element
@@ -61,8 +60,12 @@ def create_3pt_structural_curve_member(
     structural_curve_member: ifcopenshell.entity_instance | None = None,
     name: str | None = None,
     corresponding_product: ifcopenshell.entity_instance | None = None,
+    structural_point_connection_registry: (
+        inlbim.util.structural.StructuralPointConnectionRegistry | None
+    ) = None,
 ) -> ifcopenshell.entity_instance:
-    """Create 3pt IfcStructuralCurveMember"""
+    """Create 3pt IfcStructuralCurveMember. If a StructuralPointConnectionRegistry
+    is given, coincident StructuralPointConnections are reused."""
 
     # Get IFC4 File
     ifc4_file = profile_def.file
@@ -97,8 +100,10 @@ def create_3pt_structural_curve_member(
     vertex_points = []
     for point in [p1, p2]:
         vertex_points.append(
-            inlbim.api.representation.add_vertex_point(
-                ifc4_file=ifc4_file, point_coordinates=point
+            add_or_reuse_vertex_point(
+                ifc4_file=ifc4_file,
+                point_coordinates=point,
+                structural_point_connection_registry=structural_point_connection_registry,
             )
         )
 
@@ -142,10 +147,10 @@ def create_3pt_structural_curve_member(
 
     # Add and Assign StructuralPointConnections
     for vertex_point in vertex_points:
-        structural_point_connection = create_structural_point_connection(
+        structural_point_connection = add_or_reuse_structural_point_connection(
             vertex_point=vertex_point,
             structural_analysis_model=structural_analysis_model,
-            name=None,
+            structural_point_connection_registry=structural_point_connection_registry,
         )
         ifcopenshell.api.structural.add_structural_member_connection(
             file=ifc4_file,
@@ -173,8 +178,13 @@ def create_npt_structural_surface_member(
     structural_surface_member: ifcopenshell.entity_instance | None = None,
     name: str | None = None,
     corresponding_product: ifcopenshell.entity_instance | None = None,
+    structural_point_connection_registry: (
+        inlbim.util.structural.StructuralPointConnectionRegistry | None
+    ) = None,
 ) -> ifcopenshell.entity_instance:
-    """Create npt IfcStructuralSurfaceMember"""
+    """Create npt IfcStructuralSurfaceMember. If a
+    StructuralPointConnectionRegistry is given, coincident
+    StructuralPointConnections are reused."""
 
     # Get IFC4 File
     ifc4_file = material.file
@@ -208,9 +218,10 @@ def create_npt_structural_surface_member(
     vertex_points_of_outer_profile = []
     for point in outer_profile:
         vertex_points_of_outer_profile.append(
-            inlbim.api.representation.add_vertex_point(
+            add_or_reuse_vertex_point(
                 ifc4_file=ifc4_file,
                 point_coordinates=point,
+                structural_point_connection_registry=structural_point_connection_registry,
             )
         )
 
@@ -220,9 +231,10 @@ def create_npt_structural_surface_member(
         vertex_points_of_inner_profile = []
         for point in inner_profile:
             vertex_points_of_inner_profile.append(
-                inlbim.api.representation.add_vertex_point(
+                add_or_reuse_vertex_point(
                     ifc4_file=ifc4_file,
                     point_coordinates=point,
+                    structural_point_connection_registry=structural_point_connection_registry,
                 )
             )
         vertex_points_of_inner_profiles.append(vertex_points_of_inner_profile)
@@ -267,10 +279,10 @@ def create_npt_structural_surface_member(
 
     # Add and Assign StructuralPointConnections
     for vertex_point in vertex_points_of_outer_profile:
-        structural_point_connection = create_structural_point_connection(
+        structural_point_connection = add_or_reuse_structural_point_connection(
             vertex_point=vertex_point,
             structural_analysis_model=structural_analysis_model,
-            name=None,
+            structural_point_connection_registry=structural_point_connection_registry,
         )
         ifcopenshell.api.structural.add_structural_member_connection(
             file=ifc4_file,
@@ -279,10 +291,10 @@ def create_npt_structural_surface_member(
         )
     for vertex_points_of_inner_profile in vertex_points_of_inner_profiles:
         for vertex_point in vertex_points_of_inner_profile:
-            structural_point_connection = create_structural_point_connection(
+            structural_point_connection = add_or_reuse_structural_point_connection(
                 vertex_point=vertex_point,
                 structural_analysis_model=structural_analysis_model,
-                name=None,
+                structural_point_connection_registry=structural_point_connection_registry,
             )
             ifcopenshell.api.structural.add_structural_member_connection(
                 file=ifc4_file,
@@ -350,96 +362,111 @@ def create_structural_point_connection(
     return structural_point_connection
 
 
+def add_or_reuse_vertex_point(
+    ifc4_file: ifcopenshell.file,
+    point_coordinates: tuple[float, float, float],
+    structural_point_connection_registry: (
+        inlbim.util.structural.StructuralPointConnectionRegistry | None
+    ) = None,
+) -> ifcopenshell.entity_instance:
+    """Add VertexPoint, unless the registry has one within the precision"""
+
+    if structural_point_connection_registry is not None:
+        vertex_point = structural_point_connection_registry.find_vertex_point(
+            point=point_coordinates
+        )
+        if vertex_point is not None:
+            return vertex_point
+
+    vertex_point = inlbim.api.representation.add_vertex_point(
+        ifc4_file=ifc4_file,
+        point_coordinates=point_coordinates,
+    )
+    if structural_point_connection_registry is not None:
+        structural_point_connection_registry.add_vertex_point(vertex_point=vertex_point)
+
+    return vertex_point
+
+
+def add_or_reuse_structural_point_connection(
+    vertex_point: ifcopenshell.entity_instance,
+    structural_analysis_model: ifcopenshell.entity_instance,
+    structural_point_connection_registry: (
+        inlbim.util.structural.StructuralPointConnectionRegistry | None
+    ) = None,
+) -> ifcopenshell.entity_instance:
+    """Create StructuralPointConnection of VertexPoint, unless the registry has
+    one already"""
+
+    if structural_point_connection_registry is not None:
+        structural_point_connection = (
+            structural_point_connection_registry.get_structural_point_connection(
+                vertex_point=vertex_point
+            )
+        )
+        if structural_point_connection is not None:
+            return structural_point_connection
+
+    structural_point_connection = create_structural_point_connection(
+        vertex_point=vertex_point,
+        structural_analysis_model=structural_analysis_model,
+        name=None,
+    )
+    if structural_point_connection_registry is not None:
+        structural_point_connection_registry.add_structural_point_connection(
+            structural_point_connection=structural_point_connection
+        )
+
+    return structural_point_connection
+
+
 def merge_all_coincident_structural_point_connections(
     ifc4sav_file: ifcopenshell.file,
+    structural_point_connections: list[ifcopenshell.entity_instance] | None = None,
 ):
+    """Merge coincident StructuralPointConnections. If structural_point_connections
+    is given, only those are considered (e.g., the nodes in a region)"""
 
     # Get Model Precision
     model_precision = inlbim.util.file.get_precision_of_project(ifc4_file=ifc4sav_file)
 
-    # Set up node groups
-    node_groups = {}
-    num_x_divisions = 8
-    num_y_divisions = 8
-    num_z_divisions = 8
-    for x_group_num in range(num_x_divisions):
-        for y_group_num in range(num_y_divisions):
-            for z_group_num in range(num_z_divisions):
-                group_key = f"{x_group_num}{y_group_num}{z_group_num}"
-                node_groups[group_key] = []
-    all_nodes = ifc4sav_file.by_type(
-        type="IfcStructuralPointConnection", include_subtypes=False
-    )
-
-    # Get parameters for equations used to group nodes
-    x_vals = set()
-    y_vals = set()
-    z_vals = set()
-    for node in all_nodes:
-        coordinates_of_node = (
-            inlbim.util.structural.get_coordinates_of_structural_point_connection(
-                structural_point_connection=node,
-            )
+    # Get nodes
+    if structural_point_connections is None:
+        all_nodes = ifc4sav_file.by_type(
+            type="IfcStructuralPointConnection", include_subtypes=False
         )
-        x_vals.add(coordinates_of_node[0])
-        y_vals.add(coordinates_of_node[1])
-        z_vals.add(coordinates_of_node[2])
-    x_val_min = min(x_vals) - 1
-    x_val_max = max(x_vals) + 1
-    slope_for_x = num_x_divisions / (x_val_max - x_val_min)
-    y_val_min = min(y_vals) - 1
-    y_val_max = max(y_vals) + 1
-    slope_for_y = num_y_divisions / (y_val_max - y_val_min)
-    z_val_min = min(z_vals) - 1
-    z_val_max = max(z_vals) + 1
-    slope_for_z = num_z_divisions / (z_val_max - z_val_min)
-
-    # Sort the nodes into groups
-    for node in all_nodes:
-        coordinates_of_node = (
+    else:
+        all_nodes = structural_point_connections
+    if len(all_nodes) == 0:
+        return ifc4sav_file
+
+    # Find coincident nodes on a grid with the precision as spacing
+    coordinates_of_nodes = np.array(
+        [
             inlbim.util.structural.get_coordinates_of_structural_point_connection(
                 structural_point_connection=node,
             )
+            for node in all_nodes
+        ]
+    )
+    indices_of_coincident_nodes = (
+        inlbim.util.structural.get_indices_of_coincident_points(
+            coordinates=coordinates_of_nodes,
+            tolerance=model_precision,
         )
-        x_val = coordinates_of_node[0]
-        x_group_num = math.floor(slope_for_x * x_val + -slope_for_x * x_val_min)
-        y_val = coordinates_of_node[1]
-        y_group_num = math.floor(slope_for_y * y_val + -slope_for_y * y_val_min)
-        z_val = coordinates_of_node[2]
-        z_group_num = math.floor(slope_for_z * z_val + -slope_for_z * z_val_min)
-        group_key = f"{x_group_num}{y_group_num}{z_group_num}"
-        node_groups[group_key].append(node)
-
-    # Sanity Check
-    count_of_nodes_in_groups = 0
-    for node_group in node_groups.values():
-        count_of_nodes_in_groups += len(node_group)
-    if count_of_nodes_in_groups != len(all_nodes):
-        exit("Not all nodes accounted for. Aborting.")
+    )
 
     # Merge Nodes
-    all_merged_nodes = []
-    for node_group in node_groups.values():
-        trial_nodes = node_group
-        merged_nodes = []
-        for trial_node in trial_nodes:
-            trial_node_is_unique = True
-            for merged_node in merged_nodes:
-                nodes_are_coincident = inlbim.util.structural.two_structural_point_connections_are_coincident(
-                    structural_point_connection_1=merged_node,
-                    structural_point_connection_2=trial_node,
-                    tolerance=model_precision,
-                )
-                if nodes_are_coincident:
-                    trial_node_is_unique = False
-                    merge_two_structural_point_connections_together(
-                        replacing_structural_point_connection=merged_node,
-                        replaced_structural_point_connection=trial_node,
-                    )
-                    break
-            if trial_node_is_unique:
-                merged_nodes.append(trial_node)
-                all_merged_nodes.append(trial_node)
+    merge_structural_point_connections_together(
+        ifc4sav_file=ifc4sav_file,
+        pairs_of_structural_point_connections=[
+            (all_nodes[index_of_coincident_node], all_nodes[index_of_node])
+            for index_of_node, index_of_coincident_node in enumerate(
+                indices_of_coincident_nodes.tolist()
+            )
+            if index_of_node != index_of_coincident_node
+        ],
+    )
 
     return ifc4sav_file
 
@@ -449,89 +476,202 @@ def merge_two_structural_point_connections_together(
     replaced_structural_point_connection: ifcopenshell.entity_instance,
 ) -> ifcopenshell.entity_instance:
 
-    # Get IFC File
-    ifc4sav_file = replacing_structural_point_connection.file
+    merge_structural_point_connections_together(
+        ifc4sav_file=replacing_structural_point_connection.file,
+        pairs_of_structural_point_connections=[
+            (
+                replacing_structural_point_connection,
+                replaced_structural_point_connection,
+            )
+        ],
+    )
+
+    return replacing_structural_point_connection
+
+
+def merge_structural_point_connections_together(
+    ifc4sav_file: ifcopenshell.file,
+    pairs_of_structural_point_connections: list[
+        tuple[ifcopenshell.entity_instance, ifcopenshell.entity_instance]
+    ],
+) -> dict[int, ifcopenshell.entity_instance]:
+    """Merge pairs of (replacing, replaced) StructuralPointConnections in bulk.
+    Equivalence classes are computed with union-find, so chains of pairs collapse
+    onto one node. Connections and Edges are rewired to the root of their class,
+    then the replaced nodes and their orphaned entities are removed in a single
+    batch. Returns the replacing node of each replaced node's id"""
+
+    # Get equivalence classes
+    structural_point_connections = {}
+    for pair_of_structural_point_connections in pairs_of_structural_point_connections:
+        for structural_point_connection in pair_of_structural_point_connections:
+            structural_point_connections[structural_point_connection.id()] = (
+                structural_point_connection
+            )
+    roots = inlbim.util.structural.get_roots_of_pairs(
+        pairs=[
+            (replacing.id(), replaced.id())
+            for replacing, replaced in pairs_of_structural_point_connections
+        ]
+    )
+    replacing_structural_point_connections = {
+        id_of_node: structural_point_connections[id_of_root]
+        for id_of_node, id_of_root in roots.items()
+        if id_of_node != id_of_root
+    }
 
     # Replace structural connections
-    assert isinstance(
-        replaced_structural_point_connection.ConnectsStructuralMembers, tuple
-    )
+    replacing_vertex_points = {}
     for (
-        rel_connects_structural_member
-    ) in replaced_structural_point_connection.ConnectsStructuralMembers:
-        rel_connects_structural_member.RelatedStructuralConnection = (
-            replacing_structural_point_connection
+        id_of_replaced_structural_point_connection,
+        replacing_structural_point_connection,
+    ) in replacing_structural_point_connections.items():
+        replaced_structural_point_connection = structural_point_connections[
+            id_of_replaced_structural_point_connection
+        ]
+        assert isinstance(
+            replaced_structural_point_connection.ConnectsStructuralMembers, tuple
         )
-
-    # Replace VertexPoint
-    replacing_vertex_point = (
-        inlbim.util.structural.get_vertex_point_of_structural_point_connection(
-            structural_point_connection=replacing_structural_point_connection,
+        for (
+            rel_connects_structural_member
+        ) in replaced_structural_point_connection.ConnectsStructuralMembers:
+            rel_connects_structural_member.RelatedStructuralConnection = (
+                replacing_structural_point_connection
+            )
+        replaced_vertex_point = (
+            inlbim.util.structural.get_vertex_point_of_structural_point_connection(
+                structural_point_connection=replaced_structural_point_connection,
+            )
         )
-    )
-    replaced_vertex_point = (
-        inlbim.util.structural.get_vertex_point_of_structural_point_connection(
-            structural_point_connection=replaced_structural_point_connection,
+        assert isinstance(replaced_vertex_point, ifcopenshell.entity_instance)
+        replacing_vertex_points[replaced_vertex_point.id()] = (
+            inlbim.util.structural.get_vertex_point_of_structural_point_connection(
+                structural_point_connection=replacing_structural_point_connection,
+            )
         )
-    )
-    assert isinstance(replaced_vertex_point, ifcopenshell.entity_instance)
-    entities_refercing_replaced_vertex_point = ifc4sav_file.get_inverse(
-        inst=replaced_vertex_point
-    )
-    for entity in entities_refercing_replaced_vertex_point:
-        if not isinstance(entity, ifcopenshell.entity_instance):
-            continue
-        if entity.is_a() == "IfcEdge":
-            if entity.EdgeStart == replaced_vertex_point:
-                entity.EdgeStart = replacing_vertex_point
-                continue
-            elif entity.EdgeEnd == replaced_vertex_point:
-                entity.EdgeEnd = replacing_vertex_point
-                continue
 
-    # Get replaced CartesianPoint
-    replaced_cartesian_point = replaced_vertex_point.VertexGeometry
+    # Replace VertexPoints of Edges (inverses are collected once)
+    edges = {}
+    for id_of_replaced_vertex_point in replacing_vertex_points:
+        for entity in ifc4sav_file.get_inverse(
+            inst=ifc4sav_file.by_id(id_of_replaced_vertex_point)
+        ):
+            if not isinstance(entity, ifcopenshell.entity_instance):
+                continue
+            if entity.is_a() == "IfcEdge":
+                edges[entity.id()] = entity
+    for edge in edges.values():
+        if edge.EdgeStart.id() in replacing_vertex_points:
+            edge.EdgeStart = replacing_vertex_points[edge.EdgeStart.id()]
+        if edge.EdgeEnd.id() in replacing_vertex_points:
+            edge.EdgeEnd = replacing_vertex_points[edge.EdgeEnd.id()]
+
+    # Get OwnerHistories only referenced by replaced nodes
+    owner_histories = {}
+    counts_of_replaced_nodes_of_owner_histories = {}
+    for (
+        id_of_replaced_structural_point_connection
+    ) in replacing_structural_point_connections:
+        owner_history = structural_point_connections[
+            id_of_replaced_structural_point_connection
+        ].OwnerHistory
+        if not isinstance(owner_history, ifcopenshell.entity_instance):
+            continue
+        owner_histories[owner_history.id()] = owner_history
+        counts_of_replaced_nodes_of_owner_histories[owner_history.id()] = (
+            counts_of_replaced_nodes_of_owner_histories.get(owner_history.id(), 0) + 1
+        )
+    ids_of_replaced_owner_histories = {
+        id_of_owner_history
+        for id_of_owner_history, owner_history in owner_histories.items()
+        if ifc4sav_file.get_total_inverses(inst=owner_history)
+        == counts_of_replaced_nodes_of_owner_histories[id_of_owner_history]
+    }
+
+    # Get replaced entities
+    replaced_entities = []
+    for (
+        id_of_replaced_structural_point_connection
+    ) in replacing_structural_point_connections:
+        replaced_structural_point_connection = structural_point_connections[
+            id_of_replaced_structural_point_connection
+        ]
+        replaced_product_definition_shape = (
+            replaced_structural_point_connection.Representation
+        )
+        assert isinstance(
+            replaced_product_definition_shape, ifcopenshell.entity_instance
+        )
+        assert isinstance(replaced_product_definition_shape.Representations, tuple)
+        replaced_topology_representation = (
+            replaced_product_definition_shape.Representations[0]
+        )
+        replaced_vertex_point = replaced_topology_representation.Items[0]
+        replaced_entities += [
+            replaced_vertex_point.VertexGeometry,
+            replaced_vertex_point,
+            replaced_topology_representation,
+            replaced_product_definition_shape,
+        ]
+        owner_history = replaced_structural_point_connection.OwnerHistory
+        if isinstance(owner_history, ifcopenshell.entity_instance):
+            if owner_history.id() in ids_of_replaced_owner_histories:
+                ids_of_replaced_owner_histories.remove(owner_history.id())
+                replaced_entities.append(owner_history)
+        replaced_entities.append(replaced_structural_point_connection)
+
+    # Remove replaced entities in one batch
+    ifc4sav_file.batch()
+    try:
+        for replaced_entity in replaced_entities:
+            ifc4sav_file.remove(inst=replaced_entity)
+    finally:
+        ifc4sav_file.unbatch()
 
-    # Get replaced ProductDefinitionShape
-    replaced_product_definition_shape = (
-        replaced_structural_point_connection.Representation
-    )
+    return replacing_structural_point_connections
 
-    # Get replaced Topologyrepresentation
-    assert isinstance(replaced_product_definition_shape, ifcopenshell.entity_instance)
-    assert isinstance(replaced_product_definition_shape.Representations, tuple)
-    replaced_topology_representation = (
-        replaced_product_definition_shape.Representations[0]
-    )
 
-    # Get replaced OwnerHistory
-    ifc4_file = replaced_structural_point_connection.file
-    owner_history_of_replaced_structural_point_connection = (
-        replaced_structural_point_connection.OwnerHistory
-    )
-    total_inverses_for_owner_history_of_replaced_structural_point_connection = (
-        ifc4_file.get_total_inverses(
-            inst=owner_history_of_replaced_structural_point_connection
+def remove_structural_members_assigned_to_product(
+    product: ifcopenshell.entity_instance,
+):
+    """Remove StructuralMembers assigned to a product (e.g., the IfcBeam they were
+    converted from), their connections, and the StructuralPointConnections left
+    without any connection"""
+
+    ifc4sav_file = product.file
+
+    # Get StructuralMembers assigned to product
+    structural_members = []
+    for rel_assigns_to_product in product.ReferencedBy:
+        for related_object in rel_assigns_to_product.RelatedObjects:
+            if related_object.is_a("IfcStructuralMember"):
+                structural_members.append(related_object)
+
+    # Remove StructuralMembers and their connections
+    structural_point_connections = []
+    for structural_member in structural_members:
+        for rel_connects_structural_member in list(structural_member.ConnectedBy):
+            structural_point_connection = (
+                rel_connects_structural_member.RelatedStructuralConnection
+            )
+            if structural_point_connection not in structural_point_connections:
+                structural_point_connections.append(structural_point_connection)
+            ifcopenshell.api.root.remove_product(
+                file=ifc4sav_file,
+                product=rel_connects_structural_member,
+            )
+        ifcopenshell.api.root.remove_product(
+            file=ifc4sav_file,
+            product=structural_member,
         )
-    )
-    if total_inverses_for_owner_history_of_replaced_structural_point_connection == 1:
-        replaced_owner_history = owner_history_of_replaced_structural_point_connection
-    else:
-        replaced_owner_history = None
-
-    # Remove replaced entities
-    for replaced_entity in [
-        replaced_cartesian_point,
-        replaced_vertex_point,
-        replaced_topology_representation,
-        replaced_product_definition_shape,
-        replaced_owner_history,
-        replaced_structural_point_connection,
-    ]:
-        if isinstance(replaced_entity, ifcopenshell.entity_instance):
-            ifc4sav_file.remove(inst=replaced_entity)
 
-    return replacing_structural_point_connection
+    # Remove StructuralPointConnections left without any connection
+    for structural_point_connection in structural_point_connections:
+        if len(structural_point_connection.ConnectsStructuralMembers) == 0:
+            ifcopenshell.api.root.remove_product(
+                file=ifc4sav_file,
+                product=structural_point_connection,
+            )
 
 
 def translate_structural_point_connection(
@@ -539,12 +679,6 @@ def translate_structural_point_connection(
     translation: tuple[float, float, float],
 ):
 
-    vertex_point = (
-        inlbim.util.structural.get_vertex_point_of_structural_point_connection(
-            structural_point_connection=structural_point_connection
-        )
-    )
-
     old_coordinates = (
         inlbim.util.structural.get_coordinates_of_structural_point_connection(
             structural_point_connection=structural_point_connection
@@ -557,6 +691,27 @@ def translate_structural_point_connection(
         old_coordinates[2] + translation[2],
     )
 
+    edit_coordinates_of_structural_point_connection(
+        structural_point_connection=structural_point_connection,
+        coordinates=new_coordinates,
+    )
+
+
+def edit_coordinates_of_structural_point_connection(
+    structural_point_connection: ifcopenshell.entity_instance,
+    coordinates: tuple[float, float, float],
+):
+    """Move a StructuralPointConnection. Its CartesianPoint is edited, unless it
+    is shared, in which case a new CartesianPoint is assigned"""
+
+    vertex_point = (
+        inlbim.util.structural.get_vertex_point_of_structural_point_connection(
+            structural_point_connection=structural_point_connection
+        )
+    )
+
+    new_coordinates = tuple(float(val) for val in coordinates)
+
     old_cartesian_point = vertex_point.VertexGeometry
 
     ifc4_sav_file = structural_point_connection.file
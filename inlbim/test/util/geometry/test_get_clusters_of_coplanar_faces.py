@@ -0,0 +1,94 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+import os
+import sys
+
+
+# Insert parent directory of package to path
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")),
+)
+
+
+from inlbim import current_time
+import time
+import chime
+import numpy as np
+import inlbim.util.geometry
+
+
+def main() -> int:
+
+    start_time = time.time()  # Record the start time
+
+    print(f"{current_time()}: Running {os.path.basename(__file__)} ...")
+
+    # Box of a wall (4.0 long, 3.0 high, 0.2 thick), rotated 30 degrees about the
+    # z-axis, with its front face at an offset on a rounding boundary (1.23455)
+    angle = np.radians(30.0)
+    normal_vector = np.array([np.cos(angle), np.sin(angle), 0.0])
+    direction_along_wall = np.array([-np.sin(angle), np.cos(angle), 0.0])
+    corners = [
+        1.23455 * normal_vector + x * direction_along_wall + z * np.array([0, 0, 1])
+        for x in [0.0, 4.0]
+        for z in [0.0, 3.0]
+    ]
+    verts = corners + [corner + 0.2 * normal_vector for corner in corners]
+    # The triangles of a face start at different vertices, so their computed
+    # planes differ in the last digits
+    faces = [
+        [0, 1, 3],
+        [3, 2, 0],
+        [4, 7, 5],
+        [7, 4, 6],
+        [0, 4, 5],
+        [0, 5, 1],
+        [2, 3, 7],
+        [2, 7, 6],
+        [0, 2, 6],
+        [0, 6, 4],
+        [1, 5, 7],
+        [1, 7, 3],
+    ]
+
+    # Front and back faces (a flat two-face wall)
+    triangular_mesh = inlbim.util.geometry.TriangularMesh(verts=verts, faces=faces[:4])
+    clusters = triangular_mesh.get_clusters_of_coplanar_faces()
+    for cluster in clusters:
+        print(cluster)
+    assert len(clusters) == 2
+    assert sorted(clusters[0]["indices_of_faces"]) in [[0, 1], [2, 3]]
+    thickness = abs(
+        np.dot(
+            np.array(clusters[0]["normal_vector"]),
+            np.array(clusters[1]["normal_vector"]),
+        )
+        * clusters[1]["offset"]
+        - clusters[0]["offset"]
+    )
+    assert np.isclose(thickness, 0.2)
+    print(f"Thickness: {thickness:.4f}\n")
+
+    # Box of the wall
+    triangular_mesh = inlbim.util.geometry.TriangularMesh(verts=verts, faces=faces)
+    clusters = triangular_mesh.get_clusters_of_coplanar_faces()
+    for cluster in clusters:
+        print(cluster)
+    assert len(clusters) == 6
+    assert all(len(cluster["indices_of_faces"]) == 2 for cluster in clusters)
+    assert {
+        tuple(clusters[0]["indices_of_faces"]),
+        tuple(clusters[1]["indices_of_faces"]),
+    } == {(0, 1), (2, 3)}
+
+    print(f"{current_time()}: Total elapsed was {time.time() - start_time:.4f} s\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    main()
+
+    chime.success(sync=True)
@@ -0,0 +1,108 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+import os
+import sys
+
+
+# Insert parent directory of package to path
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")),
+)
+
+
+from inlbim import current_time
+import time
+import chime
+import inlbim.util.geometry
+
+
+def main() -> int:
+
+    start_time = time.time()  # Record the start time
+
+    print(f"{current_time()}: Running {os.path.basename(__file__)} ...")
+
+    # Square (4.0 x 4.0) with a square hole (2.0 x 2.0)
+    triangular_mesh = inlbim.util.geometry.TriangularMesh(
+        verts=[
+            (0.0, 0.0, 0.0),
+            (4.0, 0.0, 0.0),
+            (4.0, 4.0, 0.0),
+            (0.0, 4.0, 0.0),
+            (1.0, 1.0, 0.0),
+            (3.0, 1.0, 0.0),
+            (3.0, 3.0, 0.0),
+            (1.0, 3.0, 0.0),
+        ],
+        faces=[
+            [0, 1, 5],
+            [0, 5, 4],
+            [1, 2, 6],
+            [1, 6, 5],
+            [2, 3, 7],
+            [2, 7, 6],
+            [3, 0, 4],
+            [3, 4, 7],
+        ],
+    )
+    boundary_edges = (
+        triangular_mesh.get_boundary_edges_from_group_of_contiguous_planar_faces(
+            indices_of_contiguous_planar_faces=list(range(8))
+        )
+    )
+    loops = triangular_mesh.get_loops_from_boundary_edges(boundary_edges=boundary_edges)
+    print(f"Loops of square with hole: {loops}")
+    assert len(loops) == 2
+    assert sorted(loops[0]) == [0, 1, 2, 3]
+    assert sorted(loops[1]) == [4, 5, 6, 7]
+
+    # Two squares (2.0 x 2.0) that share a vertex, where the walk along the
+    # first square reaches the edges of the second square first
+    triangular_mesh = inlbim.util.geometry.TriangularMesh(
+        verts=[
+            (0.0, 0.0, 0.0),
+            (2.0, 0.0, 0.0),
+            (2.0, 2.0, 0.0),
+            (0.0, 2.0, 0.0),
+            (4.0, 2.0, 0.0),
+            (4.0, 4.0, 0.0),
+            (2.0, 4.0, 0.0),
+        ],
+        faces=[
+            [0, 1, 2],
+            [2, 4, 5],
+            [2, 5, 6],
+            [0, 2, 3],
+        ],
+    )
+    boundary_edges = (
+        triangular_mesh.get_boundary_edges_from_group_of_contiguous_planar_faces(
+            indices_of_contiguous_planar_faces=list(range(4))
+        )
+    )
+    loops = triangular_mesh.get_loops_from_boundary_edges(boundary_edges=boundary_edges)
+    print(f"Loops of squares sharing a vertex: {loops}")
+    assert len(loops) == 2
+    assert sorted(sorted(loop) for loop in loops) == [[0, 1, 2, 3], [2, 4, 5, 6]]
+
+    # Edges that do not close a loop
+    try:
+        triangular_mesh.get_loops_from_boundary_edges(
+            boundary_edges=[(0, 1), (1, 2), (2, 3)]
+        )
+    except ValueError as exception:
+        print(f"Open chain of edges: {exception}")
+    else:
+        raise AssertionError("Open chain of edges was not reported")
+
+    print(f"{current_time()}: Total elapsed was {time.time() - start_time:.4f} s\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    main()
+
+    chime.success(sync=True)
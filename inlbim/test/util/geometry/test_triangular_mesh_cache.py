@@ -0,0 +1,135 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+import os
+import sys
+
+
+# Insert parent directory of package to path
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")),
+)
+
+
+from inlbim import current_time
+import tempfile
+import time
+import chime
+import numpy as np
+import ifcopenshell
+import ifcopenshell.geom
+import inlbim.util.geometry
+
+
+def main() -> int:
+
+    start_time = time.time()  # Record the start time
+
+    print(f"{current_time()}: Running {os.path.basename(__file__)} ...")
+
+    # Open IFC4 File
+    ifc4_file = ifcopenshell.open(
+        os.path.abspath(
+            os.path.join(
+                os.path.dirname(__file__),
+                "..",
+                "..",
+                "files",
+                "SteelConstruction_DTV.ifc",
+            )
+        )
+    )
+    assert isinstance(ifc4_file, ifcopenshell.file)
+    elements = ifc4_file.by_type(type="IfcSlab") + ifc4_file.by_type(type="IfcBeam")
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        # Cold run tessellates and fills the cache
+        cold_cache = inlbim.util.geometry.TriangularMeshCache(directory=directory)
+        cold_triangular_meshes = inlbim.util.geometry.TriangularMesh.from_ifc_elements(
+            elements=elements,
+            cache=cold_cache,
+        )
+        print(
+            f"Cold run: {cold_cache.hits} hits, {cold_cache.misses} misses, "
+            + f"{cold_cache.size_in_bytes} bytes"
+        )
+        assert cold_cache.hits == 0
+        assert cold_cache.misses == len(elements)
+
+        # Warm run loads every mesh from the cache, without tessellating
+        iterator, create_shape = (
+            ifcopenshell.geom.iterator,
+            ifcopenshell.geom.create_shape,
+        )
+
+        def fail_to_tessellate(*args, **kwargs):
+            raise AssertionError("Warm run tessellated an element")
+
+        ifcopenshell.geom.iterator = fail_to_tessellate
+        ifcopenshell.geom.create_shape = fail_to_tessellate
+        try:
+            warm_cache = inlbim.util.geometry.TriangularMeshCache(directory=directory)
+            warm_triangular_meshes = (
+                inlbim.util.geometry.TriangularMesh.from_ifc_elements(
+                    elements=elements,
+                    cache=warm_cache,
+                )
+            )
+        finally:
+            ifcopenshell.geom.iterator = iterator
+            ifcopenshell.geom.create_shape = create_shape
+        print(f"Warm run: {warm_cache.hits} hits, {warm_cache.misses} misses")
+        assert warm_cache.hits == len(elements)
+        assert warm_cache.misses == 0
+        assert warm_triangular_meshes.keys() == cold_triangular_meshes.keys()
+        for global_id, triangular_mesh in warm_triangular_meshes.items():
+            assert np.array_equal(
+                triangular_mesh.verts, cold_triangular_meshes[global_id].verts
+            )
+            assert np.array_equal(
+                triangular_mesh.faces, cold_triangular_meshes[global_id].faces
+            )
+        print("Warm run gives the same meshes as the cold run")
+
+        # Overwriting an entry does not count its size twice
+        key = warm_cache.calculate_key_of_element(element=elements[0])
+        warm_cache.save(
+            key=key, triangular_mesh=cold_triangular_meshes[elements[0].GlobalId]
+        )
+        assert warm_cache.size_in_bytes == cold_cache.size_in_bytes
+
+    # Eviction keeps the cache under its maximum size
+    with tempfile.TemporaryDirectory() as directory:
+        max_size_in_bytes = cold_cache.size_in_bytes // 4
+        small_cache = inlbim.util.geometry.TriangularMeshCache(
+            directory=directory,
+            max_size_in_bytes=max_size_in_bytes,
+        )
+        for element in elements:
+            small_cache.save(
+                key=small_cache.calculate_key_of_element(element=element),
+                triangular_mesh=cold_triangular_meshes[element.GlobalId],
+            )
+            size_in_bytes_of_directory = sum(
+                entry.stat().st_size for entry in os.scandir(directory)
+            )
+            assert small_cache.size_in_bytes == size_in_bytes_of_directory
+            assert size_in_bytes_of_directory <= max_size_in_bytes
+        print(
+            f"Eviction kept the cache at {small_cache.size_in_bytes} bytes "
+            + f"(maximum {max_size_in_bytes} bytes, {len(os.listdir(directory))} "
+            + f"of {len(elements)} entries)"
+        )
+        assert 0 < len(os.listdir(directory)) < len(elements)
+
+    print(f"{current_time()}: Total elapsed was {time.time() - start_time:.4f} s\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    main()
+
+    chime.success(sync=True)
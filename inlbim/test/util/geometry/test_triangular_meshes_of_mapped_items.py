@@ -0,0 +1,179 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+import os
+import sys
+
+
+# Insert parent directory of package to path
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")),
+)
+
+
+from inlbim import current_time
+import time
+import chime
+import numpy as np
+import ifcopenshell
+import ifcopenshell.geom
+import ifcopenshell.util.unit
+import inlbim.util.geometry
+from inlbim.util.geometry import (
+    get_mapped_representation_and_transformation_matrix_of_element,
+)
+
+
+def get_triangular_meshes_from_geometry_iterator(
+    elements: list[ifcopenshell.entity_instance],
+) -> dict[str, inlbim.util.geometry.TriangularMesh]:
+
+    triangular_meshes = {}
+    iterator = ifcopenshell.geom.iterator(
+        inlbim.util.geometry.get_settings_for_tessellation(),
+        elements[0].file,
+        1,
+        include=elements,
+    )
+    assert iterator.initialize()
+    while True:
+        shape = iterator.get()
+        triangular_meshes[shape.guid] = inlbim.util.geometry.TriangularMesh(
+            verts=shape.geometry.verts,
+            faces=shape.geometry.faces,
+        )
+        if not iterator.next():
+            break
+
+    return triangular_meshes
+
+
+def main() -> int:
+
+    start_time = time.time()  # Record the start time
+
+    print(f"{current_time()}: Running {os.path.basename(__file__)} ...")
+
+    # Open IFC4 File
+    ifc4_file = ifcopenshell.open(
+        os.path.abspath(
+            os.path.join(
+                os.path.dirname(__file__),
+                "..",
+                "..",
+                "files",
+                "SteelConstruction_DTV.ifc",
+            )
+        )
+    )
+    assert isinstance(ifc4_file, ifcopenshell.file)
+    unit_scale = ifcopenshell.util.unit.calculate_unit_scale(ifc4_file)
+
+    # Beams and columns whose Body is a single IfcMappedItem
+    mapped_representations_of_elements = {}
+    beams_and_columns = ifc4_file.by_type(type="IfcBeam") + ifc4_file.by_type(
+        type="IfcColumn"
+    )
+    for element in beams_and_columns:
+        mapped_representation_and_transformation_matrix = (
+            get_mapped_representation_and_transformation_matrix_of_element(
+                element=element,
+                unit_scale=unit_scale,
+            )
+        )
+        if mapped_representation_and_transformation_matrix is not None:
+            mapped_representations_of_elements[element] = (
+                mapped_representation_and_transformation_matrix[0]
+            )
+    elements = list(mapped_representations_of_elements)
+    number_of_mapped_representations = len(
+        set(mapped_representations_of_elements.values())
+    )
+    print(
+        f"{len(elements)} instances of {number_of_mapped_representations} "
+        + "MappedRepresentations"
+    )
+    assert len(elements) > number_of_mapped_representations > 0
+
+    # Each MappedRepresentation is tessellated once, instead of each instance
+    create_shape = ifcopenshell.geom.create_shape
+    shapes_created = []
+
+    def create_shape_and_count(settings, inst, *args, **kwargs):
+        shapes_created.append(inst)
+        return create_shape(settings, inst, *args, **kwargs)
+
+    ifcopenshell.geom.create_shape = create_shape_and_count
+    try:
+        triangular_meshes = inlbim.util.geometry.TriangularMesh.from_ifc_elements(
+            elements=elements
+        )
+    finally:
+        ifcopenshell.geom.create_shape = create_shape
+    assert len(shapes_created) == number_of_mapped_representations
+
+    # The placed copies match the meshes of the geometry iterator
+    triangular_meshes_from_geometry_iterator = (
+        get_triangular_meshes_from_geometry_iterator(elements=elements)
+    )
+    assert triangular_meshes.keys() == triangular_meshes_from_geometry_iterator.keys()
+    for global_id, triangular_mesh in triangular_meshes.items():
+        assert np.allclose(
+            triangular_mesh.verts,
+            triangular_meshes_from_geometry_iterator[global_id].verts,
+            atol=1e-9,
+        )
+        assert np.array_equal(
+            triangular_mesh.faces,
+            triangular_meshes_from_geometry_iterator[global_id].faces,
+        )
+    print("Instances of MappedRepresentations match the geometry iterator")
+
+    # Mirror one instance, which is left to the geometry iterator
+    mirrored_element = elements[0]
+    mapped_item = [
+        representation
+        for representation in mirrored_element.Representation.Representations
+        if representation.RepresentationIdentifier == "Body"
+    ][0].Items[0]
+    mapped_item.MappingTarget = ifc4_file.createIfcCartesianTransformationOperator3D(
+        Axis1=ifc4_file.createIfcDirection((1.0, 0.0, 0.0)),
+        Axis2=ifc4_file.createIfcDirection((0.0, -1.0, 0.0)),
+        LocalOrigin=ifc4_file.createIfcCartesianPoint((0.0, 0.0, 0.0)),
+        Scale=1.0,
+        Axis3=ifc4_file.createIfcDirection((0.0, 0.0, 1.0)),
+    )
+    mapped_representation_and_transformation_matrix = (
+        get_mapped_representation_and_transformation_matrix_of_element(
+            element=mirrored_element,
+            unit_scale=unit_scale,
+        )
+    )
+    assert mapped_representation_and_transformation_matrix is None
+    mirrored_triangular_mesh = inlbim.util.geometry.TriangularMesh.from_ifc_elements(
+        elements=[mirrored_element]
+    )[mirrored_element.GlobalId]
+    triangular_mesh_from_geometry_iterator = (
+        get_triangular_meshes_from_geometry_iterator(elements=[mirrored_element])[
+            mirrored_element.GlobalId
+        ]
+    )
+    assert np.array_equal(
+        mirrored_triangular_mesh.verts, triangular_mesh_from_geometry_iterator.verts
+    )
+    assert not np.allclose(
+        mirrored_triangular_mesh.verts,
+        triangular_meshes[mirrored_element.GlobalId].verts,
+    )
+    print("Mirrored instance matches the geometry iterator")
+
+    print(f"{current_time()}: Total elapsed was {time.time() - start_time:.4f} s\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    main()
+
+    chime.success(sync=True)
@@ -0,0 +1,86 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+import os
+import sys
+
+
+# Insert parent directory of package to path
+sys.path.insert(
+    0,
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")),
+)
+
+
+from inlbim import current_time
+import time
+import random
+import chime
+import inlbim.util.library
+import inlbim.util.profile
+
+
+def main() -> int:
+
+    start_time = time.time()  # Record the start time
+
+    print(f"{current_time()}: Running {os.path.basename(__file__)} ...")
+
+    # Profile names of all section libraries
+    profile_names = []
+    for section_library in ["AISC14", "SJIJoists", "BSShapes2006", "Euro"]:
+        section_library_data = inlbim.util.library.load_section_library(
+            section_library=section_library
+        )
+        for section_category_dictionary in section_library_data.values():
+            profile_names += list(section_category_dictionary.keys())
+
+    # Queries like the metadata of a frame member (Name split at ":")
+    random.seed(0)
+    queries = []
+    for profile_name in random.sample(profile_names, 50):
+        queries.append(["Beam", profile_name.replace("X", " x "), "123456"])
+
+    print("Library size | best_fuzzy_match (ms) | FuzzyMatchIndex (ms) | Same winners")
+    for library_size in [100, 400, 1600, len(profile_names)]:
+        strings_matching = random.sample(profile_names, library_size)
+
+        start = time.perf_counter()
+        winners = [
+            inlbim.util.profile.best_fuzzy_match(
+                strings_matched_to=query,
+                strings_matching=strings_matching,
+                threshold=0.80,
+            )
+            for query in queries
+        ]
+        time_of_best_fuzzy_match = (time.perf_counter() - start) / len(queries)
+
+        fuzzy_match_index = inlbim.util.profile.FuzzyMatchIndex(
+            strings=strings_matching
+        )
+        start = time.perf_counter()
+        winners_from_index = [
+            fuzzy_match_index.best_fuzzy_match(
+                strings_matched_to=query,
+                threshold=0.80,
+            )
+            for query in queries
+        ]
+        time_of_fuzzy_match_index = (time.perf_counter() - start) / len(queries)
+
+        print(
+            f"{library_size:12d} | {time_of_best_fuzzy_match * 1000:21.3f} | "
+            + f"{time_of_fuzzy_match_index * 1000:20.3f} | "
+            + f"{winners == winners_from_index}"
+        )
+
+    print(f"{current_time()}: Total elapsed was {time.time() - start_time:.4f} s\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+
+    main()
+
+    chime.success(sync=True)
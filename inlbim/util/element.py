@@ -2,10 +2,13 @@
 
 import ifcopenshell
 import ifcopenshell.util.element
+import ifcopenshell.util.selector
 from ifcopenshell.guid import _CHARS64_IFC
 import string
 import os
 import json
+import hashlib
+import inlbim.util.file
 
 IFC_GUID_CHARS = set(_CHARS64_IFC)
 ASCII_CHARS = set(string.ascii_uppercase + string.ascii_lowercase)
@@ -28,6 +31,75 @@ def get_dictionary_of_ifc_classes_mapped_to_elements(
     return elements_by_class
 
 
+def get_dictionary_of_ifc_classes_mapped_to_selected_elements(
+    ifc4_file: ifcopenshell.file,
+    ifc_classes: list[str],
+    selection_query: str = "IfcElement",
+    deselection_query: str | None = None,
+) -> dict[str, list[ifcopenshell.entity_instance]]:
+    """Get dictionary of IFC classes mapped to the IfcElements that match the
+    selection query but not the deselection query. Each query is evaluated once
+    and the result is bucketed by class (including subtypes) in a single pass.
+    Elements are sorted by step id, so the result is deterministic."""
+
+    # Evaluate queries
+    selected_elements = ifcopenshell.util.selector.filter_elements(
+        ifc_file=ifc4_file,
+        query=selection_query,
+    )
+    if isinstance(deselection_query, str):
+        deselected_elements = ifcopenshell.util.selector.filter_elements(
+            ifc_file=ifc4_file,
+            query=deselection_query,
+        )
+    else:
+        deselected_elements = set()
+
+    # Bucket elements by class
+    elements_by_class = {ifc_class: [] for ifc_class in ifc_classes}
+    for element in sorted(
+        selected_elements.difference(deselected_elements),
+        key=lambda element: element.id(),
+    ):
+        if not element.is_a("IfcElement"):
+            continue
+        for ifc_class in ifc_classes:
+            if element.is_a(ifc_class):
+                elements_by_class[ifc_class].append(element)
+
+    return elements_by_class
+
+
+def get_fingerprint_of_element(
+    element: ifcopenshell.entity_instance,
+) -> str:
+    """Get a hash of the content of an element that changes whenever its geometry
+    or metadata changes: attributes, placement, representation, type, materials,
+    property sets, and openings. OwnerHistory is ignored, so that saving a file
+    without editing the element does not change the fingerprint"""
+
+    roots = [element]
+    for rel in getattr(element, "IsTypedBy", None) or []:
+        roots.append(rel.RelatingType)
+    for rel in getattr(element, "HasAssociations", None) or []:
+        if rel.is_a("IfcRelAssociatesMaterial"):
+            roots.append(rel.RelatingMaterial)
+    for rel in getattr(element, "IsDefinedBy", None) or []:
+        if rel.is_a("IfcRelDefinesByProperties"):
+            roots.append(rel.RelatingPropertyDefinition)
+    for rel in getattr(element, "HasOpenings", None) or []:
+        roots.append(rel.RelatedOpeningElement)
+
+    hash_object = hashlib.sha256()
+    inlbim.util.file.update_hash_with_entity_graphs(
+        hash_object=hash_object,
+        roots=roots,
+        excluded_classes=("IfcOwnerHistory",),
+    )
+
+    return hash_object.hexdigest()
+
+
 def select_ifc_elements_based_on_tags(
     ifc4_file: ifcopenshell.file,
     tags: list[str],
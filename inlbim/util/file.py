@@ -3,6 +3,7 @@
 import ifcopenshell
 import ifcopenshell.util.representation
 import numpy as np
+import hashlib
 
 
 def get_precision_of_project(
@@ -30,3 +31,47 @@ def get_numeric_scale_of_project(
     numeric_scale = int(-1 * np.log10(precision))
 
     return numeric_scale
+
+
+def update_hash_with_entity_graphs(
+    hash_object: "hashlib._Hash",
+    roots: list[ifcopenshell.entity_instance | None],
+    excluded_classes: tuple[str, ...] = (),
+):
+    """Update hash with the content of the entity graphs (forward references only)
+    of the given roots. Step ids are replaced by the order of traversal, so the
+    hash does not depend on how the file is numbered. Entities of excluded classes
+    (e.g., IfcOwnerHistory) are replaced by '*'"""
+
+    def serialize_value(value) -> str:
+        if isinstance(value, ifcopenshell.entity_instance):
+            if value.id():
+                if value.is_a() in excluded_classes:
+                    return "*"
+                return f"#{index_of_entity[value.id()]}"
+            return f"{value.is_a()}({serialize_value(value.wrappedValue)})"
+        elif isinstance(value, (tuple, list)):
+            return "(" + ",".join(serialize_value(item) for item in value) + ")"
+        else:
+            # repr() round-trips floats exactly
+            return repr(value)
+
+    for root in roots:
+        hash_object.update(b"|")
+        if root is None:
+            continue
+        entities = [
+            entity
+            for entity in root.file.traverse(root)
+            if entity.is_a() not in excluded_classes
+        ]
+        index_of_entity = {entity.id(): index for index, entity in enumerate(entities)}
+        for entity in entities:
+            hash_object.update(
+                (
+                    entity.is_a()
+                    + "("
+                    + ",".join(serialize_value(attribute) for attribute in entity)
+                    + ");"
+                ).encode()
+            )
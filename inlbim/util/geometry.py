@@ -10,6 +10,12 @@ import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d.art3d import Poly3DCollection
 from mpl_toolkits.mplot3d import Axes3D
 import random
+import os
+import hashlib
+import ifcopenshell.util.placement
+import ifcopenshell.util.representation
+import ifcopenshell.util.unit
+import inlbim.util.file
 
 
 def get_coordinates_of_vertex_point(
@@ -34,100 +40,310 @@ def group_in_threes(input_list: list[int | float]) -> list:
     return grouped_list
 
 
+def get_settings_for_tessellation() -> ifcopenshell.geom.settings:
+
+    settings = ifcopenshell.geom.settings()
+    settings.set("weld-vertices", True)
+    settings.set(settings.BUILDING_LOCAL_PLACEMENT, False)
+    settings.set(settings.SITE_LOCAL_PLACEMENT, True)
+    settings.set(settings.USE_WORLD_COORDS, True)
+
+    return settings
+
+
+def get_transformation_matrix_relative_to_site(
+    object_placement: ifcopenshell.entity_instance,
+) -> np.ndarray | None:
+    """Compose the chain of IfcLocalPlacements up to (and excluding) the placement
+    of the IfcSite, like the tessellation settings do with SITE_LOCAL_PLACEMENT.
+    Returns None for other kinds of placements"""
+
+    chain_of_placements = []
+    placement = object_placement
+    while placement is not None:
+        if not placement.is_a("IfcLocalPlacement"):
+            return None
+        if any(product.is_a("IfcSite") for product in placement.PlacesObject):
+            break
+        chain_of_placements.append(placement)
+        placement = placement.PlacementRelTo
+
+    transformation_matrix = np.eye(4)
+    for placement in reversed(chain_of_placements):
+        transformation_matrix = np.dot(
+            transformation_matrix,
+            ifcopenshell.util.placement.get_axis2placement(placement.RelativePlacement),
+        )
+
+    return transformation_matrix
+
+
+def get_mapped_representation_and_transformation_matrix_of_element(
+    element: ifcopenshell.entity_instance,
+    unit_scale: float,
+) -> tuple[ifcopenshell.entity_instance, np.ndarray] | None:
+    """If the Body of the element is a single IfcMappedItem and nothing is cut out
+    of it, get the MappedRepresentation of its RepresentationMap and the matrix
+    that places the tessellation of the MappedRepresentation (in SI units) at the
+    instance. Returns None otherwise"""
+
+    if len(getattr(element, "HasOpenings", None) or []) > 0:
+        return None
+    if element.Representation is None:
+        return None
+
+    # Only the Body is tessellated
+    body_representations = [
+        representation
+        for representation in element.Representation.Representations
+        if representation.RepresentationIdentifier == "Body"
+    ]
+    if len(body_representations) != 1:
+        return None
+    body_representation = body_representations[0]
+    if body_representation.RepresentationType != "MappedRepresentation":
+        return None
+    if len(body_representation.Items) != 1:
+        return None
+    mapped_item = body_representation.Items[0]
+    if not mapped_item.is_a("IfcMappedItem"):
+        return None
+
+    # Object Placement Transformation
+    transformation_matrix = get_transformation_matrix_relative_to_site(
+        object_placement=element.ObjectPlacement
+    )
+    if transformation_matrix is None:
+        return None
+
+    # MappedItem Transformation
+    if not mapped_item.MappingTarget.is_a("IfcCartesianTransformationOperator3D"):
+        return None
+    transformation_matrix = (
+        transformation_matrix
+        @ ifcopenshell.util.placement.get_mappeditem_transformation(item=mapped_item)
+    )
+
+    # Mirrored instances are left to the geometry iterator
+    if np.linalg.det(transformation_matrix[:3, :3]) <= 0.0:
+        return None
+
+    transformation_matrix[:3, 3] *= unit_scale
+
+    return mapped_item.MappingSource.MappedRepresentation, transformation_matrix
+
+
 class TriangularMesh:
+    """Triangular mesh backed by contiguous arrays of verts ((N, 3) float64) and
+    faces ((M, 3) int32). Areas, normal vectors, centroids, and plane equations
+    are computed for all faces at once, on first use, and the per-face methods
+    are views of those arrays. The mesh must not be modified after creation."""
+
     def __init__(
         self,
-        verts: list[tuple[float, float, float]],
-        faces: list[list[int]],
+        verts: list[tuple[float, float, float]] | list[float] | np.ndarray,
+        faces: list[list[int]] | list[int] | np.ndarray,
     ):
-        self.verts = verts
-        self.faces = faces
+        self.verts = np.ascontiguousarray(
+            np.asarray(verts, dtype=np.float64).reshape(-1, 3)
+        )
+        self.faces = np.ascontiguousarray(
+            np.asarray(faces, dtype=np.int32).reshape(-1, 3)
+        )
+        self.metrics_of_faces = {}
+
+    def get_coordinates_of_all_faces(self) -> np.ndarray:
+        """Get (M, 3, 3) array of the coordinates of the vertices of the faces"""
+
+        if "coordinates" not in self.metrics_of_faces:
+            self.metrics_of_faces["coordinates"] = self.verts[self.faces]
+
+        return self.metrics_of_faces["coordinates"]
+
+    def calculate_cross_products_of_faces(self) -> np.ndarray:
+        """Get (M, 3) array of (p2 - p1) x (p3 - p1) of the faces"""
+
+        if "cross_products" not in self.metrics_of_faces:
+            coordinates_of_faces = self.get_coordinates_of_all_faces()
+            self.metrics_of_faces["cross_products"] = np.cross(
+                coordinates_of_faces[:, 1] - coordinates_of_faces[:, 0],
+                coordinates_of_faces[:, 2] - coordinates_of_faces[:, 0],
+            )
+
+        return self.metrics_of_faces["cross_products"]
+
+    def calculate_areas_of_faces(self) -> np.ndarray:
+
+        if "areas" not in self.metrics_of_faces:
+            self.metrics_of_faces["areas"] = 0.5 * np.linalg.norm(
+                self.calculate_cross_products_of_faces(), axis=1
+            )
+
+        return self.metrics_of_faces["areas"]
+
+    def calculate_normal_vectors_of_faces(self) -> np.ndarray:
+        """Get (M, 3) array of unit normal vectors of the faces (NaN for
+        degenerate faces)"""
+
+        if "normal_vectors" not in self.metrics_of_faces:
+            cross_products_of_faces = self.calculate_cross_products_of_faces()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self.metrics_of_faces["normal_vectors"] = (
+                    cross_products_of_faces
+                    / np.linalg.norm(cross_products_of_faces, axis=1)[:, np.newaxis]
+                )
+
+        return self.metrics_of_faces["normal_vectors"]
+
+    def calculate_centroids_of_faces(self) -> np.ndarray:
+
+        if "centroids" not in self.metrics_of_faces:
+            self.metrics_of_faces["centroids"] = np.mean(
+                self.get_coordinates_of_all_faces(), axis=1
+            )
+
+        return self.metrics_of_faces["centroids"]
+
+    def calculate_plane_equations_of_faces(self) -> np.ndarray:
+        """Get (M, 4) array of (a, b, c, d) of the planes of the faces, where
+        (a, b, c) is the unit normal vector and a*x + b*y + c*z + d = 0"""
+
+        if "plane_equations" not in self.metrics_of_faces:
+            normal_vectors_of_faces = self.calculate_normal_vectors_of_faces()
+            offsets_of_faces = -np.einsum(
+                "ij,ij->i",
+                normal_vectors_of_faces,
+                self.get_coordinates_of_all_faces()[:, 0],
+            )
+            self.metrics_of_faces["plane_equations"] = np.column_stack(
+                (normal_vectors_of_faces, offsets_of_faces)
+            )
+
+        return self.metrics_of_faces["plane_equations"]
 
     def are_faces_coplanar(
         self,
         index_of_face1: int,
         index_of_face2: int,
     ):
-        def normal_vector(v1, v2, v3):
-            # Calculate the normal vector of the plane defined by three vertices
-            vec1 = np.subtract(v2, v1)
-            vec2 = np.subtract(v3, v1)
-            return np.cross(vec1, vec2)
+        """Check if all vertices of face 2 lie in the plane of face 1"""
 
-        def point_in_plane(point, plane_point, normal):
-            # Check if a point lies in the plane defined by a point and a normal vector
-            vec = np.subtract(point, plane_point)
-            return np.round(np.dot(vec, normal), 4) == 0.0
+        # Calculate the (not normalized) normal vector of the first face
+        normal = self.calculate_cross_products_of_faces()[index_of_face1]
+        point_in_plane = self.verts[self.faces[index_of_face1][0]]
 
-        face1 = self.get_coordinates_of_faces(indices_of_faces=[index_of_face1])[0]
-        face2 = self.get_coordinates_of_faces(indices_of_faces=[index_of_face2])[0]
+        # Check if all vertices of the second face lie in the plane of the first face
+        return bool(
+            np.all(
+                np.round(
+                    (
+                        self.get_coordinates_of_all_faces()[index_of_face2]
+                        - point_in_plane
+                    )
+                    @ normal,
+                    4,
+                )
+                == 0.0
+            )
+        )
 
-        # Extract vertices from the faces
-        v1, v2, v3 = face1
-        v4, v5, v6 = face2
+    def get_clusters_of_coplanar_faces(
+        self,
+        decimals: int = 4,
+    ) -> list[dict]:
+        """Group faces by their plane. Starting from the largest face not yet
+        grouped, a cluster holds the faces not yet grouped whose vertices are all
+        within 10**-decimals of the plane of that face, so planes facing opposite
+        directions are the same plane. The remaining degenerate faces form one
+        cluster. Returns clusters ranked by total area (ties are broken by the
+        area and then the index of their largest face). Each cluster is a
+        dictionary with the indices of its faces, the index of its largest face,
+        its total area, and the normal vector and offset of the plane of its
+        largest face"""
+
+        if len(self.faces) == 0:
+            return []
+
+        # Visit faces from largest to smallest (then by index)
+        plane_equations = self.calculate_plane_equations_of_faces()
+        areas_of_faces = self.calculate_areas_of_faces()
+        coordinates_of_faces = self.get_coordinates_of_all_faces()
+        indices_of_faces_not_yet_grouped = np.lexsort(
+            (np.arange(len(self.faces)), -areas_of_faces)
+        )
 
-        # Calculate the normal vector of the first face
-        normal = normal_vector(v1, v2, v3)
+        # Group faces with all vertices in the plane of the largest face left
+        indices_of_faces_of_clusters = []
+        while len(indices_of_faces_not_yet_grouped) > 0:
+            index_of_largest_face = indices_of_faces_not_yet_grouped[0]
+            if np.isnan(plane_equations[index_of_largest_face]).any():
+                are_in_cluster = np.ones(
+                    len(indices_of_faces_not_yet_grouped), dtype=bool
+                )
+            else:
+                distances_of_vertices_to_plane = (
+                    coordinates_of_faces[indices_of_faces_not_yet_grouped]
+                    @ plane_equations[index_of_largest_face, :3]
+                    + plane_equations[index_of_largest_face, 3]
+                )
+                are_in_cluster = np.all(
+                    np.abs(distances_of_vertices_to_plane) <= 10.0**-decimals,
+                    axis=1,
+                )
+                are_in_cluster[0] = True
+            indices_of_faces_of_clusters.append(
+                np.sort(indices_of_faces_not_yet_grouped[are_in_cluster])
+            )
+            indices_of_faces_not_yet_grouped = indices_of_faces_not_yet_grouped[
+                ~are_in_cluster
+            ]
 
-        # Check if all vertices of the second face lie in the plane of the first face
-        return (
-            point_in_plane(v4, v1, normal)
-            and point_in_plane(v5, v1, normal)
-            and point_in_plane(v6, v1, normal)
+        # Rank clusters by area
+        clusters = []
+        for indices_of_faces in indices_of_faces_of_clusters:
+            index_of_largest_face = int(
+                indices_of_faces[np.argmax(areas_of_faces[indices_of_faces])]
+            )
+            clusters.append(
+                {
+                    "indices_of_faces": indices_of_faces.tolist(),
+                    "index_of_largest_face": index_of_largest_face,
+                    "area": float(areas_of_faces[indices_of_faces].sum()),
+                    "normal_vector": tuple(
+                        plane_equations[index_of_largest_face, :3].tolist()
+                    ),
+                    "offset": float(plane_equations[index_of_largest_face, 3]),
+                }
+            )
+        clusters.sort(
+            key=lambda cluster: (
+                -round(cluster["area"], decimals),
+                -areas_of_faces[cluster["index_of_largest_face"]],
+                cluster["index_of_largest_face"],
+            )
         )
 
+        return clusters
+
     def calculate_centroid_of_face(
         self,
         index_of_face: int,
     ) -> tuple[float, float, float]:
 
-        face = self.faces[index_of_face]
-
-        p1 = self.verts[face[0]]
-        p2 = self.verts[face[1]]
-        p3 = self.verts[face[2]]
-
-        average_array = tuple(
-            [
-                float(val)
-                for val in np.mean(
-                    np.stack((np.array(p1), np.array(p2), np.array(p3)), axis=0), axis=0
-                ).tolist()
-            ]
-        )
-        assert len(average_array) == 3
-
-        return average_array
+        return tuple(self.calculate_centroids_of_faces()[index_of_face].tolist())
 
     def calculate_centroid_of_given_faces(
         self,
         indices_of_faces: list[int],
     ) -> tuple[float, float, float]:
 
-        centroids_of_faces = [
-            self.calculate_centroid_of_face(index_of_face=index_of_face)
-            for index_of_face in indices_of_faces
-        ]
-
-        areas_of_faces = [
-            self.calculate_area_of_face(face_index) for face_index in indices_of_faces
-        ]
-
-        total_area = sum(areas_of_faces)
+        centroids_of_faces = self.calculate_centroids_of_faces()[indices_of_faces]
+        areas_of_faces = self.calculate_areas_of_faces()[indices_of_faces]
 
         centroid = (
-            sum(
-                [
-                    np.array(centroid_of_face) * area_of_face
-                    for centroid_of_face, area_of_face in zip(
-                        centroids_of_faces, areas_of_faces
-                    )
-                ]
-            )
-            * 1
-            / total_area
+            np.sum(centroids_of_faces * areas_of_faces[:, np.newaxis], axis=0)
+            / areas_of_faces.sum()
         )
-        assert isinstance(centroid, np.ndarray)
 
         centroid = tuple([float(val) for val in centroid.tolist()])
         assert len(centroid) == 3
@@ -144,26 +360,35 @@ class TriangularMesh:
     def from_ifc_element(
         cls,
         element: ifcopenshell.entity_instance,
+        cache: "TriangularMeshCache | None" = None,
+        number_of_threads: int | None = None,
     ):
+        """Tessellate the element with number_of_threads threads (by default,
+        one per CPU)"""
+
+        # Look up the mesh in the on-disk cache
+        if cache is not None:
+            key = cache.calculate_key_of_element(element=element)
+            triangular_mesh = cache.load(key=key)
+            if triangular_mesh is not None:
+                return triangular_mesh
 
         ifc_file = element.file
 
-        settings = ifcopenshell.geom.settings()
-        settings.set("weld-vertices", True)
-        settings.set(settings.BUILDING_LOCAL_PLACEMENT, False)
-        settings.set(settings.SITE_LOCAL_PLACEMENT, True)
-        settings.set(settings.USE_WORLD_COORDS, True)
         iterator = ifcopenshell.geom.iterator(
-            settings, ifc_file, multiprocessing.cpu_count(), include=[element]
+            get_settings_for_tessellation(),
+            ifc_file,
+            number_of_threads if number_of_threads else multiprocessing.cpu_count(),
+            include=[element],
         )
         if iterator.initialize():
             while True:
                 shape = iterator.get()
                 # element = ifc_file.by_id(shape.id)
                 # matrix = shape.transformation.matrix
-                faces = group_in_threes(shape.geometry.faces)
+                faces = shape.geometry.faces
                 # edges = shape.geometry.edges
-                verts = group_in_threes(shape.geometry.verts)
+                verts = shape.geometry.verts
                 # materials = shape.geometry.materials
                 # material_ids = shape.geometry.material_ids
                 # points = group_in_threes(verts)
@@ -172,64 +397,164 @@ class TriangularMesh:
                 if not iterator.next():
                     break
 
-        return cls(
+        triangular_mesh = cls(
             verts=verts,
             faces=faces,
         )
 
-    def calculate_area_of_face(
-        self,
-        face_index: int,
-    ) -> float:
+        if cache is not None:
+            cache.save(key=key, triangular_mesh=triangular_mesh)
 
-        face = self.faces[face_index]
+        return triangular_mesh
 
-        p1 = self.verts[face[0]]
-        p2 = self.verts[face[1]]
-        p3 = self.verts[face[2]]
+    @classmethod
+    def from_ifc_elements(
+        cls,
+        elements: list[ifcopenshell.entity_instance],
+        cache: "TriangularMeshCache | None" = None,
+        number_of_threads: int | None = None,
+    ) -> dict[str, "TriangularMesh"]:
+        """Tessellate all elements with a single geometry iterator, which runs
+        number_of_threads threads (by default, one per CPU). Returns a
+        dictionary of GlobalIds mapped to TriangularMeshes. Elements that could
+        not be tessellated are omitted. Elements found in the cache are not
+        tessellated at all. Instances of the same RepresentationMap share one
+        tessellation, which is transformed to the placement of each instance."""
+
+        triangular_meshes = {}
+
+        # Look up meshes in the on-disk cache
+        keys_of_elements_to_tessellate = {}
+        for element in elements:
+            if cache is None:
+                keys_of_elements_to_tessellate[element.GlobalId] = None
+                continue
+            key = cache.calculate_key_of_element(element=element)
+            triangular_mesh = cache.load(key=key)
+            if triangular_mesh is None:
+                keys_of_elements_to_tessellate[element.GlobalId] = key
+            else:
+                triangular_meshes[element.GlobalId] = triangular_mesh
+
+        if len(keys_of_elements_to_tessellate) == 0:
+            return triangular_meshes
+
+        ifc_file = elements[0].file
+
+        # Tessellate each RepresentationMap once and place a copy of its mesh at
+        # each of its instances
+        unit_scale = ifcopenshell.util.unit.calculate_unit_scale(ifc_file)
+        triangular_meshes_of_mapped_representations = {}
+        elements_to_iterate = []
+        for element in elements:
+            if element.GlobalId not in keys_of_elements_to_tessellate:
+                continue
+            mapped_representation_and_transformation_matrix = (
+                get_mapped_representation_and_transformation_matrix_of_element(
+                    element=element,
+                    unit_scale=unit_scale,
+                )
+            )
+            if mapped_representation_and_transformation_matrix is None:
+                elements_to_iterate.append(element)
+                continue
+            mapped_representation, transformation_matrix = (
+                mapped_representation_and_transformation_matrix
+            )
+            if (
+                mapped_representation.id()
+                not in triangular_meshes_of_mapped_representations
+            ):
+                try:
+                    shape = ifcopenshell.geom.create_shape(
+                        get_settings_for_tessellation(), mapped_representation
+                    )
+                    triangular_meshes_of_mapped_representations[
+                        mapped_representation.id()
+                    ] = cls(
+                        verts=shape.verts,
+                        faces=shape.faces,
+                    )
+                except Exception:
+                    triangular_meshes_of_mapped_representations[
+                        mapped_representation.id()
+                    ] = None
+            triangular_mesh_of_mapped_representation = (
+                triangular_meshes_of_mapped_representations[mapped_representation.id()]
+            )
+            if triangular_mesh_of_mapped_representation is None:
+                elements_to_iterate.append(element)
+                continue
+            triangular_mesh = (
+                triangular_mesh_of_mapped_representation.transform_with_matrix(
+                    transformation_matrix=transformation_matrix
+                )
+            )
+            triangular_meshes[element.GlobalId] = triangular_mesh
+            if cache is not None:
+                cache.save(
+                    key=keys_of_elements_to_tessellate[element.GlobalId],
+                    triangular_mesh=triangular_mesh,
+                )
 
-        # Calculate the vectors
-        vec1 = tuple(np.array(p2) - np.array(p1))
-        vec2 = tuple(np.array(p3) - np.array(p1))
+        if len(elements_to_iterate) == 0:
+            return triangular_meshes
 
-        # Compute the cross product of vec1 and vec2
-        cross_product = calculate_cross_product_of_two_vectors(
-            vector1=vec1,
-            vector2=vec2,
-            unit_normalize=False,
+        iterator = ifcopenshell.geom.iterator(
+            get_settings_for_tessellation(),
+            ifc_file,
+            number_of_threads if number_of_threads else multiprocessing.cpu_count(),
+            include=elements_to_iterate,
         )
+        if iterator.initialize():
+            while True:
+                shape = iterator.get()
+                triangular_mesh = cls(
+                    verts=shape.geometry.verts,
+                    faces=shape.geometry.faces,
+                )
+                triangular_meshes[shape.guid] = triangular_mesh
+                if cache is not None:
+                    cache.save(
+                        key=keys_of_elements_to_tessellate[shape.guid],
+                        triangular_mesh=triangular_mesh,
+                    )
+                if not iterator.next():
+                    break
 
-        # Calculate the area of the triangle
-        area = float(0.5 * np.linalg.norm(cross_product))
-
-        return area
+        return triangular_meshes
 
-    def calculate_normal_vector_of_face(
+    def transform_with_matrix(
         self,
-        face_index: int,
-    ) -> tuple[float, float, float]:
+        transformation_matrix: np.ndarray,
+    ) -> "TriangularMesh":
+        """Copy of the mesh with its verts transformed by a 4x4 matrix. The faces
+        are shared with the original mesh"""
+
+        triangular_mesh = TriangularMesh(
+            verts=self.verts @ transformation_matrix[:3, :3].T
+            + transformation_matrix[:3, 3],
+            faces=self.faces,
+        )
 
-        face = self.faces[face_index]
+        return triangular_mesh
 
-        p1 = self.verts[face[0]]
-        p2 = self.verts[face[1]]
-        p3 = self.verts[face[2]]
+    def calculate_area_of_face(
+        self,
+        face_index: int,
+    ) -> float:
 
-        # Calculate the vectors
-        vec1 = tuple(np.array(p2) - np.array(p1))
-        vec2 = tuple(np.array(p3) - np.array(p1))
+        return float(self.calculate_areas_of_faces()[face_index])
 
-        # Compute the normalized cross product of vec1 and vec2
-        normal_vector = calculate_cross_product_of_two_vectors(
-            vector1=vec1,
-            vector2=vec2,
-            unit_normalize=True,
-        )
+    def calculate_normal_vector_of_face(
+        self,
+        face_index: int,
+    ) -> tuple[float, float, float]:
 
-        return normal_vector
+        return tuple(self.calculate_normal_vectors_of_faces()[face_index].tolist())
 
     def get_edges_of_face(self, index_of_face: int) -> list[tuple[int, int]]:
-        face = self.faces[index_of_face]
+        face = self.faces[index_of_face].tolist()
 
         edges = [
             (face[0], face[1]),
@@ -243,52 +568,120 @@ class TriangularMesh:
         self,
         indices_of_contiguous_planar_faces: list[int],
     ) -> list[tuple[int, int]]:
+        """Get the edges of the faces that are not shared with a reversed twin,
+        in the order of the faces. Each edge is paired with the earliest unpaired
+        reversed twin before it, counted in a hash map, so this is O(E)"""
+
+        # Edge -> positions of edges waiting for their reversed twin
+        positions_of_unpaired_edges = {}
+        boundary_edges_by_position = {}
+        edges = [
+            (int(index_of_start_vertex), int(index_of_end_vertex))
+            for face in self.faces[
+                np.asarray(indices_of_contiguous_planar_faces, dtype=np.intp)
+            ].tolist()
+            for index_of_start_vertex, index_of_end_vertex in (
+                (face[0], face[1]),
+                (face[1], face[2]),
+                (face[2], face[0]),
+            )
+        ]
+        for position, edge in enumerate(edges):
+            positions_of_reversed_twins = positions_of_unpaired_edges.get(edge[::-1])
+            if positions_of_reversed_twins:
+                del boundary_edges_by_position[positions_of_reversed_twins.pop(0)]
+                continue
+            positions_of_unpaired_edges.setdefault(edge, []).append(position)
+            boundary_edges_by_position[position] = edge
 
-        basket_for_boundary_edges = []
+        return list(boundary_edges_by_position.values())
 
-        basket_for_uncategorized_edges = []
-        for index_of_face in indices_of_contiguous_planar_faces:
-            edges_of_face = self.get_edges_of_face(index_of_face=index_of_face)
-            basket_for_uncategorized_edges += edges_of_face
+    def get_loops_from_boundary_edges(
+        self,
+        boundary_edges: list[tuple[int, int]],
+    ) -> list[list[int]]:
+        """Chain boundary edges into closed loops of vertex indices. Loops that
+        touch at a vertex are split there into separate loops. The first loop is
+        the outer boundary (the loop enclosing the largest area), followed by the
+        holes in the order they were closed. Raises ValueError if some edges do
+        not close a loop"""
+
+        # Start vertex -> boundary edges starting at it
+        indices_of_edges_of_start_vertices = {}
+        for index_of_edge, (index_of_start_vertex, _) in enumerate(boundary_edges):
+            indices_of_edges_of_start_vertices.setdefault(
+                index_of_start_vertex, []
+            ).append(index_of_edge)
+
+        loops = []
+        edge_is_used = [False] * len(boundary_edges)
+        for index_of_first_edge, (index_of_first_vertex, _) in enumerate(
+            boundary_edges
+        ):
+            if edge_is_used[index_of_first_edge]:
+                continue
+
+            # Walk along unused edges. A vertex visited twice closes the loop
+            # walked since its first visit
+            path = [index_of_first_vertex]
+            positions_of_vertices_in_path = {index_of_first_vertex: 0}
+            index_of_edge = index_of_first_edge
+            while True:
+                edge_is_used[index_of_edge] = True
+                index_of_end_vertex = boundary_edges[index_of_edge][1]
+                position = positions_of_vertices_in_path.get(index_of_end_vertex)
+                if position is None:
+                    positions_of_vertices_in_path[index_of_end_vertex] = len(path)
+                    path.append(index_of_end_vertex)
+                else:
+                    loops.append(path[position:])
+                    for index_of_vertex in path[position + 1 :]:
+                        del positions_of_vertices_in_path[index_of_vertex]
+                    del path[position + 1 :]
+                    if len(path) == 1:
+                        break
+                index_of_edge = next(
+                    (
+                        index_of_next_edge
+                        for index_of_next_edge in indices_of_edges_of_start_vertices.get(
+                            path[-1], []
+                        )
+                        if not edge_is_used[index_of_next_edge]
+                    ),
+                    None,
+                )
+                if index_of_edge is None:
+                    raise ValueError(
+                        f"Boundary edges do not close a loop at vertex {path[-1]}."
+                    )
 
-        cycle_number = 0
-        while True:
-            if len(basket_for_uncategorized_edges) == 1:
-                basket_for_boundary_edges.append(basket_for_uncategorized_edges[0])
-                basket_for_uncategorized_edges.pop(0)
-            if len(basket_for_uncategorized_edges) == 0:
-                break
-            cycle_number += 1
-            if cycle_number == 10000:
-                exit("Problem!")
-            edge_under_consideration = basket_for_uncategorized_edges[0]
-            basket_for_uncategorized_edges.pop(0)
-            edge_is_unique = True
-            for index_of_other_edge, other_edge in enumerate(
-                basket_for_uncategorized_edges
-            ):
-                if edge_under_consideration == other_edge[::-1]:
-                    edge_is_unique = False
-                    basket_for_uncategorized_edges.pop(index_of_other_edge)
-                    break
-            if edge_is_unique:
-                basket_for_boundary_edges.append(edge_under_consideration)
+        if len(loops) == 0:
+            return loops
+
+        # Move the loop enclosing the largest area (Newell's method) to the front
+        areas_of_loops = [
+            np.linalg.norm(
+                np.cross(self.verts[loop], self.verts[np.roll(loop, -1)]).sum(axis=0)
+            )
+            for loop in loops
+        ]
+        loops.insert(0, loops.pop(int(np.argmax(areas_of_loops))))
 
-        return basket_for_boundary_edges
+        return loops
 
     def get_longest_edge_from_given_edges(
         self,
         edges: list[tuple[int, int]],
     ) -> tuple[int, int]:
 
-        lengths_of_edges = []
-        for edge in edges:
-            p1 = self.verts[edge[0]]
-            p2 = self.verts[edge[1]]
-            length_of_edge = float(np.linalg.norm(np.array(p2) - np.array(p1)))
-            lengths_of_edges.append(length_of_edge)
+        indices_of_vertices_of_edges = np.array(edges, dtype=np.int32).reshape(-1, 2)
+        lengths_of_edges = np.linalg.norm(
+            self.verts[indices_of_vertices_of_edges[:, 1]]
+            - self.verts[indices_of_vertices_of_edges[:, 0]],
+            axis=1,
+        )
 
-        index_of_longest_edge = lengths_of_edges.index(max(lengths_of_edges))
+        index_of_longest_edge = int(np.argmax(lengths_of_edges))
         longest_edge = edges[index_of_longest_edge]
 
         return longest_edge
@@ -298,8 +691,8 @@ class TriangularMesh:
         edge: tuple[int, int],
     ) -> tuple[float, float, float]:
 
-        p1 = self.verts[edge[0]]
-        p2 = self.verts[edge[1]]
+        p1 = tuple(self.verts[edge[0]].tolist())
+        p2 = tuple(self.verts[edge[1]].tolist())
 
         return calculate_unit_direction_vector_between_two_points(p1=p1, p2=p2)
 
@@ -309,14 +702,10 @@ class TriangularMesh:
     ) -> list[list[tuple[float, float, float]]]:
 
         faces_as_tuples_with_coordinates = [
-            [
-                self.verts[face[0]],
-                self.verts[face[1]],
-                self.verts[face[2]],
-            ]
-            for face in [
-                self.faces[index_of_face] for index_of_face in indices_of_faces
-            ]
+            [tuple(point) for point in coordinates_of_face]
+            for coordinates_of_face in self.get_coordinates_of_all_faces()[
+                np.asarray(indices_of_faces, dtype=np.intp)
+            ].tolist()
         ]
 
         return faces_as_tuples_with_coordinates
@@ -429,6 +818,135 @@ class TriangularMesh:
         plt.show()
 
 
+class TriangularMeshCache:
+    """Content-addressed on-disk cache of the verts/faces of TriangularMeshes.
+
+    Entries are keyed by a hash of the element's ProductDefinitionShape, its
+    ObjectPlacement, and the representations and placements of its openings,
+    with entity ids replaced by their order of traversal. Entries are stored as
+    .npz files (float64 verts, int32 faces). When the total size exceeds
+    max_size_in_bytes, the least recently used entries (by modification time,
+    which is refreshed on every hit) are evicted."""
+
+    # Bump to invalidate all entries, e.g., when the tessellation settings change
+    VERSION = 1
+
+    def __init__(
+        self,
+        directory: str,
+        max_size_in_bytes: int = 1024**3,
+    ):
+        self.directory = directory
+        self.max_size_in_bytes = max_size_in_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self.size_in_bytes = sum(
+            entry.stat().st_size for entry in self._get_entries_of_directory()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def calculate_key_of_element(
+        self,
+        element: ifcopenshell.entity_instance,
+    ) -> str:
+
+        ifc_file = element.file
+
+        roots = [element.Representation, element.ObjectPlacement]
+        for rel_voids_element in getattr(element, "HasOpenings", None) or []:
+            opening_element = rel_voids_element.RelatedOpeningElement
+            roots += [opening_element.Representation, opening_element.ObjectPlacement]
+
+        hash_object = hashlib.sha256()
+        hash_object.update(
+            "|".join(
+                [
+                    str(self.VERSION),
+                    ifcopenshell.version,
+                    ifc_file.schema,
+                    repr(ifcopenshell.util.unit.calculate_unit_scale(ifc_file)),
+                ]
+            ).encode()
+        )
+        inlbim.util.file.update_hash_with_entity_graphs(
+            hash_object=hash_object,
+            roots=roots,
+        )
+
+        return hash_object.hexdigest()
+
+    def load(
+        self,
+        key: str,
+    ) -> TriangularMesh | None:
+
+        path = os.path.join(self.directory, f"{key}.npz")
+        try:
+            with np.load(path) as arrays:
+                verts, faces = arrays["verts"], arrays["faces"]
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+
+        return TriangularMesh(
+            verts=verts,
+            faces=faces,
+        )
+
+    def save(
+        self,
+        key: str,
+        triangular_mesh: TriangularMesh,
+    ):
+
+        # Write to a temporary file first so that readers never see partial files
+        path = os.path.join(self.directory, f"{key}.npz")
+        try:
+            size_of_replaced_entry = os.path.getsize(path)
+        except OSError:
+            size_of_replaced_entry = 0
+        path_of_temporary_file = f"{path}.{os.getpid()}.tmp"
+        with open(path_of_temporary_file, "wb") as temporary_file:
+            np.savez(
+                temporary_file,
+                verts=triangular_mesh.verts,
+                faces=triangular_mesh.faces,
+            )
+        os.replace(path_of_temporary_file, path)
+        self.size_in_bytes += os.path.getsize(path) - size_of_replaced_entry
+
+        if self.size_in_bytes > self.max_size_in_bytes:
+            self.evict_least_recently_used_entries()
+
+    def evict_least_recently_used_entries(self):
+
+        entries = sorted(
+            self._get_entries_of_directory(),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        self.size_in_bytes = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if self.size_in_bytes <= self.max_size_in_bytes:
+                break
+            try:
+                size_of_entry = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self.size_in_bytes -= size_of_entry
+
+    def _get_entries_of_directory(self) -> list[os.DirEntry]:
+
+        with os.scandir(self.directory) as iterator:
+            return [
+                entry
+                for entry in iterator
+                if entry.is_file() and entry.name.endswith(".npz")
+            ]
+
+
 def get_bounding_box_of_element(
     element: ifcopenshell.entity_instance,
 ) -> tuple[list[float], list[float]]:
@@ -791,6 +1309,110 @@ def calculate_endpoint_coordinates_of_shortest_line_connecting_two_lines(
     )
 
 
+def calculate_dot_products_of_rows(
+    vectors_1: np.ndarray,
+    vectors_2: np.ndarray,
+) -> np.ndarray:
+    """Dot products of corresponding rows of (..., 3) arrays. Rows are multiplied
+    with matmul, which rounds like np.dot() does for a single pair of vectors"""
+
+    return np.matmul(
+        vectors_1[..., np.newaxis, :],
+        vectors_2[..., :, np.newaxis],
+    )[..., 0, 0]
+
+
+def calculate_norms_of_rows(vectors: np.ndarray) -> np.ndarray:
+    """Euclidean norms of the rows of a (..., 3) array, rounded like
+    np.linalg.norm() of each row"""
+
+    return np.sqrt(calculate_dot_products_of_rows(vectors, vectors))
+
+
+def calculate_shortest_lines_connecting_pairs_of_segments(
+    segments_1: np.ndarray,
+    segments_2: np.ndarray,
+    indices_of_pairs: np.ndarray | list[tuple[int, int]] | None = None,
+    assume_segments_1_are_finite: bool = True,
+    assume_segments_2_are_finite: bool = True,
+) -> dict[str, np.ndarray]:
+    """Vectorized calculate_endpoint_coordinates_of_shortest_line_connecting_two_lines()
+    for pairs of segments given as (N, 2, 3) and (M, 2, 3) arrays of start and
+    end points. The pairs are the (K, 2) indices_of_pairs into segments_1 and
+    segments_2, or all N x M pairs (row-major) if None. Returns a dictionary with
+    the (K, 2) indices_of_pairs, the (K, 3) start_points (on segments_1) and
+    end_points (on segments_2) of the connecting lines, their (K,) distances,
+    the (K,) parameters_1 and parameters_2 (distances along the segments from
+    their start points), and the (K,) are_parallel flags. Values of parallel
+    pairs are NaN. Results agree with the single pair version up to rounding"""
+
+    segments_1 = np.asarray(segments_1, dtype=float).reshape(-1, 2, 3)
+    segments_2 = np.asarray(segments_2, dtype=float).reshape(-1, 2, 3)
+    if indices_of_pairs is None:
+        indices_of_pairs = np.stack(
+            np.meshgrid(
+                np.arange(len(segments_1)), np.arange(len(segments_2)), indexing="ij"
+            ),
+            axis=-1,
+        )
+    indices_of_pairs = np.asarray(indices_of_pairs, dtype=np.int64).reshape(-1, 2)
+
+    # Get coordinates of start and end points of lines 1 and 2
+    p_i = segments_1[indices_of_pairs[:, 0], 0]
+    p_j = segments_1[indices_of_pairs[:, 0], 1]
+    q_i = segments_2[indices_of_pairs[:, 1], 0]
+    q_j = segments_2[indices_of_pairs[:, 1], 1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        # Calculate unit vectors
+        lengths_1 = calculate_norms_of_rows(p_j - p_i)
+        lengths_2 = calculate_norms_of_rows(q_j - q_i)
+        p_hat = (p_j - p_i) * 1 / lengths_1[:, np.newaxis]
+        q_hat = (q_j - q_i) * 1 / lengths_2[:, np.newaxis]
+
+        # Calculate the denominators and determine which pairs are parallel
+        dot_products_of_p_hat_and_q_hat = calculate_dot_products_of_rows(p_hat, q_hat)
+        denominators = dot_products_of_p_hat_and_q_hat**2 - 1
+        are_parallel = 0.0 == np.round(denominators, 4)
+
+        # Calculate the numerators and the parameters t_p and t_q
+        numerators_for_t_p = calculate_dot_products_of_rows(p_hat, p_i - q_i) - (
+            dot_products_of_p_hat_and_q_hat
+            * calculate_dot_products_of_rows(q_hat, p_i - q_i)
+        )
+        numerators_for_t_q = calculate_dot_products_of_rows(-q_hat, p_i - q_i) + (
+            dot_products_of_p_hat_and_q_hat
+            * calculate_dot_products_of_rows(p_hat, p_i - q_i)
+        )
+        parameters_1 = numerators_for_t_p / denominators
+        parameters_2 = numerators_for_t_q / denominators
+
+    # Clamp the parameters of finite segments
+    if assume_segments_1_are_finite:
+        parameters_1 = np.where(parameters_1 < 0, 0.0, parameters_1)
+        parameters_1 = np.where(parameters_1 > lengths_1, lengths_1, parameters_1)
+    if assume_segments_2_are_finite:
+        parameters_2 = np.where(parameters_2 < 0, 0.0, parameters_2)
+        parameters_2 = np.where(parameters_2 > lengths_2, lengths_2, parameters_2)
+    parameters_1[are_parallel] = np.nan
+    parameters_2[are_parallel] = np.nan
+
+    # Calculate the coordinates of the endpoints of the connecting lines
+    start_points = p_i + parameters_1[:, np.newaxis] * p_hat
+    end_points = q_i + parameters_2[:, np.newaxis] * q_hat
+
+    return {
+        "indices_of_pairs": indices_of_pairs,
+        "start_points": start_points,
+        "end_points": end_points,
+        "distances": calculate_norms_of_rows(end_points - start_points),
+        "parameters_1": parameters_1,
+        "parameters_2": parameters_2,
+        "are_parallel": are_parallel,
+    }
+
+
 def calculate_coordinates_of_point_projected_onto_line(
     point: tuple[float, float, float],
     start_point_of_line: tuple[float, float, float],
@@ -831,6 +1453,38 @@ def calculate_coordinates_of_point_projected_onto_line(
     return projected_point
 
 
+def calculate_coordinates_of_points_projected_onto_line(
+    points: np.ndarray,
+    start_point_of_line: np.ndarray | tuple[float, float, float],
+    end_point_of_line: np.ndarray | tuple[float, float, float],
+    assume_line_is_finite: bool = False,
+) -> np.ndarray:
+    """Vectorized calculate_coordinates_of_point_projected_onto_line() for an
+    (N, 3) array of points. Rounds like the scalar function for each point"""
+
+    # Get vectors of coordinates
+    p = np.asarray(points, dtype=float).reshape(-1, 3)
+    q_i = np.asarray(start_point_of_line, dtype=float)
+    q_j = np.asarray(end_point_of_line, dtype=float)
+
+    # Get unit vector of line
+    line_length = np.linalg.norm(q_j - q_i)
+    q_hat = (q_j - q_i) * 1 / line_length
+
+    # Get constants t
+    t = calculate_dot_products_of_rows(p - q_i, q_hat[np.newaxis, :])
+
+    # If the line is assumed to be finite, then adjust the constants t
+    if assume_line_is_finite:
+        t = np.where(t < 0, 0.0, t)
+        t = np.where(t > line_length, line_length, t)
+
+    # Calculate projected coordinates of points
+    p_star = q_i + t[:, np.newaxis] * q_hat
+
+    return p_star
+
+
 def barycentric_coords(
     p: np.ndarray,
     a: np.ndarray,
@@ -1204,6 +1858,93 @@ def aabb_overlap_3d(
     return bool(np.all(overlap_axes)), sep
 
 
+def get_indices_of_overlapping_aabbs(
+    mins_of_query_boxes: np.ndarray,
+    maxs_of_query_boxes: np.ndarray,
+    mins_of_boxes: np.ndarray,
+    maxs_of_boxes: np.ndarray,
+    cell_size: float | None = None,
+    max_number_of_cells_per_box: int = 64,
+) -> list[list[int]]:
+    """For each query box, get the sorted indices of the boxes that overlap it
+    (touching counts as overlap). Boxes are given as (N, 3) arrays of min and max
+    corners. The boxes are hashed into a uniform grid, whose cell size defaults
+    to the 90th percentile of their largest extents, so that only the boxes
+    sharing a cell with a query box are tested. Boxes (and query boxes) that
+    would cover more than max_number_of_cells_per_box cells, such as long
+    members, are not hashed but tested against every query box (or box)"""
+
+    mins_of_query_boxes = np.asarray(mins_of_query_boxes, dtype=float).reshape(-1, 3)
+    maxs_of_query_boxes = np.asarray(maxs_of_query_boxes, dtype=float).reshape(-1, 3)
+    mins_of_boxes = np.asarray(mins_of_boxes, dtype=float).reshape(-1, 3)
+    maxs_of_boxes = np.asarray(maxs_of_boxes, dtype=float).reshape(-1, 3)
+    if len(mins_of_boxes) == 0:
+        return [[] for _ in range(len(mins_of_query_boxes))]
+
+    if cell_size is None:
+        cell_size = float(
+            np.percentile((maxs_of_boxes - mins_of_boxes).max(axis=1), 90.0)
+        )
+    if not cell_size > 0.0:
+        cell_size = 1.0
+
+    # Hash boxes into the cells they cover, except for those covering too many
+    lower_cells_of_boxes = np.floor(mins_of_boxes / cell_size).astype(np.int64)
+    upper_cells_of_boxes = np.floor(maxs_of_boxes / cell_size).astype(np.int64)
+    numbers_of_cells_of_boxes = np.prod(
+        upper_cells_of_boxes - lower_cells_of_boxes + 1, axis=1
+    )
+    indices_of_large_boxes = set(
+        np.flatnonzero(numbers_of_cells_of_boxes > max_number_of_cells_per_box).tolist()
+    )
+    indices_of_boxes_of_cells = {}
+    for index_of_box, (lower_cell, upper_cell) in enumerate(
+        zip(lower_cells_of_boxes.tolist(), upper_cells_of_boxes.tolist())
+    ):
+        if index_of_box in indices_of_large_boxes:
+            continue
+        for i in range(lower_cell[0], upper_cell[0] + 1):
+            for j in range(lower_cell[1], upper_cell[1] + 1):
+                for k in range(lower_cell[2], upper_cell[2] + 1):
+                    indices_of_boxes_of_cells.setdefault((i, j, k), []).append(
+                        index_of_box
+                    )
+
+    # Test the boxes sharing a cell with each query box (or all boxes, if the
+    # query box covers too many cells)
+    indices_of_all_boxes = np.arange(len(mins_of_boxes), dtype=np.int64)
+    indices_of_overlapping_boxes = []
+    for min_of_query_box, max_of_query_box, lower_cell, upper_cell in zip(
+        mins_of_query_boxes,
+        maxs_of_query_boxes,
+        np.floor(mins_of_query_boxes / cell_size).astype(np.int64).tolist(),
+        np.floor(maxs_of_query_boxes / cell_size).astype(np.int64).tolist(),
+    ):
+        number_of_cells = (
+            (upper_cell[0] - lower_cell[0] + 1)
+            * (upper_cell[1] - lower_cell[1] + 1)
+            * (upper_cell[2] - lower_cell[2] + 1)
+        )
+        if number_of_cells > max_number_of_cells_per_box:
+            candidates = indices_of_all_boxes
+        else:
+            candidates = set(indices_of_large_boxes)
+            for i in range(lower_cell[0], upper_cell[0] + 1):
+                for j in range(lower_cell[1], upper_cell[1] + 1):
+                    for k in range(lower_cell[2], upper_cell[2] + 1):
+                        candidates.update(indices_of_boxes_of_cells.get((i, j, k), []))
+            candidates = np.array(sorted(candidates), dtype=np.int64)
+        if len(candidates) == 0:
+            indices_of_overlapping_boxes.append([])
+            continue
+        overlaps = np.all(mins_of_boxes[candidates] <= max_of_query_box, axis=1) & (
+            np.all(maxs_of_boxes[candidates] >= min_of_query_box, axis=1)
+        )
+        indices_of_overlapping_boxes.append(candidates[overlaps].tolist())
+
+    return indices_of_overlapping_boxes
+
+
 # --- Optional helper: build AABB from a set of 3D points (e.g., triangle vertices) ---
 def aabb_from_points(
     points: list[tuple[float, float, float]],
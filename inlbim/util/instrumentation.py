@@ -0,0 +1,161 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+"""Structured instrumentation of conversion runs. Timing spans (per stage and
+per element), counters, and messages are emitted as events (plain dictionaries)
+to a pluggable sink: SilentSink (default), PrintSink, LoggingSink, or
+JsonLinesSink. Detailed messages are only emitted if verbose is True. Spans and
+counters are aggregated in a summary table of where the time went."""
+
+import contextlib
+import json
+import logging
+import time
+from typing import Iterator, TextIO
+
+
+class SilentSink:
+    """Drop all events"""
+
+    def emit(self, event: dict):
+        pass
+
+
+class PrintSink:
+    """Print messages, warnings, and the summary table to stdout. Spans are not
+    printed"""
+
+    def emit(self, event: dict):
+
+        if event["event"] in ["message", "warning", "summary"]:
+            print(event["text"])
+
+
+class LoggingSink:
+    """Log messages and spans at DEBUG, warnings at WARNING, and the summary
+    table at INFO"""
+
+    def __init__(self, logger: logging.Logger | None = None):
+        self.logger = logger if logger else logging.getLogger("bim2fem")
+
+    def emit(self, event: dict):
+
+        if event["event"] == "message":
+            self.logger.debug(event["text"])
+        elif event["event"] == "warning":
+            self.logger.warning(event["text"])
+        elif event["event"] == "summary":
+            self.logger.info(event["text"])
+        elif event["event"] == "span":
+            self.logger.debug(
+                "%s took %.6f s %s",
+                event["name"],
+                event["duration"],
+                event["attributes"],
+            )
+
+
+class JsonLinesSink:
+    """Write each event as one line of JSON. Values that are not serializable
+    (e.g., entity instances) are written as strings"""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def emit(self, event: dict):
+
+        self.stream.write(json.dumps(event, default=str) + "\n")
+
+
+class Instrumentation:
+    def __init__(
+        self,
+        sink: SilentSink | PrintSink | LoggingSink | JsonLinesSink | None = None,
+        verbose: bool = False,
+    ):
+        self.sink = sink if sink else SilentSink()
+        self.verbose = verbose
+        # Name of span -> {"depth", "count", "duration"}, in order of first start
+        self.spans = {}
+        self.counters = {}
+        self.depth = 0
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes) -> Iterator[None]:
+        """Time the enclosed block. Spans with the same name are aggregated"""
+
+        span = self.spans.setdefault(
+            name, {"depth": self.depth, "count": 0, "duration": 0.0}
+        )
+        self.depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.depth -= 1
+            span["count"] += 1
+            span["duration"] += duration
+            self.sink.emit(
+                {
+                    "event": "span",
+                    "name": name,
+                    "duration": duration,
+                    "attributes": attributes,
+                }
+            )
+
+    def increment(self, name: str, amount: int = 1):
+
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def message(self, text: str, **attributes):
+        """Emit a detailed message, only if verbose"""
+
+        if self.verbose:
+            self.sink.emit({"event": "message", "text": text, **attributes})
+
+    def warning(self, text: str, **attributes):
+
+        self.sink.emit({"event": "warning", "text": text, **attributes})
+
+    def get_summary_table(self) -> str:
+        """Table of the spans (indented by nesting) with their share of the time of
+        the outermost spans, followed by the counters"""
+
+        duration_of_outermost_spans = sum(
+            span["duration"] for span in self.spans.values() if span["depth"] == 0
+        )
+
+        lines = [
+            f"{'Span':52s} {'Count':>7s} {'Total (s)':>10s} "
+            + f"{'Mean (ms)':>10s} {'Share':>7s}"
+        ]
+        for name, span in self.spans.items():
+            mean = span["duration"] / span["count"] if span["count"] else 0.0
+            share = (
+                span["duration"] / duration_of_outermost_spans
+                if duration_of_outermost_spans
+                else 0.0
+            )
+            lines.append(
+                f"{'  ' * span['depth'] + name:52s} {span['count']:7d} "
+                + f"{span['duration']:10.4f} {mean * 1000:10.3f} {share:7.1%}"
+            )
+        if self.counters:
+            lines.append("")
+            lines.append(f"{'Counter':52s} {'Value':>7s}")
+            for name, value in self.counters.items():
+                lines.append(f"{name:52s} {value:7d}")
+
+        return "\n".join(lines)
+
+    def emit_summary(self):
+
+        self.sink.emit(
+            {
+                "event": "summary",
+                "text": self.get_summary_table(),
+                "spans": self.spans,
+                "counters": self.counters,
+            }
+        )
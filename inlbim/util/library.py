@@ -0,0 +1,157 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+"""Registry of the section and material property libraries. Each library is
+unpickled once per process, on first use. The returned dictionaries are shared
+by all callers and must not be modified."""
+
+import os
+import pickle
+from functools import lru_cache
+from inlbim import REGION
+
+PROPERTY_LIBRARIES_DIRECTORY = os.path.join(
+    os.path.dirname(__file__),
+    "..",
+    "property_libraries",
+)
+
+
+def get_section_libraries_of_region(region: REGION) -> list[str] | None:
+    """Get names of section libraries in the order they are searched"""
+
+    if region == "Europe":
+        return ["BSShapes2006", "Euro"]
+    elif region == "UnitedStates":
+        return ["AISC14", "SJIJoists"]
+    else:
+        return None
+
+
+def get_material_library_of_region(region: REGION) -> str | None:
+
+    if region == "Europe":
+        return "Europe"
+    elif region == "UnitedStates":
+        return "UnitedStates"
+    else:
+        return None
+
+
+@lru_cache(maxsize=None)
+def load_section_library(section_library: str) -> dict[str, dict[str, dict]]:
+    """Load section library as {category: {profile name: data}}"""
+
+    section_library_file_path = os.path.join(
+        PROPERTY_LIBRARIES_DIRECTORY,
+        "sections",
+        f"{section_library}.pkl",
+    )
+    with open(section_library_file_path, "rb") as file:
+        section_library_data = pickle.load(file)
+
+    return section_library_data
+
+
+@lru_cache(maxsize=None)
+def load_material_library(
+    material_library: str,
+) -> dict[str, dict[str, dict[str, dict]]]:
+    """Load material library as {standard: {category: {material name: data}}}"""
+
+    material_library_file_path = os.path.join(
+        PROPERTY_LIBRARIES_DIRECTORY,
+        "materials",
+        f"MaterialLibrary{material_library}.pkl",
+    )
+    with open(material_library_file_path, "rb") as file:
+        material_library_data = pickle.load(file)
+
+    return material_library_data
+
+
+@lru_cache(maxsize=None)
+def get_index_of_standard_profiles(region: REGION) -> dict[str, tuple[str, dict]]:
+    """Map each profile name of the region's section libraries to its category
+    and data. If a name appears more than once, the first one in library and
+    category order wins"""
+
+    index_of_standard_profiles = {}
+
+    section_libraries = get_section_libraries_of_region(region=region)
+    if section_libraries is None:
+        return index_of_standard_profiles
+
+    for section_library in section_libraries:
+        section_library_data = load_section_library(section_library=section_library)
+        for (
+            section_category_label,
+            section_category_dictionary,
+        ) in section_library_data.items():
+            for (
+                profile_name,
+                section_data_dictionary,
+            ) in section_category_dictionary.items():
+                if not section_data_dictionary:
+                    continue
+                index_of_standard_profiles.setdefault(
+                    profile_name, (section_category_label, section_data_dictionary)
+                )
+
+    return index_of_standard_profiles
+
+
+@lru_cache(maxsize=None)
+def get_index_of_standard_materials(region: REGION) -> dict[str, tuple[str, dict]]:
+    """Map each material name of the region's material library to its category
+    and data. If a name appears more than once, the first one in standard and
+    category order wins"""
+
+    index_of_standard_materials = {}
+
+    material_library = get_material_library_of_region(region=region)
+    if material_library is None:
+        return index_of_standard_materials
+
+    material_library_data = load_material_library(material_library=material_library)
+    for standard_data_dictionary in material_library_data.values():
+        for (
+            material_category,
+            material_category_dictionary,
+        ) in standard_data_dictionary.items():
+            for (
+                material_name,
+                material_data_dictionary,
+            ) in material_category_dictionary.items():
+                if not material_data_dictionary:
+                    continue
+                index_of_standard_materials.setdefault(
+                    material_name, (material_category, material_data_dictionary)
+                )
+
+    return index_of_standard_materials
+
+
+class ResolutionCache:
+    """Memo of standard profile and material names resolved from the libraries
+    for the metadata of elements during a conversion run. Keys are normalized
+    metadata signatures (e.g., the GlobalId of the element's type, the candidate
+    strings, and the region), so instances sharing a type and identical strings
+    resolve once. Matches against the names already in the destination file are
+    not memoized."""
+
+    def __init__(self):
+        self.resolutions = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, key: tuple) -> tuple[bool, str | None]:
+        """Returns (True, name) on a hit and (False, None) on a miss"""
+
+        if key not in self.resolutions:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, self.resolutions[key]
+
+    def save(self, key: tuple, name: str | None):
+        self.resolutions[key] = name
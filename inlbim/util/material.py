@@ -1,11 +1,11 @@
 # Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
 
 import ifcopenshell
-import os
-import pickle
-from inlbim.util.profile import best_fuzzy_match
+from inlbim.util.profile import best_fuzzy_match, FuzzyMatchIndex
+from functools import lru_cache
 from inlbim import REGION
 import ifcopenshell.util.element
+import inlbim.util.library
 
 
 def sum_material_layer_thicknesses(
@@ -18,17 +18,40 @@ def sum_material_layer_thicknesses(
     return sum(thicknesses)
 
 
+@lru_cache(maxsize=None)
+def get_fuzzy_match_indexes_of_standard_materials(
+    region: REGION,
+) -> list[FuzzyMatchIndex]:
+    """Get FuzzyMatchIndexes of the material categories of the region's library,
+    in the order they are searched"""
+
+    fuzzy_match_indexes = []
+
+    material_library = inlbim.util.library.get_material_library_of_region(region=region)
+    if material_library is None:
+        return fuzzy_match_indexes
+
+    material_library_data = inlbim.util.library.load_material_library(
+        material_library=material_library
+    )
+    for standard_data_dictionary in material_library_data.values():
+        for material_data_dictionary in standard_data_dictionary.values():
+            fuzzy_match_indexes.append(
+                FuzzyMatchIndex(strings=list(material_data_dictionary.keys()))
+            )
+
+    return fuzzy_match_indexes
+
+
 def get_best_matching_standard_material_from_element_metadata(
     element: ifcopenshell.entity_instance,
     region: REGION,
     other_material_names: list[str] = [],
+    resolution_cache: inlbim.util.library.ResolutionCache | None = None,
 ) -> str | None:
 
-    if region == "Europe":
-        material_library = "Europe"
-    elif region == "UnitedStates":
-        material_library = "UnitedStates"
-    else:
+    material_library = inlbim.util.library.get_material_library_of_region(region=region)
+    if material_library is None:
         return None
 
     strings_that_might_contain_material_information = []
@@ -69,6 +92,15 @@ def get_best_matching_standard_material_from_element_metadata(
             material_in_file_for_product.Name.replace(" - ", ":").split(":")
         )
 
+    if resolution_cache is None:
+        return get_best_matching_standard_material_from_strings(
+            strings_that_might_contain_material_information=strings_that_might_contain_material_information,
+            region=region,
+            other_material_names=other_material_names,
+        )
+
+    # Names already in the destination file change as it grows, so they are
+    # matched for each element
     best_matching_standard_material_name_from_given_list = best_fuzzy_match(
         strings_matched_to=strings_that_might_contain_material_information,
         strings_matching=other_material_names,
@@ -77,25 +109,64 @@ def get_best_matching_standard_material_from_element_metadata(
     if isinstance(best_matching_standard_material_name_from_given_list, str):
         return best_matching_standard_material_name_from_given_list
 
-    best_matching_standard_material_name_from_library = None
-    material_library_file_path = os.path.join(
-        os.path.dirname(__file__),
-        "..",
-        "property_libraries",
-        "materials",
-        f"MaterialLibrary{material_library}.pkl",
+    # Resolve from the library once per metadata signature
+    element_type = ifcopenshell.util.element.get_type(element=element)
+    resolution_key = (
+        "material",
+        element_type.GlobalId if element_type else None,
+        tuple(strings_that_might_contain_material_information),
+        region,
     )
-    with open(material_library_file_path, "rb") as file:
-        material_library_data = pickle.load(file)
-    for standard_data_dictionary in material_library_data.values():
-        for material_data_dictionary in standard_data_dictionary.values():
-            best_matching_standard_material_name_from_library = best_fuzzy_match(
+    is_hit, best_matching_standard_material_name = resolution_cache.load(
+        key=resolution_key
+    )
+    if not is_hit:
+        best_matching_standard_material_name = get_best_matching_standard_material_from_library(
+            strings_that_might_contain_material_information=strings_that_might_contain_material_information,
+            region=region,
+        )
+        resolution_cache.save(
+            key=resolution_key, name=best_matching_standard_material_name
+        )
+
+    return best_matching_standard_material_name
+
+
+def get_best_matching_standard_material_from_strings(
+    strings_that_might_contain_material_information: list[str],
+    region: REGION,
+    other_material_names: list[str] = [],
+) -> str | None:
+
+    best_matching_standard_material_name_from_given_list = best_fuzzy_match(
+        strings_matched_to=strings_that_might_contain_material_information,
+        strings_matching=other_material_names,
+        threshold=0.80,
+    )
+    if isinstance(best_matching_standard_material_name_from_given_list, str):
+        return best_matching_standard_material_name_from_given_list
+
+    return get_best_matching_standard_material_from_library(
+        strings_that_might_contain_material_information=strings_that_might_contain_material_information,
+        region=region,
+    )
+
+
+def get_best_matching_standard_material_from_library(
+    strings_that_might_contain_material_information: list[str],
+    region: REGION,
+) -> str | None:
+
+    best_matching_standard_material_name_from_library = None
+    for fuzzy_match_index in get_fuzzy_match_indexes_of_standard_materials(
+        region=region
+    ):
+        best_matching_standard_material_name_from_library = (
+            fuzzy_match_index.best_fuzzy_match(
                 strings_matched_to=strings_that_might_contain_material_information,
-                strings_matching=list(material_data_dictionary.keys()),
                 threshold=0.50,
             )
-            if best_matching_standard_material_name_from_library:
-                break
+        )
         if best_matching_standard_material_name_from_library:
             break
 
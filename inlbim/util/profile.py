@@ -1,13 +1,14 @@
 # Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
 
 import ifcopenshell
-import pickle
-import os
 from inlbim import REGION
 from collections import Counter
 import re
 from difflib import SequenceMatcher
+from functools import lru_cache
 import ifcopenshell.util.element
+import numpy as np
+import inlbim.util.library
 
 
 def swap_strings(string_list: list[str], str1: str, str2: str):
@@ -97,17 +98,195 @@ def best_fuzzy_match(
     return best_match
 
 
+class FuzzyMatchIndex:
+    """Prebuilt index of strings for best_fuzzy_match, returning the same winners.
+
+    SequenceMatcher's ratio is 2*M/T, where the number of matching characters M
+    cannot exceed the number of characters shared by both strings (counted with
+    multiplicity). The index stores the character counts and lengths of the
+    cleaned strings, sorted by length, so each lookup only bounds the strings of
+    feasible length against the threshold, then scores pairs exactly in
+    descending order of their bound until the bound drops below the best ratio"""
+
+    ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+    def __init__(self, strings: list[str]):
+        # Unique strings, in their original order
+        self.strings = list(dict.fromkeys(strings))
+        self.cleaned_strings = [clean_string(s=s) for s in self.strings]
+        self.order_by_length = np.argsort(
+            [len(cleaned_string) for cleaned_string in self.cleaned_strings],
+            kind="stable",
+        )
+        self.sorted_lengths = np.array(
+            [len(self.cleaned_strings[i]) for i in self.order_by_length],
+            dtype=np.int64,
+        ).reshape(-1)
+        self.sorted_character_counts = np.array(
+            [
+                FuzzyMatchIndex.count_characters(s=self.cleaned_strings[i])
+                for i in self.order_by_length
+            ],
+            dtype=np.int64,
+        ).reshape(-1, len(FuzzyMatchIndex.ALPHABET))
+
+    @staticmethod
+    def count_characters(s: str) -> list[int]:
+        return [s.count(character) for character in FuzzyMatchIndex.ALPHABET]
+
+    def get_candidates_above_threshold(
+        self,
+        cleaned_string_matched_to: str,
+        threshold: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get indices of strings whose upper bound of ratio is at least the
+        threshold, and the upper bounds"""
+
+        # Strings of feasible length, 2*min(la, lb)/(la + lb) >= threshold
+        length = len(cleaned_string_matched_to)
+        minimum_length = np.floor(length * threshold / (2.0 - threshold))
+        maximum_length = np.ceil(length * (2.0 - threshold) / threshold)
+        start = np.searchsorted(self.sorted_lengths, minimum_length, side="left")
+        stop = np.searchsorted(self.sorted_lengths, maximum_length, side="right")
+
+        # Upper bounds of ratio (same arithmetic as SequenceMatcher.ratio)
+        shared_character_counts = np.minimum(
+            self.sorted_character_counts[start:stop],
+            FuzzyMatchIndex.count_characters(s=cleaned_string_matched_to),
+        ).sum(axis=1)
+        total_lengths = self.sorted_lengths[start:stop] + length
+        upper_bounds = np.ones(len(total_lengths))
+        np.divide(
+            2.0 * shared_character_counts,
+            total_lengths,
+            out=upper_bounds,
+            where=total_lengths > 0,
+        )
+
+        is_above_threshold = upper_bounds >= threshold
+        indices = self.order_by_length[start:stop][is_above_threshold]
+
+        return indices, upper_bounds[is_above_threshold]
+
+    def best_fuzzy_match(
+        self,
+        strings_matched_to: list[str],
+        threshold: float = 0.5,
+    ) -> str | None:
+
+        if threshold <= 0.0:
+            return best_fuzzy_match(
+                strings_matched_to=strings_matched_to,
+                strings_matching=self.strings,
+                threshold=threshold,
+            )
+
+        cleaned_strings_matched_to = [clean_string(s=s) for s in strings_matched_to]
+
+        # Shortlist pairs of strings by upper bound of ratio
+        indices_of_strings_matched_to = []
+        indices_of_strings_matching = []
+        upper_bounds = []
+        for i, cleaned_string_matched_to in enumerate(cleaned_strings_matched_to):
+            indices, upper_bounds_of_string = self.get_candidates_above_threshold(
+                cleaned_string_matched_to=cleaned_string_matched_to,
+                threshold=threshold,
+            )
+            indices_of_strings_matched_to += [i] * len(indices)
+            indices_of_strings_matching += indices.tolist()
+            upper_bounds += upper_bounds_of_string.tolist()
+
+        # Score pairs exactly, until no other pair can reach the highest ratio
+        highest_ratio = None
+        tied_candidates = set()
+        for k in np.argsort(-np.array(upper_bounds), kind="stable"):
+            if highest_ratio is not None and upper_bounds[k] < highest_ratio:
+                break
+            cleaned_string_matched_to = cleaned_strings_matched_to[
+                indices_of_strings_matched_to[k]
+            ]
+            j = indices_of_strings_matching[k]
+            ratio = SequenceMatcher(
+                None, cleaned_string_matched_to, self.cleaned_strings[j]
+            ).ratio()
+            if ratio < threshold:
+                continue
+            if highest_ratio is None or ratio > highest_ratio:
+                highest_ratio = ratio
+                tied_candidates = {j}
+            elif ratio == highest_ratio:
+                tied_candidates.add(j)
+
+        if len(tied_candidates) == 0:
+            return None
+        if len(tied_candidates) == 1:
+            return self.strings[tied_candidates.pop()]
+
+        # Break tie by shared character count
+        highest_scores = {
+            j: max(
+                shared_char_count(
+                    s1=cleaned_string_matched_to, s2=self.cleaned_strings[j]
+                )
+                for cleaned_string_matched_to in cleaned_strings_matched_to
+            )
+            for j in tied_candidates
+        }
+        highest_score = max(highest_scores.values())
+        tied_candidates = [
+            j for j, score in highest_scores.items() if score == highest_score
+        ]
+        if len(tied_candidates) > 1:
+            return None
+
+        return self.strings[tied_candidates[0]]
+
+
+@lru_cache(maxsize=None)
+def get_fuzzy_match_indexes_of_standard_profiles(
+    region: REGION,
+) -> list[FuzzyMatchIndex]:
+    """Get FuzzyMatchIndexes of the section categories of the region's libraries,
+    in the order they are searched"""
+
+    fuzzy_match_indexes = []
+
+    section_libraries = inlbim.util.library.get_section_libraries_of_region(
+        region=region
+    )
+    if section_libraries is None:
+        return fuzzy_match_indexes
+
+    for section_library in section_libraries:
+        section_library_data = inlbim.util.library.load_section_library(
+            section_library=section_library
+        )
+        section_category_labels = list(section_library_data.keys())
+        swap_strings(
+            string_list=section_category_labels,
+            str1="STEEL_TEE",
+            str2="STEEL_I_SECTION",
+        )
+        for section_category_label in section_category_labels:
+            section_category_dictionary = section_library_data[section_category_label]
+            fuzzy_match_indexes.append(
+                FuzzyMatchIndex(strings=list(section_category_dictionary.keys()))
+            )
+
+    return fuzzy_match_indexes
+
+
 def get_best_matching_standard_profile_from_element_metadata(
     element: ifcopenshell.entity_instance,
     region: REGION,
     other_standard_profile_names: list[str] = [],
+    resolution_cache: inlbim.util.library.ResolutionCache | None = None,
 ) -> str | None:
 
-    if region == "Europe":
-        section_libraries = ["BSShapes2006", "Euro"]
-    elif region == "UnitedStates":
-        section_libraries = ["AISC14", "SJIJoists"]
-    else:
+    section_libraries = inlbim.util.library.get_section_libraries_of_region(
+        region=region
+    )
+    if section_libraries is None:
         return None
 
     strings_that_might_contain_profile_information = []
@@ -139,6 +318,15 @@ def get_best_matching_standard_profile_from_element_metadata(
                     profile.ProfileName.replace(" - ", ":").split(":")
                 )
 
+    if resolution_cache is None:
+        return get_best_matching_standard_profile_from_strings(
+            strings_that_might_contain_profile_information=strings_that_might_contain_profile_information,
+            region=region,
+            other_standard_profile_names=other_standard_profile_names,
+        )
+
+    # Names already in the destination file change as it grows, so they are
+    # matched for each element
     best_matching_standard_profile_name_from_given_list = best_fuzzy_match(
         strings_matched_to=strings_that_might_contain_profile_information,
         strings_matching=other_standard_profile_names,
@@ -147,33 +335,63 @@ def get_best_matching_standard_profile_from_element_metadata(
     if isinstance(best_matching_standard_profile_name_from_given_list, str):
         return best_matching_standard_profile_name_from_given_list
 
-    best_matching_standard_profile_name_from_library = None
-    for section_library in section_libraries:
-        section_library_file_path = os.path.join(
-            os.path.dirname(__file__),
-            "..",
-            "property_libraries",
-            "sections",
-            f"{section_library}.pkl",
+    # Resolve from the library once per metadata signature
+    resolution_key = (
+        "profile",
+        element_type.GlobalId if element_type else None,
+        tuple(strings_that_might_contain_profile_information),
+        region,
+    )
+    is_hit, best_matching_standard_profile_name = resolution_cache.load(
+        key=resolution_key
+    )
+    if not is_hit:
+        best_matching_standard_profile_name = get_best_matching_standard_profile_from_library(
+            strings_that_might_contain_profile_information=strings_that_might_contain_profile_information,
+            region=region,
         )
-        with open(section_library_file_path, "rb") as file:
-            section_library_data = pickle.load(file)
-
-        section_category_labels = list(section_library_data.keys())
-        swap_strings(
-            string_list=section_category_labels,
-            str1="STEEL_TEE",
-            str2="STEEL_I_SECTION",
+        resolution_cache.save(
+            key=resolution_key, name=best_matching_standard_profile_name
         )
-        for section_category_label in section_category_labels:
-            section_category_dictionary = section_library_data[section_category_label]
-            best_matching_standard_profile_name_from_library = best_fuzzy_match(
+
+    return best_matching_standard_profile_name
+
+
+def get_best_matching_standard_profile_from_strings(
+    strings_that_might_contain_profile_information: list[str],
+    region: REGION,
+    other_standard_profile_names: list[str] = [],
+) -> str | None:
+
+    best_matching_standard_profile_name_from_given_list = best_fuzzy_match(
+        strings_matched_to=strings_that_might_contain_profile_information,
+        strings_matching=other_standard_profile_names,
+        threshold=0.90,
+    )
+    if isinstance(best_matching_standard_profile_name_from_given_list, str):
+        return best_matching_standard_profile_name_from_given_list
+
+    return get_best_matching_standard_profile_from_library(
+        strings_that_might_contain_profile_information=strings_that_might_contain_profile_information,
+        region=region,
+    )
+
+
+def get_best_matching_standard_profile_from_library(
+    strings_that_might_contain_profile_information: list[str],
+    region: REGION,
+) -> str | None:
+
+    best_matching_standard_profile_name_from_library = None
+    for fuzzy_match_index in get_fuzzy_match_indexes_of_standard_profiles(
+        region=region
+    ):
+        best_matching_standard_profile_name_from_library = (
+            fuzzy_match_index.best_fuzzy_match(
                 strings_matched_to=strings_that_might_contain_profile_information,
-                strings_matching=list(section_category_dictionary.keys()),
                 threshold=0.80,
             )
-            if best_matching_standard_profile_name_from_library:
-                break
+        )
         if best_matching_standard_profile_name_from_library:
             break
 
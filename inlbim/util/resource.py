@@ -0,0 +1,265 @@
+# Copyright 2025, Battelle Energy Alliance, LLC All Rights Reserved
+
+"""Per-file registry of shared resources (materials, profiles, material sets, and
+element types) indexed by hashable keys, so that duplicate checks do not rescan
+the file with by_type().
+
+Indexes are built from by_type() on first use. Afterwards, the registry catches
+up by id with the entities added to the file since the previous lookup, so
+resources added by other means are still found. Removed entities are dropped
+when they are looked up. Keys are computed when an entity is first looked up
+after being added, so callers should verify the candidates they get back."""
+
+import ifcopenshell
+import ifcopenshell.util.element
+import inlbim.util.file
+import math
+import weakref
+from typing import Callable, Hashable
+
+_resource_registries = weakref.WeakKeyDictionary()
+
+
+def get_resource_registry(ifc4_file: ifcopenshell.file) -> "ResourceRegistry":
+    """Get the ResourceRegistry of a file, creating it on first use"""
+
+    resource_registry = _resource_registries.get(ifc4_file)
+    if resource_registry is None:
+        resource_registry = ResourceRegistry(ifc4_file=ifc4_file)
+        _resource_registries[ifc4_file] = resource_registry
+
+    return resource_registry
+
+
+class ResourceRegistry:
+    def __init__(self, ifc4_file: ifcopenshell.file):
+        self.ifc4_file = ifc4_file
+        self.max_id_scanned = ifc4_file.wrapped_data.getMaxId()
+        # (ifc_class, include_subtypes, calculate_key) -> index
+        self.indexes = {}
+        # Class name of entity -> indexes it belongs to
+        self.indexes_of_class_names = {}
+
+    def get_entities(
+        self,
+        ifc_class: str,
+        calculate_key: Callable[[ifcopenshell.entity_instance], Hashable],
+        key: Hashable,
+        include_subtypes: bool = False,
+    ) -> list[ifcopenshell.entity_instance]:
+        """Get entities of ifc_class whose key is equal to the given key, in the
+        order they were added to the file"""
+
+        index = self.get_index(
+            ifc_class=ifc_class,
+            calculate_key=calculate_key,
+            include_subtypes=include_subtypes,
+        )
+
+        entities = []
+        ids_of_entities = index["ids_of_keys"].get(key, [])
+        for id_of_entity in list(ids_of_entities):
+            try:
+                entities.append(self.ifc4_file.by_id(id_of_entity))
+            except RuntimeError:
+                ids_of_entities.remove(id_of_entity)
+                if len(ids_of_entities) == 0:
+                    index["keys"].remove(key)
+
+        return entities
+
+    def get_keys(
+        self,
+        ifc_class: str,
+        calculate_key: Callable[[ifcopenshell.entity_instance], Hashable],
+        include_subtypes: bool = False,
+    ) -> list[Hashable]:
+        """Get keys of entities of ifc_class. Keys of removed entities are kept
+        until they are looked up with get_entities(). The list is kept up to date
+        by the registry and shared by all callers, so it must not be modified"""
+
+        index = self.get_index(
+            ifc_class=ifc_class,
+            calculate_key=calculate_key,
+            include_subtypes=include_subtypes,
+        )
+
+        return index["keys"]
+
+    def get_index(
+        self,
+        ifc_class: str,
+        calculate_key: Callable[[ifcopenshell.entity_instance], Hashable],
+        include_subtypes: bool = False,
+    ) -> dict:
+
+        self.catch_up_with_added_entities()
+
+        # Build index from by_type() on first use
+        index_key = (ifc_class, include_subtypes, calculate_key)
+        index = self.indexes.get(index_key)
+        if index is None:
+            index = {
+                "ifc_class": ifc_class,
+                "include_subtypes": include_subtypes,
+                "calculate_key": calculate_key,
+                "pending_ids": sorted(
+                    entity.id()
+                    for entity in self.ifc4_file.by_type(
+                        type=ifc_class, include_subtypes=include_subtypes
+                    )
+                ),
+                "ids_of_keys": {},
+                # Keys with at least one entity, in the order they were added
+                "keys": [],
+            }
+            self.indexes[index_key] = index
+            self.indexes_of_class_names = {}
+
+        # Compute keys of entities added since the previous lookup
+        for id_of_entity in index["pending_ids"]:
+            try:
+                entity = self.ifc4_file.by_id(id_of_entity)
+            except RuntimeError:
+                continue
+            key = calculate_key(entity)
+            ids_of_entities = index["ids_of_keys"].setdefault(key, [])
+            if len(ids_of_entities) == 0:
+                index["keys"].append(key)
+            ids_of_entities.append(id_of_entity)
+        index["pending_ids"] = []
+
+        return index
+
+    def catch_up_with_added_entities(self):
+        """Queue entities added to the file since the previous lookup in the
+        indexes they belong to"""
+
+        max_id = self.ifc4_file.wrapped_data.getMaxId()
+        if max_id <= self.max_id_scanned or len(self.indexes) == 0:
+            self.max_id_scanned = max(self.max_id_scanned, max_id)
+            return
+
+        for id_of_entity in range(self.max_id_scanned + 1, max_id + 1):
+            try:
+                entity = self.ifc4_file.by_id(id_of_entity)
+            except RuntimeError:
+                continue
+            class_name = entity.is_a()
+            indexes_of_class_name = self.indexes_of_class_names.get(class_name)
+            if indexes_of_class_name is None:
+                indexes_of_class_name = [
+                    index
+                    for index in self.indexes.values()
+                    if (
+                        entity.is_a(index["ifc_class"])
+                        if index["include_subtypes"]
+                        else class_name == index["ifc_class"]
+                    )
+                ]
+                self.indexes_of_class_names[class_name] = indexes_of_class_name
+            for index in indexes_of_class_name:
+                index["pending_ids"].append(id_of_entity)
+
+        self.max_id_scanned = max_id
+
+
+def get_name_of_material(material: ifcopenshell.entity_instance) -> str | None:
+    return material.Name
+
+
+def get_upper_case_name_of_material(material: ifcopenshell.entity_instance) -> str:
+    return str(material.Name).upper()
+
+
+def get_name_of_profile(profile: ifcopenshell.entity_instance) -> str | None:
+    return profile.ProfileName
+
+
+def get_upper_case_name_of_profile(profile: ifcopenshell.entity_instance) -> str:
+    return str(profile.ProfileName).upper()
+
+
+def get_key_of_parameterized_profile(
+    parameterized_profile: ifcopenshell.entity_instance,
+) -> int:
+    """Cell of the first dimension on a grid with the precision of the project as
+    spacing. Profiles whose dimensions are within the precision are in the same
+    or adjacent cells"""
+
+    first_dimension = list(parameterized_profile.get_info().values())[5]
+
+    return get_cell_of_dimension(
+        dimension=first_dimension if first_dimension else 0,
+        precision=inlbim.util.file.get_precision_of_project(
+            ifc4_file=parameterized_profile.file
+        ),
+    )
+
+
+def get_cell_of_dimension(dimension: float, precision: float) -> int:
+    return math.floor(dimension / precision)
+
+
+def get_key_of_material_profile_set(
+    material_profile_set: ifcopenshell.entity_instance | None,
+) -> tuple[int | None, int | None] | None:
+    """Ids of the Material and Profile of the first MaterialProfile"""
+
+    if material_profile_set is None or not material_profile_set.is_a(
+        "IfcMaterialProfileSet"
+    ):
+        return None
+    if len(material_profile_set.MaterialProfiles) == 0:
+        return None
+
+    material_profile = material_profile_set.MaterialProfiles[0]
+    material = material_profile.Material
+    profile = material_profile.Profile
+
+    return (
+        material.id() if material else None,
+        profile.id() if profile else None,
+    )
+
+
+def get_key_of_material_layer_set(
+    material_layer_set: ifcopenshell.entity_instance | None,
+) -> tuple[tuple[int | None, ...], tuple[float, ...]] | None:
+    """Ids of the Materials and the LayerThicknesses of the MaterialLayers"""
+
+    if material_layer_set is None or not material_layer_set.is_a("IfcMaterialLayerSet"):
+        return None
+
+    return (
+        tuple(
+            material_layer.Material.id() if material_layer.Material else None
+            for material_layer in material_layer_set.MaterialLayers
+        ),
+        tuple(
+            material_layer.LayerThickness
+            for material_layer in material_layer_set.MaterialLayers
+        ),
+    )
+
+
+def get_key_of_element_type_with_material_profile_set(
+    element_type: ifcopenshell.entity_instance,
+) -> tuple[int | None, int | None] | None:
+
+    return get_key_of_material_profile_set(
+        material_profile_set=ifcopenshell.util.element.get_material(
+            element=element_type, should_skip_usage=True
+        )
+    )
+
+
+def get_key_of_element_type_with_material_layer_set(
+    element_type: ifcopenshell.entity_instance,
+) -> tuple[tuple[int | None, ...], tuple[float, ...]] | None:
+
+    return get_key_of_material_layer_set(
+        material_layer_set=ifcopenshell.util.element.get_material(
+            element=element_type, should_skip_usage=True
+        )
+    )
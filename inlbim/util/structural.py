@@ -3,7 +3,10 @@
 import ifcopenshell
 import inlbim.util.geometry
 import numpy as np
+import ifcopenshell.util.element
 import ifcopenshell.util.representation
+import inlbim.util.file
+import math
 
 
 def get_structural_items_assigned_to_specified_element_class(
@@ -288,3 +291,301 @@ def select_structural_point_connections(
         selected_structural_point_connections.append(structural_point_connection)
 
     return selected_structural_point_connections
+
+
+def get_indices_of_coincident_points(
+    coordinates: np.ndarray,
+    tolerance: float,
+) -> np.ndarray:
+    """For each point (row of an n x 3 array), get the index of the earliest
+    preceding point within the tolerance that is itself not coincident with an
+    earlier point, or its own index if there is none. Points are hashed into a
+    grid with the tolerance as spacing, so only the 27 neighbouring cells are
+    searched"""
+
+    coordinates = np.asarray(coordinates, dtype=float).reshape(-1, 3)
+    cells = np.floor(coordinates / tolerance).astype(np.int64)
+
+    indices_of_coincident_points = np.arange(len(coordinates))
+    indices_of_unique_points_of_cells = {}
+    for index, (i, j, k) in enumerate(cells.tolist()):
+
+        # Earlier unique points in neighbouring cells
+        candidates = []
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                for dk in (-1, 0, 1):
+                    candidates += indices_of_unique_points_of_cells.get(
+                        (i + di, j + dj, k + dk), []
+                    )
+
+        if len(candidates) > 0:
+            candidates.sort()
+            distances = np.linalg.norm(
+                coordinates[candidates] - coordinates[index], axis=1
+            )
+            is_coincident = distances <= tolerance
+            if is_coincident.any():
+                indices_of_coincident_points[index] = candidates[
+                    int(np.argmax(is_coincident))
+                ]
+                continue
+
+        indices_of_unique_points_of_cells.setdefault((i, j, k), []).append(index)
+
+    return indices_of_coincident_points
+
+
+def get_summary_of_structural_items(
+    ifc4_sav_file: ifcopenshell.file,
+    ndigits: int = 4,
+) -> dict[str, list[tuple]]:
+    """Sorted coordinates (rounded to ndigits) of the StructuralPointConnections,
+    and of the StructuralCurveMembers and StructuralSurfaceMembers with their
+    profiles, materials, thicknesses, and the GlobalIds of their assigned
+    products. It does not depend on ids, the GlobalIds of structural items, or
+    the order of creation, so that two conversions can be compared"""
+
+    def round_coordinates(coordinates) -> tuple[float, ...]:
+        return tuple(round(float(val), ndigits) + 0.0 for val in coordinates)
+
+    def get_global_id_of_assigned_product(structural_item) -> str | None:
+        assigned_product = get_assigned_product_of_structural_item(
+            structural_item=structural_item
+        )
+        return assigned_product.GlobalId if assigned_product else None
+
+    structural_point_connections = sorted(
+        round_coordinates(
+            get_coordinates_of_structural_point_connection(
+                structural_point_connection=structural_point_connection
+            )
+        )
+        for structural_point_connection in ifc4_sav_file.by_type(
+            type="IfcStructuralPointConnection", include_subtypes=False
+        )
+    )
+
+    structural_curve_members = []
+    for structural_curve_member in ifc4_sav_file.by_type(
+        type="IfcStructuralCurveMember", include_subtypes=False
+    ):
+        material_profile = ifcopenshell.util.element.get_material(
+            element=structural_curve_member, should_skip_usage=True
+        ).MaterialProfiles[0]
+        structural_curve_members.append(
+            (
+                tuple(
+                    round_coordinates(point)
+                    for point in get_coordinates_of_points_of_linear_structural_curve_member(
+                        linear_structural_curve_member=structural_curve_member
+                    )
+                ),
+                material_profile.Profile.ProfileName,
+                material_profile.Material.Name,
+                get_global_id_of_assigned_product(
+                    structural_item=structural_curve_member
+                ),
+            )
+        )
+
+    structural_surface_members = []
+    for structural_surface_member in ifc4_sav_file.by_type(
+        type="IfcStructuralSurfaceMember", include_subtypes=False
+    ):
+        structural_surface_members.append(
+            (
+                tuple(
+                    sorted(
+                        round_coordinates(point)
+                        for point in get_coordinates_of_points_on_outer_bound_of_structural_surface_member(
+                            triangular_structural_surface_member=structural_surface_member
+                        )
+                    )
+                ),
+                round(float(structural_surface_member.Thickness or 0.0), ndigits),
+                get_global_id_of_assigned_product(
+                    structural_item=structural_surface_member
+                ),
+            )
+        )
+
+    return {
+        "structural_point_connections": structural_point_connections,
+        "structural_curve_members": sorted(structural_curve_members),
+        "structural_surface_members": sorted(structural_surface_members),
+    }
+
+
+def get_roots_of_pairs(
+    pairs: list[tuple[int, int]],
+) -> dict[int, int]:
+    """Union-find over pairs of (replacing, replaced) keys. Get the root of every
+    key, i.e., the key that replaces its whole equivalence class. The root of a
+    class is the replacing key of the pair that first joined it"""
+
+    parents = {}
+    for replacing_key, replaced_key in pairs:
+        root_of_replacing_key = find_root_of_key(parents=parents, key=replacing_key)
+        root_of_replaced_key = find_root_of_key(parents=parents, key=replaced_key)
+        if root_of_replacing_key != root_of_replaced_key:
+            parents[root_of_replaced_key] = root_of_replacing_key
+
+    return {key: find_root_of_key(parents=parents, key=key) for key in parents}
+
+
+def find_root_of_key(parents: dict[int, int], key: int) -> int:
+    """Find root of key in union-find forest, compressing the path"""
+
+    parents.setdefault(key, key)
+    root = key
+    while parents[root] != root:
+        root = parents[root]
+    while parents[key] != root:
+        parents[key], key = root, parents[key]
+
+    return root
+
+
+class StructuralPointConnectionRegistry:
+    """Spatial hash of the VertexPoints of StructuralPointConnections, quantized
+    by the precision of the project. create_3pt_structural_curve_member() and
+    create_npt_structural_surface_member() consult it to reuse an existing
+    StructuralPointConnection instead of creating a coincident one.
+
+    As in merge_all_coincident_structural_point_connections(), points are
+    coincident if they are within the precision, and the earliest VertexPoint
+    wins. The registry is seeded with the StructuralPointConnections already in
+    the file; removed ones are dropped when they are looked up."""
+
+    def __init__(self, ifc4_sav_file: ifcopenshell.file):
+        self.ifc4_sav_file = ifc4_sav_file
+        self.precision = inlbim.util.file.get_precision_of_project(
+            ifc4_file=ifc4_sav_file
+        )
+        # Cell -> ids of VertexPoints
+        self.ids_of_vertex_points_of_cells = {}
+        # Id of VertexPoint -> id of StructuralPointConnection (None until created)
+        self.ids_of_structural_point_connections_of_vertex_points = {}
+        self.hits = 0
+        self.misses = 0
+
+        for structural_point_connection in ifc4_sav_file.by_type(
+            type="IfcStructuralPointConnection", include_subtypes=False
+        ):
+            self.add_structural_point_connection(
+                structural_point_connection=structural_point_connection
+            )
+
+    def get_cell(
+        self,
+        point: tuple[float, float, float],
+    ) -> tuple[int, int, int]:
+
+        return (
+            math.floor(point[0] / self.precision),
+            math.floor(point[1] / self.precision),
+            math.floor(point[2] / self.precision),
+        )
+
+    def find_vertex_point(
+        self,
+        point: tuple[float, float, float],
+    ) -> ifcopenshell.entity_instance | None:
+        """Find the earliest VertexPoint within the precision of a point"""
+
+        point = tuple(float(coordinate) for coordinate in point)
+        i, j, k = self.get_cell(point=point)
+
+        ids_of_vertex_points = []
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                for dk in (-1, 0, 1):
+                    ids_of_vertex_points += self.ids_of_vertex_points_of_cells.get(
+                        (i + di, j + dj, k + dk), []
+                    )
+
+        for id_of_vertex_point in sorted(ids_of_vertex_points):
+            try:
+                vertex_point = self.ifc4_sav_file.by_id(id_of_vertex_point)
+            except RuntimeError:
+                self.remove_vertex_point(id_of_vertex_point=id_of_vertex_point)
+                continue
+            distance = np.linalg.norm(
+                np.array(
+                    inlbim.util.geometry.get_coordinates_of_vertex_point(
+                        vertex_point=vertex_point
+                    )
+                )
+                - np.array(point)
+            )
+            if distance <= self.precision:
+                self.hits += 1
+                return vertex_point
+
+        self.misses += 1
+        return None
+
+    def get_structural_point_connection(
+        self,
+        vertex_point: ifcopenshell.entity_instance,
+    ) -> ifcopenshell.entity_instance | None:
+
+        id_of_structural_point_connection = (
+            self.ids_of_structural_point_connections_of_vertex_points.get(
+                vertex_point.id()
+            )
+        )
+        if id_of_structural_point_connection is None:
+            return None
+        try:
+            return self.ifc4_sav_file.by_id(id_of_structural_point_connection)
+        except RuntimeError:
+            self.ids_of_structural_point_connections_of_vertex_points[
+                vertex_point.id()
+            ] = None
+            return None
+
+    def add_vertex_point(
+        self,
+        vertex_point: ifcopenshell.entity_instance,
+    ):
+
+        if (
+            vertex_point.id()
+            in self.ids_of_structural_point_connections_of_vertex_points
+        ):
+            return
+        cell = self.get_cell(
+            point=inlbim.util.geometry.get_coordinates_of_vertex_point(
+                vertex_point=vertex_point
+            )
+        )
+        self.ids_of_vertex_points_of_cells.setdefault(cell, []).append(
+            vertex_point.id()
+        )
+        self.ids_of_structural_point_connections_of_vertex_points[vertex_point.id()] = (
+            None
+        )
+
+    def add_structural_point_connection(
+        self,
+        structural_point_connection: ifcopenshell.entity_instance,
+    ):
+
+        vertex_point = get_vertex_point_of_structural_point_connection(
+            structural_point_connection=structural_point_connection
+        )
+        self.add_vertex_point(vertex_point=vertex_point)
+        self.ids_of_structural_point_connections_of_vertex_points[vertex_point.id()] = (
+            structural_point_connection.id()
+        )
+
+    def remove_vertex_point(self, id_of_vertex_point: int):
+
+        for ids_of_vertex_points in self.ids_of_vertex_points_of_cells.values():
+            if id_of_vertex_point in ids_of_vertex_points:
+                ids_of_vertex_points.remove(id_of_vertex_point)
+        self.ids_of_structural_point_connections_of_vertex_points.pop(
+            id_of_vertex_point, None
+        )